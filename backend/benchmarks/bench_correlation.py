@@ -0,0 +1,58 @@
+"""Align and correlate many symbols' daily closes (200 symbols x 5 years by default).
+
+Run from backend/:  python -m benchmarks.bench_correlation [symbols] [bars] [repeats]
+"""
+import sys
+import time
+
+import numpy as np
+
+from services import analytics_service as analytics_svc
+from services.price_series import PriceSeries
+
+
+def _universe(symbols: int, bars: int) -> dict[str, PriceSeries]:
+    rng = np.random.default_rng(0)
+    days = np.busday_offset("2019-01-02", np.arange(bars), roll="forward")
+    market = rng.normal(0, 0.01, bars)
+    universe = {}
+    for index in range(symbols):
+        closes = 100 * np.exp(np.cumsum(0.6 * market + rng.normal(0, 0.01, bars)))
+        # Late listings and missing sessions exercise the alignment.
+        keep = np.ones(bars, dtype=bool)
+        keep[: rng.integers(0, bars // 4) if index % 10 == 0 else 0] = False
+        keep[rng.choice(bars, size=bars // 100, replace=False)] = False
+        universe[f"S{index:03d}"] = PriceSeries.from_columns(
+            days[keep], closes[keep], closes[keep], closes[keep], closes[keep], np.ones(keep.sum())
+        )
+    return universe
+
+
+def main(symbols: int = 200, bars: int = 1260, repeats: int = 5) -> None:
+    universe = _universe(symbols, bars)
+    print(f"{symbols} symbols x {bars} daily bars, best of {repeats}")
+    timings = {"align": float("inf"), "returns": float("inf"), "matrices": float("inf"), "rows": float("inf")}
+    for _ in range(repeats):
+        started = time.perf_counter()
+        _, closes = analytics_svc.align_closes(universe)
+        aligned = time.perf_counter()
+        returns = analytics_svc.log_returns(closes)
+        returned = time.perf_counter()
+        correlation, covariance = analytics_svc.pairwise_moments(returns)
+        computed = time.perf_counter()
+        analytics_svc._rows(correlation), analytics_svc._rows(covariance)
+        finished = time.perf_counter()
+        for label, seconds in (
+            ("align", aligned - started),
+            ("returns", returned - aligned),
+            ("matrices", computed - returned),
+            ("rows", finished - computed),
+        ):
+            timings[label] = min(timings[label], seconds)
+    for label, seconds in timings.items():
+        print(f"  {label:<9} {seconds * 1000:8.2f} ms")
+    print(f"  {'total':<9} {sum(timings.values()) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
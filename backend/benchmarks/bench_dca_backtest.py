@@ -0,0 +1,46 @@
+"""Replay many recurring-buy variants over one symbol's daily bars (400 variants x 5 years by default).
+
+Run from backend/:  python -m benchmarks.bench_dca_backtest [variants] [bars] [repeats]
+"""
+import sys
+import time
+
+import numpy as np
+
+from models.analytics_models import DcaVariant
+from services import dca_backtest as dca_svc
+from services import recurring_buy_service as recurring_svc
+from services.price_series import PriceSeries
+
+
+def _series(bars: int) -> PriceSeries:
+    rng = np.random.default_rng(0)
+    days = np.busday_offset("2019-01-02", np.arange(bars), roll="forward")
+    closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, bars)))
+    return PriceSeries.from_columns(days, closes, closes, closes, closes, np.ones(bars))
+
+
+def _variants(count: int) -> list[DcaVariant]:
+    frequencies = sorted(recurring_svc.FREQUENCIES)
+    return [
+        DcaVariant(frequency=frequencies[index % len(frequencies)], target_amount=float(25 + 5 * (index // 4)))
+        for index in range(count)
+    ]
+
+
+def main(variants: int = 400, bars: int = 1260, repeats: int = 5) -> None:
+    series = _series(bars)
+    rules = _variants(variants)
+    start = series.timestamps[0].astype("datetime64[D]").item()
+    end = series.timestamps[-1].astype("datetime64[D]").item()
+    print(f"{variants} variants x {bars} daily bars, best of {repeats}")
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        dca_svc.simulate(series, rules, start, end)
+        best = min(best, time.perf_counter() - started)
+    print(f"  {'simulate':<9} {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,73 @@
+"""Serialization throughput of a 5k-holding portfolio response: dumped dict vs json_response.
+
+The dict path is what FastAPI does with `ApiResponse(...).model_dump(by_alias=True)`:
+jsonable_encoder over the dict, then JSONResponse's json.dumps.
+
+Run from backend/:  python -m benchmarks.bench_json_response [holdings] [repeats]
+"""
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models.common import ApiResponse, json_response
+from models.snaptrade_models import Account, Holding, Portfolio
+
+
+def _portfolio(holdings: int, accounts: int = 10) -> Portfolio:
+    per_account = holdings // accounts
+    return Portfolio(
+        user_id="bench-user",
+        accounts=[
+            Account(
+                id=f"acct-{a}",
+                name=f"Account {a}",
+                account_number=f"****{a:04d}",
+                type="margin",
+                brokerage_id="brokerage",
+                balance=1_000_000.0 + a,
+                holdings=[
+                    Holding(
+                        symbol=f"SYM{a}{h}",
+                        quantity=10 + h * 0.5,
+                        average_purchase_price=100 + h * 0.01,
+                        current_price=110 + h * 0.01,
+                        total_value=(10 + h * 0.5) * (110 + h * 0.01),
+                        gain_loss=(10 + h * 0.5) * 10,
+                        gain_loss_percent=9.09,
+                    )
+                    for h in range(per_account)
+                ],
+            )
+            for a in range(accounts)
+        ],
+        total_balance=10_000_000.0,
+        total_gain_loss=125_000.0,
+        total_gain_loss_percent=1.25,
+    )
+
+
+def _dict_path(portfolio: Portfolio) -> bytes:
+    content = ApiResponse(success=True, data=portfolio).model_dump(by_alias=True)
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def _bytes_path(portfolio: Portfolio) -> bytes:
+    return json_response(ApiResponse(success=True, data=portfolio)).body
+
+
+def main(holdings: int = 5_000, repeats: int = 5) -> None:
+    portfolio = _portfolio(holdings)
+    print(f"{holdings} holdings, best of {repeats}")
+    for label, render in (("model_dump + JSONResponse", _dict_path), ("json_response", _bytes_path)):
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            body = render(portfolio)
+            best = min(best, time.perf_counter() - started)
+        print(f"  {label:<26} {best * 1000:8.2f} ms   {len(body) / 1024:7.1f} KiB   {len(body) / best / 1e6:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
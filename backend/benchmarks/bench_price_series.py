@@ -0,0 +1,74 @@
+"""Build time and memory per 10k bars: list of StockHistoricalData vs PriceSeries.
+
+Run from backend/:  python -m benchmarks.bench_price_series [bars] [repeats]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from models.stock_models import StockHistoricalData
+from services.price_series import PriceSeries
+
+
+def _payload(bars: int) -> list[dict]:
+    start = datetime(2000, 1, 3)
+    return [
+        {
+            "datetime": (start + timedelta(days=i)).strftime("%Y-%m-%d"),
+            "open": f"{100 + i * 0.01:.4f}",
+            "high": f"{101 + i * 0.01:.4f}",
+            "low": f"{99 + i * 0.01:.4f}",
+            "close": f"{100.5 + i * 0.01:.4f}",
+            "volume": str(1_000_000 + i),
+        }
+        for i in range(bars)
+    ]
+
+
+def _build_models(values: list[dict]) -> list[StockHistoricalData]:
+    """The pre-columnar path: one pydantic model per bar, sorted by date."""
+    out = [
+        StockHistoricalData(
+            date=datetime.fromisoformat(v["datetime"]),
+            open=float(v["open"]),
+            high=float(v["high"]),
+            low=float(v["low"]),
+            close=float(v["close"]),
+            volume=int(v["volume"]),
+        )
+        for v in values
+    ]
+    return sorted(out, key=lambda bar: bar.date)
+
+
+def _build_series(values: list[dict]) -> PriceSeries:
+    return PriceSeries.from_twelve_data(values)
+
+
+def _measure(build, values: list[dict], repeats: int) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        build(values)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    result = build(values)
+    # Memory still held while the result is alive, i.e. what a cached series costs.
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, retained
+
+
+def main(bars: int = 10_000, repeats: int = 5) -> None:
+    values = _payload(bars)
+    scale = 10_000 / bars
+    print(f"{bars} bars, best of {repeats}; figures normalised per 10k bars")
+    for label, build in (("list[StockHistoricalData]", _build_models), ("PriceSeries", _build_series)):
+        seconds, size = _measure(build, values, repeats)
+        print(f"  {label:<26} build {seconds * scale * 1000:8.2f} ms   memory {size * scale / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
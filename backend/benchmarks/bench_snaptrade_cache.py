@@ -0,0 +1,74 @@
+"""Time a cached SnapTrade portfolio hit on a large portfolio (20 accounts x 250 holdings by default).
+
+Compares serving the frozen snapshot (plus deriving the visible-accounts view the
+router builds) with the deep copy every hit used to make.
+
+Run from backend/:  python -m benchmarks.bench_snaptrade_cache [accounts] [holdings] [repeats]
+"""
+import asyncio
+import sys
+import time
+
+from models.snaptrade_models import Account, Holding, Portfolio
+from services import snaptrade_service as snaptrade_svc
+
+
+def _portfolio(accounts: int, holdings: int) -> Portfolio:
+    return Portfolio(
+        user_id="bench",
+        accounts=[
+            Account(
+                id=f"acct-{account}",
+                name=f"Account {account}",
+                balance=holdings * 1000.0,
+                holdings=[
+                    Holding(
+                        symbol=f"SYM{account}-{index}",
+                        quantity=10,
+                        average_purchase_price=90,
+                        current_price=100,
+                        total_value=1000,
+                        gain_loss=100,
+                        gain_loss_percent=11.1,
+                    )
+                    for index in range(holdings)
+                ],
+            )
+            for account in range(accounts)
+        ],
+    )
+
+
+def _time(label: str, repeats: int, call) -> None:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<24} {best * 1_000_000:10.1f} us")
+
+
+def main(accounts: int = 20, holdings: int = 250, repeats: int = 20) -> None:
+    portfolio = _portfolio(accounts, holdings)
+    now = time.time()
+    snaptrade_svc._portfolio_cache.set("bench", "bench", now + 3600, now + 7200, portfolio)
+    loop = asyncio.new_event_loop()
+    print(f"{accounts} accounts x {holdings} holdings, best of {repeats}")
+
+    def frozen_hit():
+        cached = loop.run_until_complete(snaptrade_svc.get_portfolio("bench", "secret"))
+        renamed = cached.accounts[0].model_copy(update={"nickname": "Main"})
+        snaptrade_svc.portfolio_view(cached, [renamed, *cached.accounts[2:]])
+
+    def deep_copy_hit():
+        # What each hit (and each store) cost before entries were frozen.
+        portfolio.model_copy(deep=True)
+
+    _time("frozen snapshot + view", repeats, frozen_hit)
+    _time("model_copy(deep=True)", repeats, deep_copy_hit)
+    loop.close()
+    snaptrade_svc.clear_user_cache("bench")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -15,6 +15,24 @@ else:
 SNAPTRADE_API_URL = os.getenv("SNAPTRADE_API_URL", "https://api.snaptrade.com/api/v1")
 SNAPTRADE_CLIENT_ID = os.getenv("SNAPTRADE_CLIENT_ID", "")
 SNAPTRADE_CONSUMER_KEY = os.getenv("SNAPTRADE_CONSUMER_KEY", "")
+# SDK calls run on a dedicated thread pool sharing one pooled client; each user may have
+# at most PER_USER_CONCURRENCY calls in flight so one large account can't starve the rest.
+SNAPTRADE_MAX_WORKERS = int(os.getenv("SNAPTRADE_MAX_WORKERS", "8"))
+SNAPTRADE_PER_USER_CONCURRENCY = int(os.getenv("SNAPTRADE_PER_USER_CONCURRENCY", "3"))
+# Portfolio, recurring-investment and dividend results older than their 15-minute TTL are
+# still served (while a refresh runs in the background) until they are this many seconds old.
+SNAPTRADE_CACHE_HARD_EXPIRY_SECONDS = float(os.getenv("SNAPTRADE_CACHE_HARD_EXPIRY_SECONDS", "3600"))
+# Where those results live: "memory" (per process) or "sqlite" (one file shared by every worker
+# on the host). Either way least recently used entries go once the stored JSON tops MAX_BYTES.
+SNAPTRADE_CACHE_BACKEND = (os.getenv("SNAPTRADE_CACHE_BACKEND", "memory") or "memory").strip().lower()
+SNAPTRADE_CACHE_MAX_BYTES = int(os.getenv("SNAPTRADE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SNAPTRADE_CACHE_SWEEP_SECONDS = float(os.getenv("SNAPTRADE_CACHE_SWEEP_SECONDS", "60"))
+SNAPTRADE_CACHE_SQLITE_PATH = os.getenv("SNAPTRADE_CACHE_SQLITE_PATH") or str(
+    Path(__file__).resolve().parent / "data" / "snaptrade_cache.sqlite3"
+)
+# Buy and dividend activities are kept in the database; after the first backfill a refresh
+# only re-reads activities from this many days before the last sync, to catch late postings.
+SNAPTRADE_ACTIVITY_RESYNC_DAYS = int(os.getenv("SNAPTRADE_ACTIVITY_RESYNC_DAYS", "7"))
 
 # Trading safety switch. Only "live" actually submits orders to the brokerage;
 # any other value (default "test") simulates placement so local/dev never moves real money.
@@ -33,3 +51,62 @@ SNAPTRADE_SECRET_ENCRYPTION_KEY = os.getenv("SNAPTRADE_SECRET_ENCRYPTION_KEY", "
 # Twelve Data
 TWELVE_DATA_API_URL = os.getenv("TWELVE_DATA_API_URL", "https://api.twelvedata.com")
 TWELVE_DATA_API_KEY = os.getenv("TWELVE_DATA_API_KEY", "")
+# Shared Twelve Data connection pool (one long-lived client per process).
+TWELVE_DATA_HTTP2 = (os.getenv("TWELVE_DATA_HTTP2", "true") or "true").strip().lower() == "true"
+TWELVE_DATA_MAX_CONNECTIONS = int(os.getenv("TWELVE_DATA_MAX_CONNECTIONS", "20"))
+TWELVE_DATA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("TWELVE_DATA_MAX_KEEPALIVE_CONNECTIONS", "10"))
+TWELVE_DATA_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("TWELVE_DATA_KEEPALIVE_EXPIRY_SECONDS", "60"))
+# In-process quote cache shared by every quote read (dashboard, watchlist, recurring buys).
+TWELVE_DATA_QUOTE_CACHE_TTL_SECONDS = float(os.getenv("TWELVE_DATA_QUOTE_CACHE_TTL_SECONDS", "15"))
+TWELVE_DATA_QUOTE_CACHE_MAX_SIZE = int(os.getenv("TWELVE_DATA_QUOTE_CACHE_MAX_SIZE", "2000"))
+# Company profiles (name, sector, description, ...) rarely change, so they live much longer.
+TWELVE_DATA_PROFILE_CACHE_TTL_SECONDS = float(os.getenv("TWELVE_DATA_PROFILE_CACHE_TTL_SECONDS", "86400"))
+TWELVE_DATA_PROFILE_CACHE_MAX_SIZE = int(os.getenv("TWELVE_DATA_PROFILE_CACHE_MAX_SIZE", "2000"))
+# Batched /quote requests: symbols per request and how many batches run at once.
+TWELVE_DATA_QUOTE_BATCH_SIZE = int(os.getenv("TWELVE_DATA_QUOTE_BATCH_SIZE", "25"))
+TWELVE_DATA_QUOTE_BATCH_CONCURRENCY = int(os.getenv("TWELVE_DATA_QUOTE_BATCH_CONCURRENCY", "2"))
+# Seconds before the newest stored price bar is re-checked against Twelve Data.
+TWELVE_DATA_HISTORY_REFRESH_SECONDS = float(os.getenv("TWELVE_DATA_HISTORY_REFRESH_SECONDS", "900"))
+# API credits per minute on the Twelve Data plan (8 on the free tier; unset or 0 = no limiting)
+# and how long a call may queue for them.
+TWELVE_DATA_CREDITS_PER_MINUTE = float(os.getenv("TWELVE_DATA_CREDITS_PER_MINUTE") or "0")
+TWELVE_DATA_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("TWELVE_DATA_RATE_LIMIT_MAX_WAIT_SECONDS", "10"))
+# Circuit breaker over Twelve Data calls: once at least MIN_CALLS of the last WINDOW
+# calls are recorded and FAILURE_RATIO of them failed or took SLOW_CALL_SECONDS or
+# longer, calls fail fast (serving cached data where there is any) for OPEN_SECONDS.
+TWELVE_DATA_BREAKER_WINDOW = int(os.getenv("TWELVE_DATA_BREAKER_WINDOW", "20"))
+TWELVE_DATA_BREAKER_MIN_CALLS = int(os.getenv("TWELVE_DATA_BREAKER_MIN_CALLS", "10"))
+TWELVE_DATA_BREAKER_FAILURE_RATIO = float(os.getenv("TWELVE_DATA_BREAKER_FAILURE_RATIO", "0.5"))
+TWELVE_DATA_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("TWELVE_DATA_BREAKER_SLOW_CALL_SECONDS", "4"))
+TWELVE_DATA_BREAKER_OPEN_SECONDS = float(os.getenv("TWELVE_DATA_BREAKER_OPEN_SECONDS", "30"))
+# Expired quotes are kept this long to answer while the breaker is open.
+TWELVE_DATA_STALE_QUOTE_SECONDS = float(os.getenv("TWELVE_DATA_STALE_QUOTE_SECONDS", "900"))
+# Hedged GETs: a second identical request once the first outlives the endpoint's p95.
+TWELVE_DATA_HEDGE_REQUESTS = (os.getenv("TWELVE_DATA_HEDGE_REQUESTS", "false") or "false").strip().lower() == "true"
+TWELVE_DATA_HEDGE_MIN_SAMPLES = int(os.getenv("TWELVE_DATA_HEDGE_MIN_SAMPLES", "20"))
+# Correlation/covariance endpoint: symbols per request, and result sets kept in memory.
+ANALYTICS_MAX_SYMBOLS = int(os.getenv("ANALYTICS_MAX_SYMBOLS", "200"))
+ANALYTICS_CACHE_MAX_SIZE = int(os.getenv("ANALYTICS_CACHE_MAX_SIZE", "64"))
+# Screener universe: these symbols plus every watchlisted one, each refreshed once REFRESH_SECONDS old.
+FUNDAMENTALS_UNIVERSE = [
+    symbol.strip().upper() for symbol in os.getenv("FUNDAMENTALS_UNIVERSE", "").split(",") if symbol.strip()
+]
+FUNDAMENTALS_INCLUDE_WATCHLISTS = (os.getenv("FUNDAMENTALS_INCLUDE_WATCHLISTS", "true") or "true").strip().lower() == "true"
+FUNDAMENTALS_REFRESH_SECONDS = float(os.getenv("FUNDAMENTALS_REFRESH_SECONDS", "86400"))
+# Streaming quotes: one poller refreshes every subscribed symbol on this interval.
+QUOTE_STREAM_POLL_SECONDS = float(os.getenv("QUOTE_STREAM_POLL_SECONDS", "15"))
+QUOTE_STREAM_MAX_SUBSCRIBERS = int(os.getenv("QUOTE_STREAM_MAX_SUBSCRIBERS", "200"))
+QUOTE_STREAM_MAX_SYMBOLS = int(os.getenv("QUOTE_STREAM_MAX_SYMBOLS", "50"))
+QUOTE_STREAM_HEARTBEAT_SECONDS = float(os.getenv("QUOTE_STREAM_HEARTBEAT_SECONDS", "20"))
+# Local autocomplete index of listed stocks/ETFs, rebuilt from Twelve Data reference data.
+TWELVE_DATA_SYMBOL_INDEX_PATH = os.getenv("TWELVE_DATA_SYMBOL_INDEX_PATH") or str(
+    Path(__file__).resolve().parent / "data" / "symbol_index.json.gz"
+)
+TWELVE_DATA_SYMBOL_INDEX_REFRESH_SECONDS = float(os.getenv("TWELVE_DATA_SYMBOL_INDEX_REFRESH_SECONDS", "86400"))
+TWELVE_DATA_SYMBOL_INDEX_COUNTRY = os.getenv("TWELVE_DATA_SYMBOL_INDEX_COUNTRY", "United States")
+# After each close, daily bars (this many), profiles and closing quotes are prefetched for
+# every held, watched and scheduled symbol; progress is checkpointed so a restart resumes.
+TWELVE_DATA_PREFETCH_BARS = int(os.getenv("TWELVE_DATA_PREFETCH_BARS", "1260"))
+TWELVE_DATA_PREFETCH_STATE_PATH = os.getenv("TWELVE_DATA_PREFETCH_STATE_PATH") or str(
+    Path(__file__).resolve().parent / "data" / "prefetch_state.json"
+)
@@ -0,0 +1,39 @@
+"""Add stored OHLCV price bars.
+
+Revision ID: 20261018_0013
+Revises: 20260615_0012
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0013"
+down_revision = "20260615_0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    datetime_type = sa.DateTime(timezone=dialect == "postgresql")
+    now_default = sa.text("CURRENT_TIMESTAMP")
+
+    op.create_table(
+        "stock_price_bars",
+        sa.Column("symbol", sa.String(length=32), primary_key=True),
+        sa.Column("interval", sa.String(length=16), primary_key=True),
+        sa.Column("bar_time", sa.DateTime(), primary_key=True),
+        sa.Column("open", sa.Numeric(18, 6), nullable=False),
+        sa.Column("high", sa.Numeric(18, 6), nullable=False),
+        sa.Column("low", sa.Numeric(18, 6), nullable=False),
+        sa.Column("close", sa.Numeric(18, 6), nullable=False),
+        sa.Column("volume", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("fetched_at", datetime_type, server_default=now_default),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_price_bars", if_exists=True)
@@ -0,0 +1,57 @@
+"""Add the stock fundamentals table behind the screener.
+
+Revision ID: 20261018_0014
+Revises: 20261018_0013
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0014"
+down_revision = "20261018_0013"
+branch_labels = None
+depends_on = None
+
+_INDEXES = {
+    "idx_stock_fundamentals_sector_market_cap": ["sector", "market_cap"],
+    "idx_stock_fundamentals_market_cap": ["market_cap"],
+    "idx_stock_fundamentals_pe_ratio": ["pe_ratio"],
+    "idx_stock_fundamentals_dividend_yield": ["dividend_yield"],
+    "idx_stock_fundamentals_range_position": ["range_position"],
+    "ix_stock_fundamentals_updated_at": ["updated_at"],
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    datetime_type = sa.DateTime(timezone=dialect == "postgresql")
+    now_default = sa.text("CURRENT_TIMESTAMP")
+
+    op.create_table(
+        "stock_fundamentals",
+        sa.Column("symbol", sa.String(length=32), primary_key=True),
+        sa.Column("name", sa.String(length=255), nullable=True),
+        sa.Column("exchange", sa.String(length=64), nullable=True),
+        sa.Column("sector", sa.String(length=120), nullable=True),
+        sa.Column("industry", sa.String(length=120), nullable=True),
+        sa.Column("price", sa.Float(), nullable=True),
+        sa.Column("market_cap", sa.Float(), nullable=True),
+        sa.Column("pe_ratio", sa.Float(), nullable=True),
+        sa.Column("dividend_yield", sa.Float(), nullable=True),
+        sa.Column("high_52_week", sa.Float(), nullable=True),
+        sa.Column("low_52_week", sa.Float(), nullable=True),
+        sa.Column("range_position", sa.Float(), nullable=True),
+        sa.Column("average_volume", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", datetime_type, server_default=now_default),
+        if_not_exists=True,
+    )
+    for name, columns in _INDEXES.items():
+        op.create_index(name, "stock_fundamentals", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name in _INDEXES:
+        op.drop_index(name, table_name="stock_fundamentals", if_exists=True)
+    op.drop_table("stock_fundamentals", if_exists=True)
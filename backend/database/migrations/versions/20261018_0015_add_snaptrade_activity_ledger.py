@@ -0,0 +1,58 @@
+"""Add the SnapTrade activity ledger and its per-account sync watermarks.
+
+Revision ID: 20261018_0015
+Revises: 20261018_0014
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0015"
+down_revision = "20261018_0014"
+branch_labels = None
+depends_on = None
+
+_INDEXES = {
+    "idx_snaptrade_activities_account_kind_date": ["user_id", "account_id", "kind", "trade_date"],
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+    datetime_type = sa.DateTime(timezone=dialect == "postgresql")
+    row_id_type = sa.UUID(as_uuid=False) if dialect == "postgresql" else sa.String(length=36)
+    now_default = sa.text("CURRENT_TIMESTAMP")
+
+    op.create_table(
+        "snaptrade_activities",
+        sa.Column("id", row_id_type, primary_key=True),
+        sa.Column("user_id", sa.String(length=128), nullable=False),
+        sa.Column("account_id", sa.String(length=128), nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("trade_date", sa.Date(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("fetched_at", datetime_type, server_default=now_default),
+        if_not_exists=True,
+    )
+    for name, columns in _INDEXES.items():
+        op.create_index(name, "snaptrade_activities", columns, if_not_exists=True)
+
+    op.create_table(
+        "snaptrade_activity_sync",
+        sa.Column("user_id", sa.String(length=128), primary_key=True),
+        sa.Column("account_id", sa.String(length=128), primary_key=True),
+        sa.Column("kind", sa.String(length=16), primary_key=True),
+        sa.Column("backfilled_from", sa.Date(), nullable=False),
+        sa.Column("synced_through", sa.Date(), nullable=False),
+        sa.Column("last_synced_at", datetime_type, server_default=now_default),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("snaptrade_activity_sync", if_exists=True)
+    for name in _INDEXES:
+        op.drop_index(name, table_name="snaptrade_activities", if_exists=True)
+    op.drop_table("snaptrade_activities", if_exists=True)
@@ -2,7 +2,20 @@
 from datetime import date, datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import TypeDecorator
@@ -110,6 +123,49 @@ class RentcastListingCache(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now, onupdate=_now)
 
 
+class StockPriceBar(Base):
+    """Stored Twelve Data OHLCV bars, so chart loads only fetch bars newer than the last one kept."""
+    __tablename__ = "stock_price_bars"
+
+    symbol: Mapped[str] = mapped_column(String(32), primary_key=True)
+    interval: Mapped[str] = mapped_column(String(16), primary_key=True)
+    bar_time: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    open: Mapped[float] = mapped_column(Numeric(18, 6))
+    high: Mapped[float] = mapped_column(Numeric(18, 6))
+    low: Mapped[float] = mapped_column(Numeric(18, 6))
+    close: Mapped[float] = mapped_column(Numeric(18, 6))
+    volume: Mapped[int] = mapped_column(BigInteger, default=0)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
+
+
+class StockFundamental(Base):
+    """Latest quote and profile fields per symbol, refreshed in the background for the screener."""
+    __tablename__ = "stock_fundamentals"
+    __table_args__ = (
+        Index("idx_stock_fundamentals_sector_market_cap", "sector", "market_cap"),
+        Index("idx_stock_fundamentals_market_cap", "market_cap"),
+        Index("idx_stock_fundamentals_pe_ratio", "pe_ratio"),
+        Index("idx_stock_fundamentals_dividend_yield", "dividend_yield"),
+        Index("idx_stock_fundamentals_range_position", "range_position"),
+    )
+
+    symbol: Mapped[str] = mapped_column(String(32), primary_key=True)
+    name: Mapped[str | None] = mapped_column(NAME)
+    exchange: Mapped[str | None] = mapped_column(String(64))
+    sector: Mapped[str | None] = mapped_column(String(120))
+    industry: Mapped[str | None] = mapped_column(String(120))
+    price: Mapped[float | None] = mapped_column(Float)
+    market_cap: Mapped[float | None] = mapped_column(Float)
+    pe_ratio: Mapped[float | None] = mapped_column(Float)
+    dividend_yield: Mapped[float | None] = mapped_column(Float)
+    high_52_week: Mapped[float | None] = mapped_column(Float)
+    low_52_week: Mapped[float | None] = mapped_column(Float)
+    # Where the price sits in its 52-week range: 0 at the low, 1 at the high.
+    range_position: Mapped[float | None] = mapped_column(Float)
+    average_volume: Mapped[int | None] = mapped_column(BigInteger)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now, index=True)
+
+
 class RealEstateProperty(Base):
     __tablename__ = "real_estate_properties"
 
@@ -322,6 +378,34 @@ class SnapTradeAccountBalanceSnapshot(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now, onupdate=_now)
 
 
+class SnapTradeActivity(Base):
+    """Raw SnapTrade account activities (buys, dividends), kept so refreshes only fetch recent ones."""
+    __tablename__ = "snaptrade_activities"
+    __table_args__ = (
+        Index("idx_snaptrade_activities_account_kind_date", "user_id", "account_id", "kind", "trade_date"),
+    )
+
+    id: Mapped[str] = mapped_column(ROW_ID, primary_key=True, default=_uuid)
+    user_id: Mapped[str] = mapped_column(EXTERNAL_ID)
+    account_id: Mapped[str] = mapped_column(EXTERNAL_ID)
+    kind: Mapped[str] = mapped_column(String(16))
+    trade_date: Mapped[date] = mapped_column(Date)
+    payload: Mapped[str] = mapped_column(Text)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
+
+
+class SnapTradeActivitySync(Base):
+    """Per-account watermark: the trade dates already copied into snaptrade_activities."""
+    __tablename__ = "snaptrade_activity_sync"
+
+    user_id: Mapped[str] = mapped_column(EXTERNAL_ID, primary_key=True)
+    account_id: Mapped[str] = mapped_column(EXTERNAL_ID, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    backfilled_from: Mapped[date] = mapped_column(Date)
+    synced_through: Mapped[date] = mapped_column(Date)
+    last_synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
+
+
 class PlaidItem(Base):
     __tablename__ = "plaid_items"
     __table_args__ = (UniqueConstraint("user_id", "plaid_item_id", name="uq_plaid_item_user_item"),)
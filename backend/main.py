@@ -104,16 +104,29 @@ _validate_production_env()
 _log_optional_env_vars()
 
 from database import SessionLocal, init_db
-from routers import cashflow, persistence, plaid, real_estate, stock, snaptrade, taxes
+from routers import analytics, cashflow, persistence, plaid, real_estate, stock, snaptrade, taxes
 from services import account_preference_service as account_pref_svc
+from services import fundamentals_service as fundamentals_svc
 from services import portfolio_snapshot_service as portfolio_snapshot_svc
+from services import prefetch_service as prefetch_svc
+from services import quote_stream
+from services import snaptrade_cache
 from services import recurring_buy_service as recurring_buy_svc
 from services import snaptrade_service as snaptrade_svc
+from services import stock_data_service as stock_data_svc
 from services import user_service as user_svc
 DB_KEEPALIVE_INTERVAL_SECONDS = 86400
 PORTFOLIO_SNAPSHOT_INTERVAL_SECONDS = 86400
 # Checked every 10 minutes so the 11:00 AM Central buy window is hit within ~10 min.
 RECURRING_BUY_INTERVAL_SECONDS = 600
+# The symbol index rebuilds itself once stale; this is only how often staleness is checked.
+SYMBOL_INDEX_CHECK_INTERVAL_SECONDS = 3600
+# Rows go stale after FUNDAMENTALS_REFRESH_SECONDS; this is how often stale rows are looked for.
+FUNDAMENTALS_CHECK_INTERVAL_SECONDS = 3600
+# The prefetch only runs once a session has closed; this is how often it checks (and resumes).
+PREFETCH_CHECK_INTERVAL_SECONDS = 900
+# Expired SnapTrade cache entries are also swept as the cache is written to, but an idle process writes nothing.
+SNAPTRADE_CACHE_SWEEP_INTERVAL_SECONDS = snaptrade_cache.SWEEP_SECONDS
 DEFAULT_FRONTEND_ORIGINS = [
     "http://localhost:4200",
     "https://localhost:4200",
@@ -162,6 +175,44 @@ async def recurring_buy_loop() -> None:
         await asyncio.sleep(RECURRING_BUY_INTERVAL_SECONDS)
 
 
+async def symbol_index_loop() -> None:
+    while True:
+        try:
+            await stock_data_svc.refresh_symbol_index()
+        except Exception as exc:
+            logger.warning("symbol index refresh failed: %s", exc)
+        await asyncio.sleep(SYMBOL_INDEX_CHECK_INTERVAL_SECONDS)
+
+
+async def fundamentals_loop() -> None:
+    while True:
+        try:
+            counts = await fundamentals_svc.refresh()
+            if counts["stale"]:
+                logger.info("fundamentals refresh pass: %s", counts)
+        except Exception as exc:
+            logger.warning("fundamentals refresh failed: %s", exc)
+        await asyncio.sleep(FUNDAMENTALS_CHECK_INTERVAL_SECONDS)
+
+
+async def snaptrade_cache_sweep_loop() -> None:
+    while True:
+        await asyncio.sleep(SNAPTRADE_CACHE_SWEEP_INTERVAL_SECONDS)
+        try:
+            await snaptrade_svc.sweep_cache()
+        except Exception as exc:
+            logger.warning("SnapTrade cache sweep failed: %s", exc)
+
+
+async def prefetch_loop() -> None:
+    while True:
+        try:
+            await prefetch_svc.run()
+        except Exception as exc:
+            logger.warning("market data prefetch failed: %s", exc)
+        await asyncio.sleep(PREFETCH_CHECK_INTERVAL_SECONDS)
+
+
 async def snapshot_all_portfolios() -> None:
     user_secrets = await user_svc.list_user_secrets()
     if not user_secrets:
@@ -190,35 +241,47 @@ async def _visible_snapshot_portfolio(user_id: str, portfolio):
             continue
         nickname = preference.get("nickname")
         if isinstance(nickname, str) and nickname.strip():
-            account.nickname = nickname.strip()
+            account = account.model_copy(update={"nickname": nickname.strip()})
         visible_accounts.append(account)
-
-    portfolio.accounts = visible_accounts
-    portfolio.total_balance = sum(account.balance or 0 for account in visible_accounts)
-    portfolio.total_gain_loss = sum(sum(holding.gain_loss for holding in account.holdings) for account in visible_accounts)
-    portfolio.total_gain_loss_percent = (
-        (portfolio.total_gain_loss / (portfolio.total_balance - portfolio.total_gain_loss) * 100)
-        if (portfolio.total_balance - portfolio.total_gain_loss)
-        else 0
-    )
-    portfolio.currency = visible_accounts[0].currency if visible_accounts else portfolio.currency
-    return portfolio
+    return snaptrade_svc.portfolio_view(portfolio, visible_accounts)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    await stock_data_svc.start_client()
+    stock_data_svc.check_credit_plan()
+    stock_data_svc.load_symbol_index()
     keepalive_task = asyncio.create_task(database_keepalive_loop())
     snapshot_task = None
     recurring_buy_task = None
+    symbol_index_task = None
+    fundamentals_task = None
+    prefetch_task = None
+    cache_sweep_task = None
     if (os.getenv("APP_ENV") or "").lower() != "test":
         snapshot_task = asyncio.create_task(portfolio_snapshot_loop())
         recurring_buy_task = asyncio.create_task(recurring_buy_loop())
+        symbol_index_task = asyncio.create_task(symbol_index_loop())
+        fundamentals_task = asyncio.create_task(fundamentals_loop())
+        prefetch_task = asyncio.create_task(prefetch_loop())
+        cache_sweep_task = asyncio.create_task(snaptrade_cache_sweep_loop())
     try:
         yield
     finally:
         keepalive_task.cancel()
-        background_tasks = [task for task in (snapshot_task, recurring_buy_task) if task]
+        background_tasks = [
+            task
+            for task in (
+                snapshot_task,
+                recurring_buy_task,
+                symbol_index_task,
+                fundamentals_task,
+                prefetch_task,
+                cache_sweep_task,
+            )
+            if task
+        ]
         for task in background_tasks:
             task.cancel()
         try:
@@ -230,6 +293,9 @@ async def lifespan(app: FastAPI):
                 await task
             except asyncio.CancelledError:
                 pass
+        await quote_stream.stop()
+        await stock_data_svc.close_client()
+        snaptrade_svc.shutdown_executor()
 
 
 app = FastAPI(
@@ -266,6 +332,7 @@ app.include_router(plaid.router, prefix="/api")
 app.include_router(cashflow.router, prefix="/api")
 app.include_router(real_estate.router, prefix="/api")
 app.include_router(taxes.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
 
 
 @app.get("/")
@@ -0,0 +1,111 @@
+from datetime import date
+
+from pydantic import BaseModel, ConfigDict
+
+
+def _to_camel(s: str) -> str:
+    parts = s.split("_")
+    return parts[0].lower() + "".join(p.capitalize() for p in parts[1:])
+
+
+class CorrelationMatrix(BaseModel):
+    """Pairwise statistics of daily log returns; rows and columns follow `symbols`.
+
+    A pair with fewer than `min_overlap` shared returns has None in both matrices.
+    """
+
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    symbols: list[str] = []
+    period: str = ""
+    start: date | None = None
+    end: date | None = None
+    observations: int = 0
+    min_overlap: int = 0
+    correlation: list[list[float | None]] = []
+    covariance: list[list[float | None]] = []
+
+
+class DcaVariant(BaseModel):
+    """One recurring-buy rule to replay: exactly one of units or target_amount."""
+
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    frequency: str
+    units: float | None = None
+    target_amount: float | None = None
+    label: str | None = None
+
+
+class DcaBacktestRequest(BaseModel):
+    """Replay `variants` (and the saved schedule `schedule_id`, if given) from start_date."""
+
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    symbol: str | None = None
+    schedule_id: str | None = None
+    start_date: date
+    end_date: date | None = None
+    variants: list[DcaVariant] = []
+
+
+class DcaBacktestResult(BaseModel):
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    label: str = ""
+    frequency: str = ""
+    units: float | None = None
+    target_amount: float | None = None
+    runs: int = 0
+    buys: int = 0
+    invested: float = 0.0
+    shares: float = 0.0
+    cash: float = 0.0
+    final_value: float = 0.0
+    profit: float = 0.0
+    return_percent: float | None = None
+    average_cost: float | None = None
+    max_drawdown_percent: float | None = None
+    equity: list[float] = []
+
+
+class DcaBacktest(BaseModel):
+    """Per-variant outcomes; each `equity` curve is sampled on `dates`."""
+
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    symbol: str = ""
+    start: date | None = None
+    end: date | None = None
+    dates: list[date] = []
+    results: list[DcaBacktestResult] = []
+
+
+class HoldingRisk(BaseModel):
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    symbol: str = ""
+    value: float = 0.0
+    weight: float = 0.0
+    volatility: float | None = None
+    beta: float | None = None
+    risk_contribution: float | None = None
+
+
+class PortfolioRisk(BaseModel):
+    """Risk of the current holdings over `period` of daily returns.
+
+    Volatility is annualized; VaR is the one-day loss, in currency and as a percent
+    of `value`, not exceeded with probability `confidence`.
+    """
+
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    benchmark: str = ""
+    period: str = ""
+    start: date | None = None
+    end: date | None = None
+    observations: int = 0
+    confidence: float = 0.95
+    value: float = 0.0
+    volatility: float | None = None
+    beta: float | None = None
+    historical_var: float | None = None
+    historical_var_percent: float | None = None
+    parametric_var: float | None = None
+    parametric_var_percent: float | None = None
+    max_drawdown_percent: float | None = None
+    holdings: list[HoldingRisk] = []
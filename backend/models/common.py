@@ -1,5 +1,6 @@
 from typing import Generic, List, TypeVar
 
+from fastapi import Response
 from pydantic import BaseModel, ConfigDict
 
 
@@ -17,3 +18,13 @@ class ApiResponse(BaseModel, Generic[T]):
     data: T | None = None
     message: str | None = None
     errors: List[str] | None = None
+
+
+def json_response(content: BaseModel, status_code: int = 200) -> Response:
+    """`content` serialized by alias straight to JSON bytes.
+
+    Returning a raw Response skips FastAPI's jsonable_encoder/json.dumps pass over
+    a dumped dict; pydantic-core writes the bytes in one go. NaN/inf become null.
+    """
+    body = content.__pydantic_serializer__.to_json(content, by_alias=True)
+    return Response(content=body, status_code=status_code, media_type="application/json")
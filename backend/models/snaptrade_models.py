@@ -28,8 +28,12 @@ class Brokerage(BaseModel):
     supports_trading: bool = False
 
 
+# Holdings, accounts, portfolios, recurring investments and dividend summaries are served
+# straight from the SnapTrade cache and shared between requests, so they are frozen and
+# their collections are tuples: derive an adjusted view with model_copy(update=...) instead
+# of assigning fields. model_copy doesn't validate, so pass tuples in those updates too.
 class Holding(BaseModel):
-    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, frozen=True)
     symbol: str = ""
     quantity: float = 0.0
     average_purchase_price: float = 0.0
@@ -41,7 +45,7 @@ class Holding(BaseModel):
 
 
 class Account(BaseModel):
-    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, frozen=True)
     id: str = ""
     name: str = ""
     nickname: str | None = None
@@ -53,13 +57,13 @@ class Account(BaseModel):
     margin_interest_rate: float | None = None
     currency: str = "USD"
     supports_trading: bool = False
-    holdings: List[Holding] = Field(default_factory=list)
+    holdings: tuple[Holding, ...] = ()
 
 
 class Portfolio(BaseModel):
-    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, frozen=True)
     user_id: str = ""
-    accounts: List[Account] = Field(default_factory=list)
+    accounts: tuple[Account, ...] = ()
     total_balance: float = 0.0
     total_gain_loss: float = 0.0
     total_gain_loss_percent: float = 0.0
@@ -89,7 +93,7 @@ class AccountBalanceSnapshot(BaseModel):
 
 
 class RecurringInvestment(BaseModel):
-    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, frozen=True)
     symbol: str = ""
     account_id: str = ""
     account_name: str = ""
@@ -104,14 +108,14 @@ class RecurringInvestment(BaseModel):
 
 
 class DividendIncomeTotal(BaseModel):
-    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, frozen=True)
     currency: str = "USD"
     annual_income: float = 0.0
     monthly_income: float = 0.0
 
 
 class DividendIncomeAccount(BaseModel):
-    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, frozen=True)
     account_id: str = ""
     account_name: str = ""
     currency: str = "USD"
@@ -122,7 +126,7 @@ class DividendIncomeAccount(BaseModel):
 
 
 class DividendIncomeSymbol(BaseModel):
-    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, frozen=True)
     symbol: str = ""
     account_id: str = ""
     account_name: str = ""
@@ -138,12 +142,12 @@ class DividendIncomeSymbol(BaseModel):
 
 
 class DividendIncomeSummary(BaseModel):
-    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, frozen=True)
     user_id: str = ""
     lookback_days: int = 365
-    totals: List[DividendIncomeTotal] = Field(default_factory=list)
-    accounts: List[DividendIncomeAccount] = Field(default_factory=list)
-    symbols: List[DividendIncomeSymbol] = Field(default_factory=list)
+    totals: tuple[DividendIncomeTotal, ...] = ()
+    accounts: tuple[DividendIncomeAccount, ...] = ()
+    symbols: tuple[DividendIncomeSymbol, ...] = ()
     payment_count: int = 0
     last_payment_date: str | None = None
     source: str = "average_historical_payout_current_holdings"
@@ -56,3 +56,41 @@ class StockHistoricalData(BaseModel):
     close: float = 0.0
     volume: int = 0
     adjusted_close: float | None = None
+
+
+class StockIndicators(BaseModel):
+    """Indicator outputs keyed by spec (e.g. "macd:12:26:9") then output name; None during warm-up."""
+
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    symbol: str = ""
+    interval: str = ""
+    dates: list[datetime] = []
+    indicators: dict[str, dict[str, list[float | None]]] = {}
+
+
+class StockFundamentals(BaseModel):
+    """One stored screener row; `range_position` is 0 at the 52-week low and 1 at the high."""
+
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True, from_attributes=True)
+    symbol: str = ""
+    name: str | None = None
+    exchange: str | None = None
+    sector: str | None = None
+    industry: str | None = None
+    price: float | None = None
+    market_cap: float | None = None
+    pe_ratio: float | None = None
+    dividend_yield: float | None = None
+    high_52_week: float | None = None
+    low_52_week: float | None = None
+    range_position: float | None = None
+    average_volume: int | None = None
+    updated_at: datetime | None = None
+
+
+class ScreenerResult(BaseModel):
+    model_config = ConfigDict(alias_generator=_to_camel, populate_by_name=True)
+    total: int = 0
+    limit: int = 0
+    offset: int = 0
+    items: list[StockFundamentals] = []
@@ -0,0 +1,167 @@
+"""Cross-symbol analytics over watchlists, portfolios or ad-hoc symbol lists."""
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import get_db
+from db_models import AppUser, WatchlistItem
+from models.analytics_models import DcaBacktestRequest, DcaVariant
+from models.common import ApiResponse, json_response
+from routers.persistence import _current_user, _ensure_watchlist, _text_eq
+from services import analytics_service as analytics_svc
+from services import dca_backtest as dca_svc
+from services import recurring_buy_service as recurring_buy_svc
+from services import snaptrade_service as snaptrade_svc
+from services import stock_data_service as stock_svc
+from services import user_service as user_svc
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+async def _source_symbols(
+    user: AppUser,
+    db: Session,
+    symbols: str | None,
+    watchlist_id: str | None,
+    use_portfolio: bool,
+) -> list[str]:
+    if sum(bool(source) for source in (symbols, watchlist_id, use_portfolio)) != 1:
+        raise ValueError("Pass exactly one of symbols, watchlistId or portfolio=true")
+    if symbols:
+        return [symbol for symbol in symbols.split(",") if symbol.strip()]
+    if watchlist_id:
+        watchlist = _ensure_watchlist(db, user.id, watchlist_id)
+        return list(db.scalars(select(WatchlistItem.symbol).where(_text_eq(WatchlistItem.watchlist_id, watchlist.id))))
+    user_secret = await user_svc.get_user_secret(user.id)
+    if not user_secret:
+        raise HTTPException(status_code=404, detail="No SnapTrade connection found. Please connect your account first.")
+    portfolio = await snaptrade_svc.get_portfolio(user.id, user_secret)
+    return [holding.symbol for account in portfolio.accounts for holding in account.holdings if holding.quantity]
+
+
+@router.get("/correlation")
+async def get_correlation(
+    symbols: str | None = None,
+    watchlist_id: str | None = Query(None, alias="watchlistId"),
+    portfolio: bool = False,
+    period: str = "1y",
+    user: AppUser = Depends(_current_user),
+    db: Session = Depends(get_db),
+):
+    """Correlation and covariance matrices of daily returns for a symbol list, watchlist or portfolio."""
+    try:
+        wanted = await _source_symbols(user, db, symbols, watchlist_id, portfolio)
+        matrix, errors = await analytics_svc.correlation_matrix(wanted, period)
+        return json_response(
+            ApiResponse(
+                success=True,
+                data=matrix,
+                errors=[f"{symbol}: {message}" for symbol, message in errors.items()] or None,
+            )
+        )
+    except HTTPException as ex:
+        return json_response(status_code=ex.status_code, content=ApiResponse(success=False, message=str(ex.detail)))
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
+            status_code=503,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+    except snaptrade_svc.SnapTradeServiceError as ex:
+        return json_response(status_code=ex.status_code, content=ApiResponse(success=False, message=str(ex)))
+    except Exception as ex:
+        logger.exception("Error computing correlation matrix")
+        return json_response(
+            status_code=400,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+
+
+@router.get("/portfolio-risk")
+async def get_portfolio_risk(
+    benchmark: str = analytics_svc.DEFAULT_BENCHMARK,
+    period: str = "1y",
+    confidence: float = 0.95,
+    user: AppUser = Depends(_current_user),
+):
+    """Volatility, beta, VaR and max drawdown of the signed-in user's SnapTrade holdings."""
+    try:
+        user_secret = await user_svc.get_user_secret(user.id)
+        if not user_secret:
+            raise HTTPException(status_code=404, detail="No SnapTrade connection found. Please connect your account first.")
+        portfolio = await snaptrade_svc.get_portfolio(user.id, user_secret)
+        risk, errors = await analytics_svc.portfolio_risk(user.id, portfolio, benchmark, period, confidence)
+        return json_response(
+            ApiResponse(
+                success=True,
+                data=risk,
+                errors=[f"{symbol}: {message}" for symbol, message in errors.items()] or None,
+            )
+        )
+    except HTTPException as ex:
+        return json_response(status_code=ex.status_code, content=ApiResponse(success=False, message=str(ex.detail)))
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
+            status_code=503,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+    except snaptrade_svc.SnapTradeServiceError as ex:
+        return json_response(status_code=ex.status_code, content=ApiResponse(success=False, message=str(ex)))
+    except Exception as ex:
+        logger.exception("Error computing portfolio risk")
+        return json_response(
+            status_code=400,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+
+
+@router.post("/dca-backtest")
+async def run_dca_backtest(body: DcaBacktestRequest, user: AppUser = Depends(_current_user)):
+    """Replay recurring-buy variants (and optionally a saved schedule's rule) on historical daily bars."""
+    try:
+        symbol = body.symbol
+        variants = list(body.variants)
+        if body.schedule_id:
+            schedules = await recurring_buy_svc.list_schedules(user.id)
+            schedule = next((item for item in schedules if item.id == body.schedule_id), None)
+            if schedule is None:
+                raise HTTPException(status_code=404, detail="Recurring buy schedule not found")
+            symbol = schedule.symbol
+            variants.insert(
+                0,
+                DcaVariant(
+                    frequency=schedule.frequency,
+                    units=schedule.units,
+                    target_amount=schedule.target_amount,
+                    label="schedule",
+                ),
+            )
+        result = await dca_svc.backtest(symbol or "", variants, body.start_date, body.end_date)
+        return json_response(ApiResponse(success=True, data=result))
+    except HTTPException as ex:
+        return json_response(status_code=ex.status_code, content=ApiResponse(success=False, message=str(ex.detail)))
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
+            status_code=503,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+    except Exception as ex:
+        logger.exception("Error running DCA backtest")
+        return json_response(
+            status_code=400,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
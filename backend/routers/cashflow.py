@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from db_models import AppUser, CashflowEntry
 from models.cashflow_models import CashflowEntryCreate, CashflowEntryUpdate
-from models.common import ApiResponse
+from models.common import ApiResponse, json_response
 from routers.persistence import _current_user
 
 router = APIRouter(prefix="/cashflow", tags=["cashflow"])
@@ -78,7 +78,7 @@ async def get_entries(
         )
         .order_by(CashflowEntry.date.desc(), CashflowEntry.created_at.desc())
     ).all()
-    return ApiResponse(success=True, data=[_entry_row(entry) for entry in entries]).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=[_entry_row(entry) for entry in entries]))
 
 
 @router.post("/entries", status_code=status.HTTP_201_CREATED)
@@ -104,7 +104,7 @@ async def create_entry(
     db.add(entry)
     db.commit()
     db.refresh(entry)
-    return ApiResponse(success=True, data=_entry_row(entry)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_entry_row(entry)), status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/entries/{entry_id}")
@@ -142,7 +142,7 @@ async def update_entry(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="category is required")
     db.commit()
     db.refresh(entry)
-    return ApiResponse(success=True, data=_entry_row(entry)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_entry_row(entry)))
 
 
 @router.delete("/entries/{entry_id}")
@@ -162,4 +162,4 @@ async def delete_entry(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entry not found")
     entry.removed_at = _now()
     db.commit()
-    return ApiResponse(success=True).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True))
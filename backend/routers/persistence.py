@@ -14,12 +14,13 @@ import jwt
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
 from sqlalchemy import String, cast, delete as sql_delete, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
 from database import get_db
 from db_models import AppUser, Asset, Loan, PasswordResetToken, SigninOtp, Watchlist, WatchlistItem
 from services import email_service
-from models.common import ApiResponse
+from services import stock_data_service as stock_svc
+from models.common import ApiResponse, json_response
 
 logger = logging.getLogger(__name__)
 from models.persistence_models import (
@@ -121,6 +122,8 @@ def _create_access_token(user: AppUser) -> str:
 
 
 def _set_auth_cookie(response: Response, token: str) -> None:
+    # FastAPI only copies cookies off the injected Response when the endpoint returns
+    # plain data, so routes that call this return a dict rather than json_response().
     response.set_cookie(
         "access_token",
         token,
@@ -252,7 +255,9 @@ async def signup(payload: AuthCredentials, request: Request, background_tasks: B
     db.add(SigninOtp(user_id=user.id, code_hash=_token_hash(code), expires_at=_now() + timedelta(minutes=OTP_EXPIRE_MINUTES)))
     db.commit()
     background_tasks.add_task(email_service.send_otp_email, user.email, code)
-    return ApiResponse(success=True, data={"pendingUserId": user.id}).model_dump(by_alias=True)
+    return json_response(
+        ApiResponse(success=True, data={"pendingUserId": user.id}), status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.post("/auth/signin")
@@ -282,7 +287,7 @@ async def signin(
     db.add(SigninOtp(user_id=user.id, code_hash=_token_hash(code), expires_at=_now() + timedelta(minutes=OTP_EXPIRE_MINUTES)))
     db.commit()
     background_tasks.add_task(email_service.send_otp_email, user.email, code)
-    return ApiResponse(success=True, data={"pendingUserId": user.id}).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data={"pendingUserId": user.id}))
 
 
 @router.post("/auth/verify-otp")
@@ -318,7 +323,7 @@ async def resend_otp(payload: OtpResend, request: Request, background_tasks: Bac
         db.add(SigninOtp(user_id=user.id, code_hash=_token_hash(code), expires_at=_now() + timedelta(minutes=OTP_EXPIRE_MINUTES)))
         db.commit()
         background_tasks.add_task(email_service.send_otp_email, user.email, code)
-    return ApiResponse(success=True, message="If a pending sign-in exists, a new code has been sent.").model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, message="If a pending sign-in exists, a new code has been sent."))
 
 
 @router.post("/auth/signout")
@@ -335,7 +340,7 @@ async def signout(request: Request, response: Response, db: Session = Depends(ge
 
 @router.get("/auth/me")
 async def me(user: AppUser = Depends(_current_user)):
-    return ApiResponse(success=True, data={"user": _user_row(user)}).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data={"user": _user_row(user)}))
 
 
 @router.post("/auth/request-password-reset")
@@ -365,8 +370,8 @@ async def request_password_reset(
         data = {"resetToken": reset_token}
     else:
         data = None
-    return ApiResponse(success=True, data=data, message="If that email exists, a reset link will be sent.").model_dump(
-        by_alias=True
+    return json_response(
+        ApiResponse(success=True, data=data, message="If that email exists, a reset link will be sent.")
     )
 
 
@@ -392,13 +397,13 @@ async def reset_password(payload: PasswordResetConfirm, request: Request, db: Se
     user.otp_verified_until = None
     row.used_at = _now()
     db.commit()
-    return ApiResponse(success=True, message="Password reset successfully").model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, message="Password reset successfully"))
 
 
 @router.get("/loans")
 async def get_loans(user: AppUser = Depends(_current_user), db: Session = Depends(get_db)):
     loans = db.scalars(select(Loan).where(_text_eq(Loan.user_id, user.id)).order_by(Loan.created_at.desc())).all()
-    return ApiResponse(success=True, data=[_loan_row(loan) for loan in loans]).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=[_loan_row(loan) for loan in loans]))
 
 
 @router.post("/loans", status_code=status.HTTP_201_CREATED)
@@ -418,7 +423,7 @@ async def create_loan(payload: LoanCreate, user: AppUser = Depends(_current_user
         db.add(loan)
         db.commit()
         db.refresh(loan)
-        return ApiResponse(success=True, data=_loan_row(loan)).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=_loan_row(loan)), status_code=status.HTTP_201_CREATED)
     except Exception:
         db.rollback()
         logger.exception("create_loan failed for user_id=%s payload=%s", user.id, payload.model_dump())
@@ -439,7 +444,7 @@ async def update_loan(
         setattr(loan, key, value.strip() if isinstance(value, str) else value)
     db.commit()
     db.refresh(loan)
-    return ApiResponse(success=True, data=_loan_row(loan)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_loan_row(loan)))
 
 
 @router.delete("/loans/{loan_id}")
@@ -449,13 +454,13 @@ async def delete_loan(loan_id: str, user: AppUser = Depends(_current_user), db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Loan not found")
     db.delete(loan)
     db.commit()
-    return ApiResponse(success=True).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True))
 
 
 @router.get("/assets")
 async def get_assets(user: AppUser = Depends(_current_user), db: Session = Depends(get_db)):
     assets = db.scalars(select(Asset).where(_text_eq(Asset.user_id, user.id)).order_by(Asset.created_at.desc())).all()
-    return ApiResponse(success=True, data=[_asset_row(asset) for asset in assets]).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=[_asset_row(asset) for asset in assets]))
 
 
 @router.post("/assets", status_code=status.HTTP_201_CREATED)
@@ -477,7 +482,7 @@ async def create_asset(payload: AssetCreate, user: AppUser = Depends(_current_us
     db.add(asset)
     db.commit()
     db.refresh(asset)
-    return ApiResponse(success=True, data=_asset_row(asset)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_asset_row(asset)), status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/assets/{asset_id}")
@@ -501,7 +506,7 @@ async def update_asset(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Asset type is required")
     db.commit()
     db.refresh(asset)
-    return ApiResponse(success=True, data=_asset_row(asset)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_asset_row(asset)))
 
 
 @router.delete("/assets/{asset_id}")
@@ -511,7 +516,7 @@ async def delete_asset(asset_id: str, user: AppUser = Depends(_current_user), db
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
     db.delete(asset)
     db.commit()
-    return ApiResponse(success=True).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True))
 
 
 @router.get("/watchlists")
@@ -521,8 +526,50 @@ async def get_watchlists(user: AppUser = Depends(_current_user), db: Session = D
         .where(_text_eq(Watchlist.user_id, user.id))
         .order_by(Watchlist.is_default.desc(), Watchlist.created_at.asc())
     ).all()
-    return ApiResponse(success=True, data=[_watchlist_row(watchlist) for watchlist in watchlists]).model_dump(
-        by_alias=True
+    return json_response(ApiResponse(success=True, data=[_watchlist_row(watchlist) for watchlist in watchlists]))
+
+
+@router.get("/watchlists/board")
+async def get_watchlist_board(user: AppUser = Depends(_current_user), db: Session = Depends(get_db)):
+    """Every watchlist with its items and live quotes: one joined query, one batched quote lookup."""
+    watchlists = db.scalars(
+        select(Watchlist)
+        .options(joinedload(Watchlist.items))
+        .where(_text_eq(Watchlist.user_id, user.id))
+        .order_by(Watchlist.is_default.desc(), Watchlist.created_at.asc())
+    ).unique().all()
+    items_by_list = {
+        watchlist.id: sorted(watchlist.items, key=lambda item: item.added_date) for watchlist in watchlists
+    }
+    symbols = list(dict.fromkeys(item.symbol for items in items_by_list.values() for item in items))
+    quotes: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+    if symbols:
+        try:
+            found, errors = await stock_svc.get_quote_batch(symbols)
+            quotes = {quote.symbol.upper(): quote.model_dump(mode="json", by_alias=True) for quote in found}
+        except (
+            stock_svc.StockDataConfigurationError,
+            stock_svc.StockDataRateLimitError,
+            stock_svc.StockDataUnavailableError,
+        ) as ex:
+            errors = {symbol: str(ex) for symbol in symbols}
+    board = [
+        {
+            **_watchlist_row(watchlist),
+            "items": [
+                {**_watchlist_item_row(item), "quote": quotes.get(item.symbol.upper())}
+                for item in items_by_list[watchlist.id]
+            ],
+        }
+        for watchlist in watchlists
+    ]
+    return json_response(
+        ApiResponse(
+            success=True,
+            data=board,
+            errors=[f"{symbol}: {message}" for symbol, message in errors.items()] or None,
+        )
     )
 
 
@@ -543,7 +590,7 @@ async def create_watchlist(
     db.add(watchlist)
     db.commit()
     db.refresh(watchlist)
-    return ApiResponse(success=True, data=_watchlist_row(watchlist)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_watchlist_row(watchlist)), status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/watchlists/{watchlist_id}")
@@ -563,7 +610,7 @@ async def update_watchlist(
         setattr(watchlist, key, value.strip() if isinstance(value, str) else value)
     db.commit()
     db.refresh(watchlist)
-    return ApiResponse(success=True, data=_watchlist_row(watchlist)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_watchlist_row(watchlist)))
 
 
 @router.delete("/watchlists/{watchlist_id}")
@@ -574,7 +621,7 @@ async def delete_watchlist(
 ):
     db.delete(_ensure_watchlist(db, user.id, watchlist_id))
     db.commit()
-    return ApiResponse(success=True).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True))
 
 
 @router.get("/watchlists/{watchlist_id}/items")
@@ -589,7 +636,7 @@ async def get_watchlist_items(
         .where(_text_eq(WatchlistItem.watchlist_id, watchlist_id))
         .order_by(WatchlistItem.added_date.asc())
     ).all()
-    return ApiResponse(success=True, data=[_watchlist_item_row(item) for item in items]).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=[_watchlist_item_row(item) for item in items]))
 
 
 @router.post("/watchlists/{watchlist_id}/items", status_code=status.HTTP_201_CREATED)
@@ -610,7 +657,7 @@ async def create_watchlist_item(
         db.commit()
     except IntegrityError:
         db.rollback()
-    return ApiResponse(success=True).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True), status_code=status.HTTP_201_CREATED)
 
 
 @router.delete("/watchlists/{watchlist_id}/items/{symbol}")
@@ -630,4 +677,4 @@ async def delete_watchlist_item(
     if item:
         db.delete(item)
         db.commit()
-    return ApiResponse(success=True).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True))
@@ -3,15 +3,14 @@ import logging
 
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from database import get_db
 from db_models import AppUser, CashflowEntry, PlaidAccount, PlaidItem
 from models.cashflow_models import PlaidPublicTokenExchange, PlaidSyncRequest
-from models.common import ApiResponse
+from models.common import ApiResponse, json_response
 from routers.persistence import _current_user
 from services import plaid_service
 
@@ -23,13 +22,13 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _error_response(exc: Exception) -> JSONResponse:
+def _error_response(exc: Exception) -> Response:
     status_code = getattr(exc, "status_code", 400)
     if isinstance(exc, plaid_service.PlaidConfigurationError):
         status_code = 503
-    return JSONResponse(
+    return json_response(
         status_code=status_code,
-        content=ApiResponse(success=False, message=str(exc)).model_dump(by_alias=True),
+        content=ApiResponse(success=False, message=str(exc)),
     )
 
 
@@ -37,7 +36,7 @@ def _error_response(exc: Exception) -> JSONResponse:
 async def create_link_token(user: AppUser = Depends(_current_user)):
     try:
         link_token = await plaid_service.create_link_token(user.id)
-        return ApiResponse(success=True, data={"linkToken": link_token}).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data={"linkToken": link_token}))
     except Exception as exc:
         logger.warning("Plaid link token failed: %s", exc)
         return _error_response(exc)
@@ -57,7 +56,7 @@ async def exchange_public_token(
             institution_id=payload.institution_id,
             institution_name=payload.institution_name,
         )
-        return ApiResponse(success=True, data=data).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=data))
     except Exception as exc:
         logger.warning("Plaid public token exchange failed: %s", exc)
         return _error_response(exc)
@@ -71,7 +70,7 @@ async def sync_plaid(
 ):
     try:
         data = await plaid_service.sync_user_items(db, user.id, auto=bool(payload and payload.auto))
-        return ApiResponse(success=True, data=data).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=data))
     except Exception as exc:
         logger.warning("Plaid sync failed: %s", exc)
         return _error_response(exc)
@@ -84,9 +83,7 @@ async def get_accounts(user: AppUser = Depends(_current_user), db: Session = Dep
         .where(PlaidAccount.user_id == user.id, PlaidAccount.hidden.is_(False))
         .order_by(PlaidAccount.type.asc(), PlaidAccount.name.asc())
     ).all()
-    return ApiResponse(success=True, data=[plaid_service.account_row(account) for account in accounts]).model_dump(
-        by_alias=True
-    )
+    return json_response(ApiResponse(success=True, data=[plaid_service.account_row(account) for account in accounts]))
 
 
 @router.patch("/accounts/{account_id}/hide")
@@ -117,10 +114,12 @@ async def hide_account_locally(
     for entry in entries:
         entry.removed_at = removed_at
     db.commit()
-    return ApiResponse(
-        success=True,
-        data={"accountId": account.id, "hidden": True, "removedEntries": len(entries)},
-    ).model_dump(by_alias=True)
+    return json_response(
+        ApiResponse(
+            success=True,
+            data={"accountId": account.id, "hidden": True, "removedEntries": len(entries)},
+        )
+    )
 
 
 @router.delete("/accounts/{account_id}")
@@ -169,8 +168,8 @@ async def disconnect_account_connection(
             entry.removed_at = removed_at
         db.delete(item)
         db.commit()
-        return ApiResponse(success=True, data={"accountId": account.id, "removedAccounts": len(accounts), "removedEntries": len(entries)}).model_dump(
-            by_alias=True
+        return json_response(
+            ApiResponse(success=True, data={"accountId": account.id, "removedAccounts": len(accounts), "removedEntries": len(entries)})
         )
     except HTTPException:
         raise
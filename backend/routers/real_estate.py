@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from db_models import AppUser, RealEstateProperty
-from models.common import ApiResponse
+from models.common import ApiResponse, json_response
 from models.real_estate_models import RealEstatePropertyCreate, RealEstatePropertyUpdate
 from routers.persistence import _current_user, _text_eq
 from services import real_estate_service
@@ -82,12 +82,12 @@ async def search_listings(
         db=db,
         refresh=refresh,
     )
-    return ApiResponse(success=True, data=result).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=result))
 
 
 @router.get("/usage")
 async def get_usage(user: AppUser = Depends(_current_user), db: Session = Depends(get_db)):
-    return ApiResponse(success=True, data=real_estate_service.usage_summary(db)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=real_estate_service.usage_summary(db)))
 
 
 @router.get("/properties")
@@ -97,7 +97,7 @@ async def get_properties(user: AppUser = Depends(_current_user), db: Session = D
         .where(_text_eq(RealEstateProperty.user_id, user.id))
         .order_by(RealEstateProperty.created_at.desc())
     ).all()
-    return ApiResponse(success=True, data=[_property_row(prop) for prop in properties]).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=[_property_row(prop) for prop in properties]))
 
 
 @router.post("/properties", status_code=status.HTTP_201_CREATED)
@@ -140,7 +140,7 @@ async def create_property(
         db.add(prop)
         db.commit()
         db.refresh(prop)
-        return ApiResponse(success=True, data=_property_row(prop)).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=_property_row(prop)), status_code=status.HTTP_201_CREATED)
     except Exception:
         db.rollback()
         logger.exception("create_property failed for user_id=%s", user.id)
@@ -166,7 +166,7 @@ async def update_property(
         setattr(prop, key, value.strip() if isinstance(value, str) else value)
     db.commit()
     db.refresh(prop)
-    return ApiResponse(success=True, data=_property_row(prop)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_property_row(prop)))
 
 
 @router.delete("/properties/{property_id}")
@@ -181,4 +181,4 @@ async def delete_property(property_id: str, user: AppUser = Depends(_current_use
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
     db.delete(prop)
     db.commit()
-    return ApiResponse(success=True).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True))
@@ -2,13 +2,13 @@
 import logging
 import os
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
 from database import get_db
 from db_models import AppUser
-from models.common import ApiResponse
+from models.common import ApiResponse, json_response
 from models.snaptrade_models import (
     AccountPreferenceUpdate,
     DividendFrequencyPreferenceUpdate,
@@ -62,10 +62,10 @@ async def _forget_invalid_secret(user_id: str) -> None:
     snaptrade_svc.clear_user_cache(user_id)
 
 
-def _auth_error_response(ex: HTTPException) -> JSONResponse:
-    return JSONResponse(
+def _auth_error_response(ex: HTTPException) -> Response:
+    return json_response(
         status_code=ex.status_code,
-        content=ApiResponse(success=False, message=str(ex.detail)).model_dump(by_alias=True),
+        content=ApiResponse(success=False, message=str(ex.detail)),
     )
 
 
@@ -113,27 +113,18 @@ async def _apply_account_preferences(user_id: str, portfolio: Portfolio) -> Port
         preference = preferences.get(account.id, {})
         if preference.get("hidden"):
             continue
+        update: dict[str, object] = {}
         nickname = preference.get("nickname")
         if isinstance(nickname, str) and nickname.strip():
-            account.nickname = nickname.strip()
+            update["nickname"] = nickname.strip()
         margin_balance = preference.get("margin_balance")
         if isinstance(margin_balance, (int, float)):
-            account.margin_balance = max(0, float(margin_balance))
+            update["margin_balance"] = max(0, float(margin_balance))
         margin_interest_rate = preference.get("margin_interest_rate")
         if isinstance(margin_interest_rate, (int, float)):
-            account.margin_interest_rate = max(0, float(margin_interest_rate))
-        visible_accounts.append(account)
-
-    portfolio.accounts = visible_accounts
-    portfolio.total_balance = sum(account.balance or 0 for account in visible_accounts)
-    portfolio.total_gain_loss = sum(sum(holding.gain_loss for holding in account.holdings) for account in visible_accounts)
-    portfolio.total_gain_loss_percent = (
-        (portfolio.total_gain_loss / (portfolio.total_balance - portfolio.total_gain_loss) * 100)
-        if (portfolio.total_balance - portfolio.total_gain_loss)
-        else 0
-    )
-    portfolio.currency = visible_accounts[0].currency if visible_accounts else portfolio.currency
-    return portfolio
+            update["margin_interest_rate"] = max(0, float(margin_interest_rate))
+        visible_accounts.append(account.model_copy(update=update) if update else account)
+    return snaptrade_svc.portfolio_view(portfolio, visible_accounts)
 
 
 @router.post("/user")
@@ -143,12 +134,12 @@ async def create_user(request: Request, current_user: AppUser | None = Depends(_
         snaptrade_user = await snaptrade_svc.create_user(user_id)
         if snaptrade_user.user_secret:
             await user_svc.store_user_secret(user_id, snaptrade_user.user_secret)
-        return ApiResponse(success=True, message="User created successfully").model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, message="User created successfully"))
     except Exception as ex:
         logger.exception("Error creating SnapTrade user")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -177,19 +168,19 @@ async def initiate_connection(
             user_id, user_secret, redirect_uri, connection_type=connection_type
         )
         if not login_link:
-            return JSONResponse(
+            return json_response(
                 status_code=400,
                 content=ApiResponse(
                     success=False,
                     message="Failed to get redirect URL from SnapTrade",
-                ).model_dump(by_alias=True),
+                ),
             )
-        return ApiResponse(success=True, data={"redirectUri": login_link}).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data={"redirectUri": login_link}))
     except Exception as ex:
         logger.exception("Error initiating connection")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -204,39 +195,39 @@ async def get_portfolio(
         user_id = _get_user_id(request, current_user)
         user_secret = await user_svc.get_user_secret(user_id)
         if not user_secret:
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message="User not found. Please connect your account first.",
-                ).model_dump(by_alias=True),
+                ),
             )
         portfolio = await snaptrade_svc.get_portfolio(user_id, user_secret, force_refresh=refresh)
         portfolio = await _apply_account_preferences(user_id, portfolio)
         portfolio_snapshot_svc.save_daily_snapshot(db, user_id, portfolio)
-        return ApiResponse(success=True, data=portfolio).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=portfolio))
     except snaptrade_svc.SnapTradeServiceError as ex:
         logger.warning("SnapTrade portfolio request failed: %s", ex)
         if _is_invalid_secret_error(ex):
             await _forget_invalid_secret(user_id)
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message="Your brokerage connection is no longer valid (the SnapTrade account changed). Please reconnect.",
-                ).model_dump(by_alias=True),
+                ),
             )
-        return JSONResponse(
+        return json_response(
             status_code=ex.status_code,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error fetching portfolio")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -249,14 +240,14 @@ async def get_portfolio_snapshots(
     try:
         user_id = _get_user_id(request, current_user)
         snapshots = portfolio_snapshot_svc.get_snapshots(db, user_id)
-        return ApiResponse(success=True, data=snapshots).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=snapshots))
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error fetching portfolio snapshots")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -293,22 +284,22 @@ async def get_portfolio_value_history(
         message = None
         if not history and failures:
             message = "Your plan may not include balance history: " + "; ".join(sorted(set(failures)))
-        return ApiResponse(success=True, data=history, message=message).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=history, message=message))
     except snaptrade_svc.SnapTradeServiceError as ex:
         if _is_invalid_secret_error(ex):
             await _forget_invalid_secret(user_id)
-            return JSONResponse(
+            return json_response(
                 status_code=404,
-                content=ApiResponse(success=False, message="Your brokerage connection is no longer valid. Please reconnect.").model_dump(by_alias=True),
+                content=ApiResponse(success=False, message="Your brokerage connection is no longer valid. Please reconnect."),
             )
-        return JSONResponse(status_code=ex.status_code, content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True))
+        return json_response(status_code=ex.status_code, content=ApiResponse(success=False, message=str(ex)))
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error fetching portfolio value history")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -322,14 +313,14 @@ async def get_account_snapshots(
     try:
         user_id = _get_user_id(request, current_user)
         snapshots = portfolio_snapshot_svc.get_account_snapshots(db, user_id, account_id)
-        return ApiResponse(success=True, data=snapshots).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=snapshots))
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error fetching account snapshots")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -339,20 +330,20 @@ async def get_accounts(request: Request, current_user: AppUser | None = Depends(
         user_id = _get_user_id(request, current_user)
         user_secret = await user_svc.get_user_secret(user_id)
         if not user_secret:
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message="User not found. Please connect your account first.",
-                ).model_dump(by_alias=True),
+                ),
             )
         accounts = await snaptrade_svc.get_accounts(user_id, user_secret)
-        return ApiResponse(success=True, data=accounts).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=accounts))
     except Exception as ex:
         logger.exception("Error fetching accounts")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -366,12 +357,12 @@ async def get_recurring_investments(
         user_id = _get_user_id(request, current_user)
         user_secret = await user_svc.get_user_secret(user_id)
         if not user_secret:
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message="No SnapTrade connection found. Please connect your account first.",
-                ).model_dump(by_alias=True),
+                ),
             )
         portfolio = await snaptrade_svc.get_portfolio(user_id, user_secret, force_refresh=refresh)
         visible_portfolio = await _apply_account_preferences(user_id, portfolio)
@@ -383,20 +374,20 @@ async def get_recurring_investments(
         )
         recurring_preferences = await recurring_pref_svc.get_preferences(user_id)
         recurring = recurring_pref_svc.apply_preferences(recurring, recurring_preferences)
-        return ApiResponse(success=True, data=recurring).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=recurring))
     except snaptrade_svc.SnapTradeServiceError as ex:
         logger.warning("SnapTrade recurring investments request failed: %s", ex)
-        return JSONResponse(
+        return json_response(
             status_code=ex.status_code,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error fetching recurring investments")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -418,19 +409,19 @@ async def update_recurring_investment_preference(
             frequency=payload.frequency,
             hidden=payload.hidden,
         )
-        return ApiResponse(success=True, data=preference).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=preference))
     except ValueError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error updating recurring investment preference")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -450,19 +441,19 @@ async def hide_recurring_investment_preference(
             currency=payload.currency,
             hidden=True,
         )
-        return ApiResponse(success=True, data=preference).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=preference))
     except ValueError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error hiding recurring investment preference")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -477,19 +468,19 @@ async def clear_recurring_investment_preferences(
         await _assert_account_owned_by_user(user_id, account_id)
         result = await recurring_pref_svc.clear_account_preferences(user_id, account_id)
         snaptrade_svc.clear_recurring_investments_cache(user_id)
-        return ApiResponse(success=True, data=result).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=result))
     except ValueError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error clearing recurring investment preferences")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -503,12 +494,12 @@ async def get_dividend_income(
         user_id = _get_user_id(request, current_user)
         user_secret = await user_svc.get_user_secret(user_id)
         if not user_secret:
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message="No SnapTrade connection found. Please connect your account first.",
-                ).model_dump(by_alias=True),
+                ),
             )
         portfolio = await snaptrade_svc.get_portfolio(user_id, user_secret, force_refresh=refresh)
         visible_portfolio = await _apply_account_preferences(user_id, portfolio)
@@ -520,20 +511,20 @@ async def get_dividend_income(
             force_refresh=refresh,
             frequency_overrides=frequency_overrides,
         )
-        return ApiResponse(success=True, data=dividend_income).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=dividend_income))
     except snaptrade_svc.SnapTradeServiceError as ex:
         logger.warning("SnapTrade dividend income request failed: %s", ex)
-        return JSONResponse(
+        return json_response(
             status_code=ex.status_code,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error fetching dividend income")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -555,17 +546,17 @@ async def update_dividend_income_preference(
             hidden=payload.hidden,
         )
         snaptrade_svc.clear_user_cache(user_id)
-        return ApiResponse(success=True, data=preference).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=preference))
     except ValueError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except Exception as ex:
         logger.exception("Error updating dividend income preference")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -587,17 +578,17 @@ async def hide_dividend_income_preference(
             hidden=True,
         )
         snaptrade_svc.clear_user_cache(user_id)
-        return ApiResponse(success=True, data=preference).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=preference))
     except ValueError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except Exception as ex:
         logger.exception("Error hiding dividend income preference")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -615,14 +606,14 @@ async def clear_dividend_income_preferences(
         ]
         result = await dividend_pref_svc.clear_preferences(user_id, symbols=symbols)
         snaptrade_svc.clear_user_cache(user_id)
-        return ApiResponse(success=True, data=result).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=result))
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error clearing dividend income preferences")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -645,12 +636,12 @@ async def update_account_preference(
             hidden=payload.hidden,
         )
         snaptrade_svc.clear_user_cache(user_id)
-        return ApiResponse(success=True, data=preference).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=preference))
     except Exception as ex:
         logger.exception("Error updating account preference")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -665,12 +656,12 @@ async def hide_account(
         await _assert_account_owned_by_user(user_id, account_id)
         preference = await account_pref_svc.hide_account(user_id, account_id)
         snaptrade_svc.clear_user_cache(user_id)
-        return ApiResponse(success=True, data=preference).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=preference))
     except Exception as ex:
         logger.exception("Error hiding account")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -684,20 +675,20 @@ async def get_account_holdings(
         user_id = _get_user_id(request, current_user)
         user_secret = await user_svc.get_user_secret(user_id)
         if not user_secret:
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message="User not found. Please connect your account first.",
-                ).model_dump(by_alias=True),
+                ),
             )
         holdings = await snaptrade_svc.get_account_holdings(user_id, user_secret, account_id)
-        return ApiResponse(success=True, data=holdings).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=holdings))
     except Exception as ex:
         logger.exception("Error fetching holdings")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -737,19 +728,19 @@ async def check_order_impact(
             stop_price=payload.stop_price,
             notional_value=payload.notional_value,
         )
-        return ApiResponse(success=True, data=impact).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=impact))
     except snaptrade_svc.SnapTradeServiceError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=ex.status_code,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error checking order impact")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -784,19 +775,19 @@ async def place_order(
                 stop_price=payload.stop_price,
                 notional_value=payload.notional_value,
             )
-        return ApiResponse(success=True, data=execution, message="Order placed").model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=execution, message="Order placed"))
     except snaptrade_svc.SnapTradeServiceError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=ex.status_code,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error placing order")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -813,19 +804,19 @@ async def cancel_order(
         execution = await snaptrade_svc.cancel_order(
             user_id, user_secret, account_id, brokerage_order_id
         )
-        return ApiResponse(success=True, data=execution, message="Order cancelled").model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=execution, message="Order cancelled"))
     except snaptrade_svc.SnapTradeServiceError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=ex.status_code,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error cancelling order")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -837,14 +828,14 @@ async def list_recurring_buys(
     try:
         user_id = _get_user_id(request, current_user)
         schedules = await recurring_buy_svc.list_schedules(user_id)
-        return ApiResponse(success=True, data=schedules).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=schedules))
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error listing recurring buys")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -866,19 +857,19 @@ async def create_recurring_buy(
             target_amount=payload.target_amount,
             start_date=payload.start_date,
         )
-        return ApiResponse(success=True, data=schedule, message="Recurring buy created").model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=schedule, message="Recurring buy created"))
     except ValueError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error creating recurring buy")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -900,20 +891,20 @@ async def update_recurring_buy(
             next_run_date=payload.next_run_date,
             active=payload.active,
         )
-        return ApiResponse(success=True, data=schedule).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=schedule))
     except ValueError as ex:
         status = 404 if "not found" in str(ex).lower() else 400
-        return JSONResponse(
+        return json_response(
             status_code=status,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error updating recurring buy")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -926,19 +917,19 @@ async def delete_recurring_buy(
     try:
         user_id = _get_user_id(request, current_user)
         result = await recurring_buy_svc.delete_schedule(user_id, schedule_id)
-        return ApiResponse(success=True, data=result, message="Recurring buy removed").model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=result, message="Recurring buy removed"))
     except ValueError as ex:
-        return JSONResponse(
+        return json_response(
             status_code=404,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except HTTPException as ex:
         return _auth_error_response(ex)
     except Exception as ex:
         logger.exception("Error deleting recurring buy")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -946,15 +937,20 @@ async def delete_recurring_buy(
 async def get_brokerages():
     try:
         brokerages = await snaptrade_svc.get_brokerages()
-        return ApiResponse(success=True, data=brokerages).model_dump(by_alias=True)
+        return json_response(ApiResponse(success=True, data=brokerages))
     except Exception as ex:
         logger.exception("Error fetching brokerages")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
+@router.get("/stats")
+async def get_snaptrade_stats():
+    return json_response(ApiResponse(success=True, data={"executor": snaptrade_svc.executor_stats(), "cache": snaptrade_svc.cache_stats()}))
+
+
 @router.get("/callback")
 async def oauth_callback(code: str | None = None, state: str | None = None):
     target = os.getenv("SNAPTRADE_CALLBACK_REDIRECT", "http://localhost:4200/portfolio")
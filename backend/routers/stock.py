@@ -1,17 +1,27 @@
-"""Stock API routes - search, quote, details, historical, batch quotes."""
+"""Stock API routes - search, quote, details, historical, indicators, batch quotes, quote stream, screener."""
+import json
 import logging
 from typing import List
 
-from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 
-from models.common import ApiResponse
+from config import QUOTE_STREAM_HEARTBEAT_SECONDS
+from database import get_db
+
+from models.common import ApiResponse, json_response
 from models.stock_models import (
     StockDetails,
     StockHistoricalData,
     StockQuote,
     StockSearchResult,
 )
+from services import analytics_service as analytics_svc
+from services import fundamentals_service as fundamentals_svc
+from services import prefetch_service as prefetch_svc
+from services import indicators as indicator_svc
+from services import quote_stream
 from services import stock_data_service as stock_svc
 
 logger = logging.getLogger(__name__)
@@ -22,22 +32,26 @@ router = APIRouter(prefix="/stock", tags=["stock"])
 async def search_stocks(query: str = Query(..., alias="query")):
     try:
         if not (query or str(query).strip()):
-            return JSONResponse(
+            return json_response(
                 status_code=400,
-                content=ApiResponse(success=False, message="Query parameter is required").model_dump(by_alias=True),
+                content=ApiResponse(success=False, message="Query parameter is required"),
             )
         results = await stock_svc.search_stocks(str(query).strip())
-        return ApiResponse(success=True, data=results).model_dump(by_alias=True)
-    except stock_svc.StockDataConfigurationError as ex:
-        return JSONResponse(
+        return json_response(ApiResponse(success=True, data=results))
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
             status_code=503,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except Exception as ex:
         logger.exception("Error searching stocks")
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -46,24 +60,28 @@ async def get_stock_quote(symbol: str):
     try:
         quote = await stock_svc.get_stock_quote(symbol)
         if quote is None:
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message=f"Stock quote not found for symbol: {symbol}",
-                ).model_dump(by_alias=True),
+                ),
             )
-        return ApiResponse(success=True, data=quote).model_dump(by_alias=True)
-    except stock_svc.StockDataConfigurationError as ex:
-        return JSONResponse(
+        return json_response(ApiResponse(success=True, data=quote))
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
             status_code=503,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except Exception as ex:
         logger.exception("Error getting stock quote for symbol %s", symbol)
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -72,24 +90,28 @@ async def get_stock_details(symbol: str):
     try:
         details = await stock_svc.get_stock_details(symbol)
         if details is None:
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message=f"Stock details not found for symbol: {symbol}",
-                ).model_dump(by_alias=True),
+                ),
             )
-        return ApiResponse(success=True, data=details).model_dump(by_alias=True)
-    except stock_svc.StockDataConfigurationError as ex:
-        return JSONResponse(
+        return json_response(ApiResponse(success=True, data=details))
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
             status_code=503,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except Exception as ex:
         logger.exception("Error getting stock details for symbol %s", symbol)
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
 
@@ -97,50 +119,228 @@ async def get_stock_details(symbol: str):
 async def get_multiple_quotes(symbols: List[str]):
     try:
         if not symbols:
-            return JSONResponse(
+            return json_response(
                 status_code=400,
-                content=ApiResponse(success=False, message="Symbols list is required").model_dump(by_alias=True),
+                content=ApiResponse(success=False, message="Symbols list is required"),
+            )
+        quotes, errors = await stock_svc.get_quote_batch(symbols)
+        return json_response(
+            ApiResponse(
+                success=True,
+                data=quotes,
+                errors=[f"{symbol}: {message}" for symbol, message in errors.items()] or None,
             )
-        quotes = await stock_svc.get_multiple_stock_quotes(symbols)
-        return ApiResponse(success=True, data=quotes).model_dump(by_alias=True)
-    except stock_svc.StockDataConfigurationError as ex:
-        return JSONResponse(
+        )
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
             status_code=503,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except Exception as ex:
         logger.exception("Error getting multiple stock quotes")
-        return JSONResponse(
+        return json_response(
+            status_code=400,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+
+
+class _QuoteStreamResponse(StreamingResponse):
+    """Releases the stream's subscription however the response ends, even before the body starts."""
+
+    def __init__(self, subscription: quote_stream.Subscription, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            quote_stream.unsubscribe(self.subscription)
+
+
+@router.get("/stream")
+async def stream_quotes(request: Request, symbols: str = Query(..., alias="symbols")):
+    """Server-sent events: a `quotes` event with every changed quote, `: keepalive` comments in between."""
+    try:
+        subscription = quote_stream.subscribe(symbols.split(","))
+    except quote_stream.QuoteStreamFullError as ex:
+        return json_response(
+            status_code=503,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+    except ValueError as ex:
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
 
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(QUOTE_STREAM_HEARTBEAT_SECONDS)
+                if batch:
+                    payload = json.dumps([quote.model_dump(mode="json", by_alias=True) for quote in batch])
+                    yield f"event: quotes\ndata: {payload}\n\n"
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            quote_stream.unsubscribe(subscription)
+
+    return _QuoteStreamResponse(
+        subscription,
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.get("/historical/{symbol}")
 async def get_historical(
     symbol: str,
     interval: str = Query("1day", alias="interval"),
     output_size: int | None = Query(None, alias="outputSize"),
+    period: str | None = Query(None, alias="period"),
 ):
     try:
+        if period:
+            output_size = stock_svc.output_size_for_period(interval, period)
         data = await stock_svc.get_historical_data(symbol, interval, output_size)
         if not data:
-            return JSONResponse(
+            return json_response(
                 status_code=404,
                 content=ApiResponse(
                     success=False,
                     message=f"Historical data not found for symbol: {symbol}",
-                ).model_dump(by_alias=True),
+                ),
             )
-        return ApiResponse(success=True, data=data).model_dump(by_alias=True)
-    except stock_svc.StockDataConfigurationError as ex:
-        return JSONResponse(
+        return json_response(ApiResponse(success=True, data=data))
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
             status_code=503,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
         )
     except Exception as ex:
         logger.exception("Error getting historical data for symbol %s", symbol)
-        return JSONResponse(
+        return json_response(
             status_code=400,
-            content=ApiResponse(success=False, message=str(ex)).model_dump(by_alias=True),
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+
+
+@router.get("/indicators/{symbol}")
+async def get_indicators(
+    symbol: str,
+    indicators: str = Query(..., alias="indicators"),
+    interval: str = Query("1day", alias="interval"),
+    output_size: int | None = Query(None, alias="outputSize"),
+    period: str | None = Query(None, alias="period"),
+):
+    try:
+        if period:
+            output_size = stock_svc.output_size_for_period(interval, period)
+        data = await stock_svc.get_indicators(symbol, indicators, interval, output_size)
+        if not data.dates:
+            return json_response(
+                status_code=404,
+                content=ApiResponse(
+                    success=False,
+                    message=f"Historical data not found for symbol: {symbol}",
+                ),
+            )
+        return json_response(ApiResponse(success=True, data=data))
+    except (
+        stock_svc.StockDataConfigurationError,
+        stock_svc.StockDataRateLimitError,
+        stock_svc.StockDataUnavailableError,
+    ) as ex:
+        return json_response(
+            status_code=503,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+    except Exception as ex:
+        logger.exception("Error computing indicators for symbol %s", symbol)
+        return json_response(
+            status_code=400,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+
+
+def _screener_ranges(request: Request) -> dict[str, tuple[float | None, float | None]]:
+    """`minMarketCap=1e9&maxPeRatio=25` -> {"marketCap": (1e9, None), "peRatio": (None, 25)}."""
+    ranges: dict[str, tuple[float | None, float | None]] = {}
+    for field in fundamentals_svc.NUMERIC_FIELDS:
+        suffix = field[0].upper() + field[1:]
+        bounds = []
+        for prefix in ("min", "max"):
+            raw = request.query_params.get(prefix + suffix)
+            try:
+                bounds.append(float(raw) if raw not in (None, "") else None)
+            except ValueError:
+                raise ValueError(f"{prefix}{suffix} must be a number") from None
+        if bounds != [None, None]:
+            ranges[field] = (bounds[0], bounds[1])
+    return ranges
+
+
+@router.get("/screener")
+async def screen_stocks(
+    request: Request,
+    sector: str | None = None,
+    industry: str | None = None,
+    sort: str = "marketCap:desc",
+    limit: int = 50,
+    offset: int = 0,
+    db: Session = Depends(get_db),
+):
+    """Filter and sort the locally stored fundamentals; never calls Twelve Data.
+
+    Ranges use min/max query params per field (minMarketCap, maxPeRatio, minDividendYield,
+    minRangePosition, ...); sector and industry take comma-separated exact names.
+    """
+    try:
+        result = fundamentals_svc.screen(
+            db,
+            sectors=[item.strip() for item in (sector or "").split(",") if item.strip()],
+            industries=[item.strip() for item in (industry or "").split(",") if item.strip()],
+            ranges=_screener_ranges(request),
+            sort=sort,
+            limit=limit,
+            offset=offset,
+        )
+        return json_response(ApiResponse(success=True, data=result))
+    except Exception as ex:
+        logger.exception("Error screening stocks")
+        return json_response(
+            status_code=400,
+            content=ApiResponse(success=False, message=str(ex)),
+        )
+
+
+@router.get("/stats")
+async def get_stock_data_stats():
+    return json_response(
+        ApiResponse(
+            success=True,
+            data={
+                "client": stock_svc.client_stats(),
+                "quoteCache": stock_svc.quote_cache_stats(),
+                "profileCache": stock_svc.profile_cache_stats(),
+                "rateLimiter": stock_svc.rate_limiter_stats(),
+                "circuitBreaker": stock_svc.circuit_breaker_stats(),
+                "searchIndex": stock_svc.symbol_index_stats(),
+                "quoteStream": quote_stream.stream_stats(),
+                "indicatorCache": indicator_svc.cache_stats(),
+                "correlationCache": analytics_svc.cache_stats(),
+                "riskCache": analytics_svc.risk_cache_stats(),
+                "prefetch": prefetch_svc.prefetch_stats(),
+            },
         )
+    )
@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from db_models import AppUser, TaxProfile
-from models.common import ApiResponse
+from models.common import ApiResponse, json_response
 from models.taxes_models import TaxProfileUpsert
 from routers.persistence import _current_user, _text_eq
 from services import tax_service
@@ -44,7 +44,7 @@ def _profile_row(profile: TaxProfile) -> dict:
 @router.get("/profile")
 async def get_profile(user: AppUser = Depends(_current_user), db: Session = Depends(get_db)):
     profile = db.scalar(select(TaxProfile).where(_text_eq(TaxProfile.user_id, user.id)))
-    return ApiResponse(success=True, data=_profile_row(profile) if profile else None).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_profile_row(profile) if profile else None))
 
 
 @router.put("/profile")
@@ -66,9 +66,9 @@ async def save_profile(
     profile.withholdings_paid = payload.withholdings_paid
     db.commit()
     db.refresh(profile)
-    return ApiResponse(success=True, data=_profile_row(profile)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=_profile_row(profile)))
 
 
 @router.post("/calculate")
 async def calculate(payload: TaxProfileUpsert, user: AppUser = Depends(_current_user), db: Session = Depends(get_db)):
-    return ApiResponse(success=True, data=tax_service.calculate_taxes(payload)).model_dump(by_alias=True)
+    return json_response(ApiResponse(success=True, data=tax_service.calculate_taxes(payload)))
@@ -0,0 +1,111 @@
+"""Persistent ledger of SnapTrade account activities.
+
+Activities are stored per (user, account, kind) with a watermark recording the
+trade dates already copied. The first load backfills the whole lookback window;
+later refreshes only ask SnapTrade for activities from a few days before the
+watermark (brokerages post some activities late) and replace that stretch of
+the ledger, so repeat loads read almost everything locally.
+"""
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete as sql_delete
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import SNAPTRADE_ACTIVITY_RESYNC_DAYS
+from db_models import SnapTradeActivity, SnapTradeActivitySync
+
+RESYNC_DAYS = SNAPTRADE_ACTIVITY_RESYNC_DAYS
+
+
+def fetch_start(db: Session, user_id: str, account_id: str, kind: str, start: date, full: bool = False) -> date:
+    """First trade date to request: `start` for a backfill, else RESYNC_DAYS before the watermark."""
+    sync = db.get(SnapTradeActivitySync, (user_id, account_id, kind))
+    if full or sync is None or sync.backfilled_from > start:
+        return start
+    return max(start, sync.synced_through - timedelta(days=RESYNC_DAYS))
+
+
+def load_activities(db: Session, user_id: str, account_id: str, kind: str, start: date, end: date) -> list[dict]:
+    """Stored activities traded between `start` and `end`, oldest first."""
+    payloads = db.scalars(
+        select(SnapTradeActivity.payload)
+        .where(
+            SnapTradeActivity.user_id == user_id,
+            SnapTradeActivity.account_id == account_id,
+            SnapTradeActivity.kind == kind,
+            SnapTradeActivity.trade_date >= start,
+            SnapTradeActivity.trade_date <= end,
+        )
+        .order_by(SnapTradeActivity.trade_date)
+    )
+    return [json.loads(payload) for payload in payloads]
+
+
+def _replace(
+    db: Session,
+    user_id: str,
+    account_id: str,
+    kind: str,
+    start: date,
+    end: date,
+    activities: list[tuple[date, dict]],
+    now: datetime,
+) -> None:
+    db.execute(
+        sql_delete(SnapTradeActivity).where(
+            SnapTradeActivity.user_id == user_id,
+            SnapTradeActivity.account_id == account_id,
+            SnapTradeActivity.kind == kind,
+            SnapTradeActivity.trade_date >= start,
+            SnapTradeActivity.trade_date <= end,
+        )
+    )
+    db.add_all(
+        SnapTradeActivity(
+            user_id=user_id,
+            account_id=account_id,
+            kind=kind,
+            trade_date=trade_date,
+            payload=json.dumps(activity, default=str),
+            fetched_at=now,
+        )
+        for trade_date, activity in activities
+        if start <= trade_date <= end
+    )
+    sync = db.get(SnapTradeActivitySync, (user_id, account_id, kind))
+    if sync is None:
+        sync = SnapTradeActivitySync(user_id=user_id, account_id=account_id, kind=kind, backfilled_from=start)
+        db.add(sync)
+    elif start > sync.synced_through:
+        # The fetched window doesn't touch what was stored before, so coverage restarts here.
+        sync.backfilled_from = start
+    else:
+        sync.backfilled_from = min(sync.backfilled_from, start)
+    sync.synced_through = end
+    sync.last_synced_at = now
+    db.commit()
+
+
+def store_activities(
+    db: Session,
+    user_id: str,
+    account_id: str,
+    kind: str,
+    start: date,
+    end: date,
+    activities: list[tuple[date, dict]],
+    now: datetime,
+) -> None:
+    """Replace the stored activities traded between `start` and `end` and advance the watermark.
+
+    `activities` are (trade date, raw activity) pairs from one fetch of that window.
+    """
+    try:
+        _replace(db, user_id, account_id, kind, start, end, activities, now)
+    except IntegrityError:
+        # A concurrent sync created the watermark first — retry as an update
+        db.rollback()
+        _replace(db, user_id, account_id, kind, start, end, activities, now)
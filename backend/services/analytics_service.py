@@ -0,0 +1,318 @@
+"""Cross-symbol statistics over aligned daily closes.
+
+Each symbol's daily bars are placed on the union of every symbol's trading dates,
+leaving NaN where a symbol has no bar (not yet listed, halted, foreign holiday).
+A log return exists only where a symbol has closes on two consecutive grid dates,
+and each pair of symbols is compared over the returns they share, so one thinly
+traded name doesn't shrink the window for every other pair.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from statistics import NormalDist
+
+import numpy as np
+
+from config import ANALYTICS_CACHE_MAX_SIZE, ANALYTICS_MAX_SYMBOLS
+from models.analytics_models import CorrelationMatrix, HoldingRisk, PortfolioRisk
+from models.snaptrade_models import Portfolio
+from services import market_calendar
+from services import stock_data_service as stock_svc
+from services.price_series import PriceSeries
+
+logger = logging.getLogger(__name__)
+
+MAX_SYMBOLS = ANALYTICS_MAX_SYMBOLS
+CACHE_MAX_SIZE = ANALYTICS_CACHE_MAX_SIZE
+# Pairs sharing fewer returns than this get no statistic rather than a noisy one.
+MIN_OVERLAP = 20
+# Symbols whose bars are loaded at once; the credit limiter paces any upstream calls.
+LOAD_CONCURRENCY = 8
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_BENCHMARK = "SPY"
+
+# (sorted symbols, period) -> (expires at, result)
+_cache: OrderedDict[tuple[tuple[str, ...], str], tuple[float, CorrelationMatrix]] = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+# (user id, benchmark, period, confidence) -> (market day, positions, result)
+_risk_cache: OrderedDict[tuple[str, str, str, float], tuple[date, tuple, PortfolioRisk]] = OrderedDict()
+_risk_cache_stats = {"hits": 0, "misses": 0}
+
+
+def align_closes(series_by_symbol: dict[str, PriceSeries]) -> tuple[np.ndarray, np.ndarray]:
+    """The union date grid and a (dates x symbols) close matrix, NaN where a symbol has no bar."""
+    days = {symbol: series.timestamps.astype("datetime64[D]") for symbol, series in series_by_symbol.items()}
+    if not any(len(dates) for dates in days.values()):
+        return np.empty(0, dtype="datetime64[D]"), np.empty((0, len(days)))
+    # Day offsets index a presence bitmap, so the union needs no sort.
+    first = min(dates[0] for dates in days.values() if len(dates))
+    offsets = {symbol: (dates - first).astype(np.int64) for symbol, dates in days.items()}
+    present = np.zeros(max(int(o[-1]) for o in offsets.values() if len(o)) + 1, dtype=bool)
+    for symbol_offsets in offsets.values():
+        present[symbol_offsets] = True
+    row_of_day = np.cumsum(present) - 1
+    grid = first + np.flatnonzero(present)
+    closes = np.full((len(grid), len(days)), np.nan)
+    for column, (symbol, symbol_offsets) in enumerate(offsets.items()):
+        closes[row_of_day[symbol_offsets], column] = series_by_symbol[symbol].close
+    return grid, closes
+
+
+def log_returns(closes: np.ndarray) -> np.ndarray:
+    """Log returns between consecutive rows; NaN where either close is missing or not positive."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.log(closes[1:] / closes[:-1])
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def pairwise_moments(returns: np.ndarray, min_overlap: int = MIN_OVERLAP) -> tuple[np.ndarray, np.ndarray]:
+    """Correlation and sample covariance of every column pair over the rows both have.
+
+    Sums over each pair's shared rows come from matrix products of the zero-filled
+    returns and the validity mask, so the whole matrix is a handful of BLAS calls.
+    """
+    valid = ~np.isnan(returns)
+    mask = valid.astype(float)
+    x = np.where(valid, returns, 0.0)
+    count = mask.T @ mask
+    sum_x = x.T @ mask  # [i, j]: sum of column i over rows shared with j
+    sum_sq = (x * x).T @ mask
+    sum_xy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = sum_x / count
+        mean_y = sum_x.T / count
+        covariance = (sum_xy - count * mean_x * mean_y) / (count - 1)
+        var_x = (sum_sq - count * mean_x**2) / (count - 1)
+        var_y = var_x.T
+        correlation = covariance / np.sqrt(var_x * var_y)
+    thin = count < max(2, min_overlap)
+    covariance[thin] = np.nan
+    correlation[thin | ~np.isfinite(correlation)] = np.nan
+    np.clip(correlation, -1.0, 1.0, out=correlation)
+    diagonal = np.diag_indices_from(correlation)
+    correlation[diagonal] = np.where(np.isnan(np.diag(covariance)), np.nan, 1.0)
+    return correlation, covariance
+
+
+def _rows(matrix: np.ndarray) -> list[list[float | None]]:
+    rounded = np.round(matrix, 6).astype(object)
+    rounded[np.isnan(matrix)] = None
+    return rounded.tolist()
+
+
+def risk_measures(closes: np.ndarray, weights: np.ndarray, benchmark: np.ndarray, confidence: float = 0.95) -> dict:
+    """Portfolio and per-holding risk from aligned (dates x holdings) closes and the benchmark's closes.
+
+    Daily volatility and betas come from the pairwise covariance of log returns;
+    VaR and drawdown come from the weighted daily simple returns, with a missing
+    return counted as flat.
+    """
+    returns = log_returns(np.column_stack([closes, benchmark]))
+    _, covariance = pairwise_moments(returns)
+    assets = len(weights)
+    asset_cov = np.nan_to_num(covariance[:assets, :assets])
+    marginal = asset_cov @ weights
+    variance = float(weights @ marginal)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        betas = covariance[:assets, assets] / covariance[assets, assets]
+        contribution = weights * marginal / variance
+
+    daily = np.nan_to_num(np.expm1(returns[:, :assets])) @ weights
+    market = returns[:, assets]
+    shared = ~np.isnan(market)
+    beta = None
+    if shared.sum() >= max(2, MIN_OVERLAP):
+        moments = np.cov(daily[shared], np.expm1(market[shared]))
+        beta = float(moments[0, 1] / moments[1, 1]) if moments[1, 1] > 0 else None
+
+    wealth = np.cumprod(np.concatenate([[1.0], 1.0 + daily]))
+    drawdown = float(1.0 - (wealth / np.maximum.accumulate(wealth)).min())
+    volatility = np.sqrt(variance) if variance > 0 else 0.0
+    historical = float(-np.quantile(daily, 1 - confidence)) if len(daily) else None
+    parametric = float(NormalDist().inv_cdf(confidence) * volatility - daily.mean()) if len(daily) else None
+    return {
+        "volatility": float(volatility * np.sqrt(TRADING_DAYS_PER_YEAR)),
+        "beta": beta,
+        "historical_var": historical,
+        "parametric_var": parametric,
+        "max_drawdown": drawdown,
+        "holding_volatility": np.sqrt(np.diag(covariance)[:assets] * TRADING_DAYS_PER_YEAR),
+        "holding_beta": betas,
+        "risk_contribution": contribution,
+        "observations": len(daily),
+    }
+
+
+def _positions(portfolio: Portfolio) -> dict[str, float]:
+    """Market value per symbol across every account."""
+    values: dict[str, float] = {}
+    for account in portfolio.accounts:
+        for holding in account.holdings:
+            symbol = holding.symbol.strip().upper()
+            if symbol and holding.quantity:
+                value = holding.total_value or holding.quantity * holding.current_price
+                values[symbol] = values.get(symbol, 0.0) + value
+    return values
+
+
+def _optional(value, digits: int = 6) -> float | None:
+    return round(float(value), digits) if value is not None and np.isfinite(value) else None
+
+
+def clear_cache() -> None:
+    _cache.clear()
+    _risk_cache.clear()
+    for stats in (_cache_stats, _risk_cache_stats):
+        for key in stats:
+            stats[key] = 0
+
+
+def cache_stats() -> dict[str, int]:
+    return {**_cache_stats, "size": len(_cache)}
+
+
+def risk_cache_stats() -> dict[str, int]:
+    return {**_risk_cache_stats, "size": len(_risk_cache)}
+
+
+async def _load(symbols: list[str], bars: int) -> tuple[dict[str, PriceSeries], dict[str, str]]:
+    semaphore = asyncio.Semaphore(LOAD_CONCURRENCY)
+
+    async def load(symbol: str) -> PriceSeries:
+        async with semaphore:
+            return await stock_svc.get_price_series(symbol, "1day", bars)
+
+    results = await asyncio.gather(*(load(symbol) for symbol in symbols), return_exceptions=True)
+    series: dict[str, PriceSeries] = {}
+    errors: dict[str, str] = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, stock_svc.StockDataConfigurationError):
+            raise result
+        if isinstance(result, BaseException):
+            logger.warning("Price history failed for %s: %s", symbol, result)
+            errors[symbol] = str(result) or type(result).__name__
+        elif not len(result):
+            errors[symbol] = "No price history"
+        else:
+            series[symbol] = result
+    return series, errors
+
+
+async def correlation_matrix(symbols: list[str], period: str = "1y") -> tuple[CorrelationMatrix, dict[str, str]]:
+    """Correlation and covariance of daily log returns over `period`, plus per-symbol load errors.
+
+    Results are cached per (symbol set, period) until the daily bars are due a
+    refresh; a result missing any symbol is not cached, so the next call retries.
+    """
+    wanted = sorted({s.strip().upper() for s in symbols if s and s.strip()})
+    if len(wanted) < 2:
+        raise ValueError("At least two symbols are required")
+    if len(wanted) > MAX_SYMBOLS:
+        raise ValueError(f"At most {MAX_SYMBOLS} symbols can be compared at once")
+    # One extra bar so the first day of the period has a return.
+    bars = stock_svc.output_size_for_period("1day", period) + 1
+    key = (tuple(wanted), period.lower())
+    cached = _cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        _cache.move_to_end(key)
+        _cache_stats["hits"] += 1
+        return cached[1], {}
+    _cache_stats["misses"] += 1
+
+    series, errors = await _load(wanted, bars)
+    grid, closes = align_closes(series)
+    correlation, covariance = pairwise_moments(log_returns(closes))
+    result = CorrelationMatrix(
+        symbols=list(series),
+        period=key[1],
+        start=grid[0].item() if len(grid) else None,
+        end=grid[-1].item() if len(grid) else None,
+        observations=max(0, len(grid) - 1),
+        min_overlap=MIN_OVERLAP,
+        correlation=_rows(correlation),
+        covariance=_rows(covariance),
+    )
+    if not errors:
+        expires = time.monotonic() + market_calendar.cache_ttl(stock_svc.HISTORY_REFRESH_SECONDS)
+        _cache[key] = (expires, result)
+        while len(_cache) > CACHE_MAX_SIZE:
+            _cache.popitem(last=False)
+    return result, errors
+
+
+async def portfolio_risk(
+    user_id: str,
+    portfolio: Portfolio,
+    benchmark: str = DEFAULT_BENCHMARK,
+    period: str = "1y",
+    confidence: float = 0.95,
+) -> tuple[PortfolioRisk, dict[str, str]]:
+    """Volatility, beta, VaR and drawdown of the portfolio's current holdings, plus per-symbol load errors.
+
+    Every holding's bars and the benchmark's are loaded in one batch. Results are
+    cached per user for the market day while the holdings stay the same; holdings
+    whose history fails to load are left out and the result is not cached.
+    """
+    if not 0.5 <= confidence < 1:
+        raise ValueError("confidence must be at least 0.5 and below 1")
+    benchmark = (benchmark or DEFAULT_BENCHMARK).strip().upper()
+    positions = _positions(portfolio)
+    if len(positions) > MAX_SYMBOLS:
+        raise ValueError(f"At most {MAX_SYMBOLS} holdings can be analyzed at once")
+    key = (user_id, benchmark, period.lower(), confidence)
+    today = datetime.now(market_calendar.MARKET_TZ).date()
+    fingerprint = tuple(sorted((symbol, round(value, 2)) for symbol, value in positions.items()))
+    cached = _risk_cache.get(key)
+    if cached and cached[0] == today and cached[1] == fingerprint:
+        _risk_cache.move_to_end(key)
+        _risk_cache_stats["hits"] += 1
+        return cached[2], {}
+    _risk_cache_stats["misses"] += 1
+
+    bars = stock_svc.output_size_for_period("1day", period) + 1
+    series, errors = await _load(sorted({*positions, benchmark}), bars)
+    held = [symbol for symbol in sorted(positions) if symbol in series]
+    value = sum(positions[symbol] for symbol in held)
+    if not held or value <= 0:
+        raise ValueError("No holdings with price history to analyze")
+    # The benchmark gets its own column even when it is also held.
+    market_series = series.get(benchmark, PriceSeries.empty())
+    grid, closes = align_closes({**{symbol: series[symbol] for symbol in held}, "": market_series})
+    weights = np.array([positions[symbol] for symbol in held]) / value
+    measures = risk_measures(closes[:, :-1], weights, closes[:, -1], confidence)
+    historical, parametric = measures["historical_var"], measures["parametric_var"]
+    result = PortfolioRisk(
+        benchmark=benchmark,
+        period=key[2],
+        start=grid[0].item() if len(grid) else None,
+        end=grid[-1].item() if len(grid) else None,
+        observations=measures["observations"],
+        confidence=confidence,
+        value=round(value, 2),
+        volatility=_optional(measures["volatility"]),
+        beta=_optional(measures["beta"]),
+        historical_var=_optional(None if historical is None else historical * value, 2),
+        historical_var_percent=_optional(None if historical is None else historical * 100, 4),
+        parametric_var=_optional(None if parametric is None else parametric * value, 2),
+        parametric_var_percent=_optional(None if parametric is None else parametric * 100, 4),
+        max_drawdown_percent=_optional(measures["max_drawdown"] * 100, 4),
+        holdings=[
+            HoldingRisk(
+                symbol=symbol,
+                value=round(positions[symbol], 2),
+                weight=round(float(weights[index]), 6),
+                volatility=_optional(measures["holding_volatility"][index]),
+                beta=_optional(measures["holding_beta"][index]),
+                risk_contribution=_optional(measures["risk_contribution"][index]),
+            )
+            for index, symbol in enumerate(held)
+        ],
+    )
+    if not errors:
+        _risk_cache[key] = (today, fingerprint, result)
+        while len(_risk_cache) > CACHE_MAX_SIZE:
+            _risk_cache.popitem(last=False)
+    return result, errors
@@ -0,0 +1,182 @@
+"""Replay recurring-buy rules against historical daily bars.
+
+Run dates come from the live scheduler (`compute_next_run_date`, rolled onto
+trading days by the market calendar), and every run follows `_execute_one`:
+units mode buys a fixed share count; dollar mode adds the target to the carried
+budget, buys as many whole shares as it covers and carries the rest by the same
+`carry_budget` rule. A run with no bar for its date behaves like a run with no
+live price: the budget grows and nothing is bought. Orders fill at the run day's close.
+
+The replay steps through the days some variant runs, updating every variant's
+state at once, so hundreds of frequency/amount variants cost little more than one.
+"""
+from datetime import date, datetime
+
+import numpy as np
+
+from models.analytics_models import DcaBacktest, DcaBacktestResult, DcaVariant
+from services import market_calendar
+from services import recurring_buy_service as recurring_svc
+from services import stock_data_service as stock_svc
+from services.price_series import PriceSeries
+
+MAX_VARIANTS = 500
+# Equity curves are sampled down to about this many shared dates.
+MAX_CURVE_POINTS = 260
+
+
+def run_dates(frequency: str, start: date, end: date) -> list[date]:
+    """The dates a schedule starting on `start` would run, through `end`."""
+    day = market_calendar.next_trading_day(start)
+    dates: list[date] = []
+    while day <= end:
+        dates.append(day)
+        day = recurring_svc.compute_next_run_date(frequency, day)
+    return dates
+
+
+def simulate(series: PriceSeries, variants: list[DcaVariant], start: date, end: date) -> DcaBacktest:
+    """Replay each variant on the daily bars of `series` between `start` and `end`.
+
+    Variants must already be validated and carry a normalized frequency.
+    """
+    days = series.timestamps.astype("datetime64[D]")
+    lo = int(np.searchsorted(days, np.datetime64(start, "D")))
+    hi = int(np.searchsorted(days, np.datetime64(end, "D"), side="right"))
+    days, closes = days[lo:hi], series.close[lo:hi]
+    count = len(variants)
+    if not len(days):
+        return _no_runs(variants, start, end)
+
+    frequencies = sorted({variant.frequency for variant in variants})
+    group = np.array([frequencies.index(variant.frequency) for variant in variants])
+    target = np.array([variant.target_amount or 0.0 for variant in variants])
+    units = np.array([variant.units or 0.0 for variant in variants])
+    dollar = np.array([variant.target_amount is not None for variant in variants])
+
+    # due[r, f]: runs of frequency f on row r's day or, lacking bars, since the previous row;
+    # priced[r, f]: one of them is on row r's day and fills.
+    due = np.zeros((len(days), len(frequencies)), dtype=np.int64)
+    priced = np.zeros(due.shape, dtype=bool)
+    runs = np.zeros(len(frequencies), dtype=np.int64)
+    for column, frequency in enumerate(frequencies):
+        wanted = np.array(run_dates(frequency, start, days[-1].item()), dtype="datetime64[D]")
+        rows = np.searchsorted(days, wanted)
+        np.add.at(due[:, column], rows, 1)
+        priced[rows, column] |= days[rows] == wanted
+        runs[column] = len(wanted)
+    event_rows = np.flatnonzero(due.any(axis=1))
+    if not len(event_rows):
+        return _no_runs(variants, start, end)
+
+    # Per run day and variant: dollars added to the budget, and which variants fill.
+    times = due[event_rows][:, group]
+    filled = priced[event_rows][:, group]
+    contributed = times * target
+    fills_dollar = filled & dollar
+    unit_buys = np.where(filled & ~dollar, units, 0.0)
+    prices = closes[event_rows]
+
+    shares = np.zeros(count)
+    budget = np.zeros(count)
+    snapshots = np.empty((2, len(event_rows), count))
+    for step, price in enumerate(prices):
+        # Dollar mode: top up, buy whole shares, carry the remainder by the live rule.
+        budget += contributed[step]
+        bought = np.floor(budget / price) * fills_dollar[step]
+        budget = recurring_svc.carry_budget(budget - bought * price)
+        # Units mode: buy the fixed share count.
+        shares += bought + unit_buys[step]
+        snapshots[0, step] = shares
+        snapshots[1, step] = budget
+    buys = np.count_nonzero(np.diff(snapshots[0], axis=0, prepend=0.0) > 0, axis=0)
+    invested_by_run = np.cumsum(contributed + unit_buys * prices[:, None], axis=0)
+    invested = invested_by_run[-1]
+
+    # Carry each run's state forward to every day until the next run; curves are
+    # laid out one row per variant so the running peaks scan contiguous memory.
+    step_of_day = np.searchsorted(event_rows, np.arange(len(days)), side="right") - 1
+    step_of_day[step_of_day < 0] = len(event_rows)
+    held, cash, paid = (
+        np.vstack([history, np.zeros(count)]).T[:, step_of_day]
+        for history in (snapshots[0], snapshots[1], invested_by_run)
+    )
+    equity = held * closes + cash
+    # Equity per dollar put in; 1 before the first run so the baseline is break-even.
+    ratio = np.divide(equity, paid, out=np.ones_like(equity), where=paid > 0)
+    drawdown = 1.0 - (ratio / np.maximum.accumulate(ratio, axis=1)).min(axis=1)
+
+    points = np.unique(np.linspace(0, len(days) - 1, min(len(days), MAX_CURVE_POINTS)).round().astype(int))
+    curves = np.round(equity[:, points], 2).tolist()
+    final = equity[:, -1]
+    results = []
+    for index, variant in enumerate(variants):
+        spent = invested[index] - budget[index] if dollar[index] else invested[index]
+        results.append(
+            DcaBacktestResult(
+                **_rule(variant),
+                runs=int(runs[group[index]]),
+                buys=int(buys[index]),
+                invested=round(float(invested[index]), 2),
+                shares=float(shares[index]),
+                cash=round(float(budget[index]), 2),
+                final_value=round(float(final[index]), 2),
+                profit=round(float(final[index] - invested[index]), 2),
+                return_percent=(
+                    round(float(final[index] / invested[index] - 1) * 100, 4) if invested[index] > 0 else None
+                ),
+                average_cost=round(float(spent / shares[index]), 4) if shares[index] > 0 else None,
+                max_drawdown_percent=round(float(drawdown[index]) * 100, 4) if invested[index] > 0 else None,
+                equity=curves[index],
+            )
+        )
+    return DcaBacktest(
+        start=days[0].item(),
+        end=days[-1].item(),
+        dates=[day.item() for day in days[points]],
+        results=results,
+    )
+
+
+def _no_runs(variants: list[DcaVariant], start: date, end: date) -> DcaBacktest:
+    return DcaBacktest(start=start, end=end, results=[DcaBacktestResult(**_rule(variant)) for variant in variants])
+
+
+def _rule(variant: DcaVariant) -> dict:
+    label = variant.label or (
+        f"{variant.frequency} ${variant.target_amount:g}"
+        if variant.target_amount is not None
+        else f"{variant.frequency} {variant.units:g} sh"
+    )
+    return {
+        "label": label,
+        "frequency": variant.frequency,
+        "units": variant.units,
+        "target_amount": variant.target_amount,
+    }
+
+
+async def backtest(symbol: str, variants: list[DcaVariant], start: date, end: date | None = None) -> DcaBacktest:
+    """Replay `variants` of a recurring buy of `symbol` from `start` through `end` (default: latest bar)."""
+    if not variants:
+        raise ValueError("At least one variant is required")
+    if len(variants) > MAX_VARIANTS:
+        raise ValueError(f"At most {MAX_VARIANTS} variants can be backtested at once")
+    normalized: list[DcaVariant] = []
+    for variant in variants:
+        symbol, frequency = recurring_svc.validate_rule(symbol, variant.units, variant.target_amount, variant.frequency)
+        normalized.append(variant.model_copy(update={"frequency": frequency}))
+    today = datetime.now(recurring_svc.BUY_TIMEZONE).date()
+    end = min(end or today, today)
+    if start > end:
+        raise ValueError("startDate must be on or before endDate")
+    # Enough bars to cover the window; a few spare for holidays-vs-weekdays slack.
+    bars = min(stock_svc.MAX_OUTPUT_SIZE, int(np.busday_count(start, today)) + 5)
+    series = await stock_svc.get_price_series(symbol, "1day", bars)
+    if not len(series):
+        raise ValueError(f"No price history for {symbol}")
+    # Runs before the symbol's first bar have nothing to replay against.
+    first = series.timestamps[0].astype("datetime64[D]").item()
+    result = simulate(series, normalized, max(start, first), end)
+    result.symbol = symbol
+    return result
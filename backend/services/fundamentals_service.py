@@ -0,0 +1,194 @@
+"""Locally stored fundamentals for the stock screener.
+
+A background job refreshes one row per symbol in the configured universe (plus
+every watchlisted symbol) from the same quote/profile/52-week sources as the
+details page. The screener only ever reads this table, so a screen never waits
+on, or spends credits with, Twelve Data.
+"""
+import logging
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import FUNDAMENTALS_INCLUDE_WATCHLISTS, FUNDAMENTALS_REFRESH_SECONDS, FUNDAMENTALS_UNIVERSE
+from database import SessionLocal
+from db_models import StockFundamental, WatchlistItem
+from models.stock_models import ScreenerResult, StockDetails, StockFundamentals
+from services import stock_data_service as stock_svc
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE = FUNDAMENTALS_UNIVERSE
+INCLUDE_WATCHLISTS = FUNDAMENTALS_INCLUDE_WATCHLISTS
+REFRESH_SECONDS = FUNDAMENTALS_REFRESH_SECONDS
+MAX_PAGE_SIZE = 500
+
+# Screener field name -> column; the same names are accepted for range filters and sorting.
+NUMERIC_FIELDS = {
+    "price": StockFundamental.price,
+    "marketCap": StockFundamental.market_cap,
+    "peRatio": StockFundamental.pe_ratio,
+    "dividendYield": StockFundamental.dividend_yield,
+    "rangePosition": StockFundamental.range_position,
+    "averageVolume": StockFundamental.average_volume,
+}
+SORT_FIELDS = {**NUMERIC_FIELDS, "symbol": StockFundamental.symbol, "name": StockFundamental.name}
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def universe(db: Session) -> list[str]:
+    """Configured symbols plus every watchlisted symbol, de-duplicated."""
+    symbols = set(UNIVERSE)
+    if INCLUDE_WATCHLISTS:
+        symbols.update(symbol.strip().upper() for symbol in db.scalars(select(WatchlistItem.symbol).distinct()))
+    return sorted(symbol for symbol in symbols if symbol)
+
+
+def stale_symbols(db: Session, symbols: list[str], now: datetime) -> list[str]:
+    """Symbols with no row or one older than REFRESH_SECONDS, oldest first."""
+    refreshed = {
+        symbol: _as_utc(updated_at)
+        for symbol, updated_at in db.execute(
+            select(StockFundamental.symbol, StockFundamental.updated_at).where(StockFundamental.symbol.in_(symbols))
+        )
+        if updated_at is not None
+    }
+    cutoff = now - timedelta(seconds=REFRESH_SECONDS)
+    stale = [symbol for symbol in symbols if refreshed.get(symbol, cutoff) <= cutoff]
+    return sorted(stale, key=lambda symbol: refreshed.get(symbol, datetime.min.replace(tzinfo=UTC)))
+
+
+def _range_position(price: float | None, high: float | None, low: float | None) -> float | None:
+    if price is None or high is None or low is None or high <= low:
+        return None
+    return min(1.0, max(0.0, (price - low) / (high - low)))
+
+
+def _apply(row: StockFundamental, details: StockDetails, now: datetime) -> None:
+    row.name = details.name or None
+    row.exchange = details.exchange or None
+    row.sector = details.sector
+    row.industry = details.industry
+    row.price = details.current_price or None
+    row.market_cap = details.market_cap
+    row.pe_ratio = details.pe_ratio
+    row.dividend_yield = details.dividend_yield
+    row.high_52_week = details.high_52_week
+    row.low_52_week = details.low_52_week
+    row.range_position = _range_position(row.price, row.high_52_week, row.low_52_week)
+    row.average_volume = details.average_volume
+    row.updated_at = now
+
+
+def store(db: Session, details: StockDetails, now: datetime) -> None:
+    symbol = details.symbol.strip().upper()
+    try:
+        row = db.get(StockFundamental, symbol) or StockFundamental(symbol=symbol)
+        _apply(row, details, now)
+        db.add(row)
+        db.commit()
+    except IntegrityError:
+        # A concurrent refresh inserted the row first — update it instead
+        db.rollback()
+        row = db.get(StockFundamental, symbol)
+        _apply(row, details, now)
+        db.commit()
+
+
+async def refresh(now: datetime | None = None) -> dict[str, int]:
+    """Refresh every stale universe row at background priority.
+
+    A row is only written once its profile (sector, market cap, P/E, yield) was
+    fetched, so a skipped or failed profile leaves it stale for the next pass.
+    Stops early once Twelve Data is rate limited or unavailable, or when the
+    credit plan can't afford /profile at all.
+    """
+    now = now or datetime.now(UTC)
+    with SessionLocal() as db:
+        pending = stale_symbols(db, universe(db), now)
+    counts = {"stale": len(pending), "refreshed": 0, "failed": 0}
+    for symbol in pending:
+        try:
+            with stock_svc.background_priority():
+                details = await stock_svc.get_stock_details(symbol, require_profile=True)
+        except (stock_svc.StockDataRateLimitError, stock_svc.StockDataUnavailableError) as exc:
+            logger.info("fundamentals refresh paused after %s/%s symbols: %s", counts["refreshed"], len(pending), exc)
+            break
+        except stock_svc.StockDataConfigurationError as exc:
+            logger.error("stock screener fundamentals can't be filled with this Twelve Data setup: %s", exc)
+            break
+        except Exception as exc:
+            logger.warning("fundamentals refresh failed for %s: %s", symbol, exc)
+            counts["failed"] += 1
+            continue
+        if details is None:
+            counts["failed"] += 1
+            continue
+        with SessionLocal() as db:
+            store(db, details, datetime.now(UTC))
+        counts["refreshed"] += 1
+    return counts
+
+
+def _sort_clauses(sort: str) -> list:
+    """`marketCap:desc,peRatio` -> ORDER BY clauses, nulls last, symbol as the tiebreak."""
+    clauses = []
+    for part in (item.strip() for item in (sort or "").split(",")):
+        if not part:
+            continue
+        field, _, direction = part.partition(":")
+        column = SORT_FIELDS.get(field.strip())
+        direction = (direction or "asc").strip().lower()
+        if column is None or direction not in {"asc", "desc"}:
+            raise ValueError(f"Unsupported sort '{part}'; use one of {', '.join(SORT_FIELDS)} with :asc or :desc")
+        clauses.append((column.desc() if direction == "desc" else column.asc()).nulls_last())
+    clauses.append(StockFundamental.symbol.asc())
+    return clauses
+
+
+def screen(
+    db: Session,
+    sectors: list[str] | None = None,
+    industries: list[str] | None = None,
+    ranges: dict[str, tuple[float | None, float | None]] | None = None,
+    sort: str = "marketCap:desc",
+    limit: int = 50,
+    offset: int = 0,
+) -> ScreenerResult:
+    """Stored rows matching every filter; `ranges` maps a NUMERIC_FIELDS name to inclusive (min, max)."""
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    conditions = []
+    # Exact matches so the (sector, market_cap) index serves the common "sector by size" screen.
+    if sectors:
+        conditions.append(StockFundamental.sector.in_(sectors))
+    if industries:
+        conditions.append(StockFundamental.industry.in_(industries))
+    for field, (low, high) in (ranges or {}).items():
+        column = NUMERIC_FIELDS.get(field)
+        if column is None:
+            raise ValueError(f"Unsupported filter field '{field}'")
+        if low is not None and high is not None and low > high:
+            raise ValueError(f"{field}: minimum is above maximum")
+        if low is not None:
+            conditions.append(column >= low)
+        if high is not None:
+            conditions.append(column <= high)
+
+    total = db.scalar(select(func.count()).select_from(StockFundamental).where(*conditions)) or 0
+    rows = db.scalars(
+        select(StockFundamental).where(*conditions).order_by(*_sort_clauses(sort)).limit(limit).offset(offset)
+    ).all()
+    return ScreenerResult(
+        total=total,
+        limit=limit,
+        offset=offset,
+        items=[StockFundamentals.model_validate(row) for row in rows],
+    )
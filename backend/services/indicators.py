@@ -0,0 +1,231 @@
+"""Technical indicators computed with NumPy over a PriceSeries.
+
+Indicators are requested as compact specs, e.g. ``sma:20``, ``ema:50``, ``rsi:14``,
+``macd:12:26:9``, ``bbands:20:2``, ``atr:14`` and ``volatility:20``. Each spec
+yields one or more named output arrays aligned with the series timestamps;
+warm-up positions are NaN.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from services.price_series import PriceSeries
+
+INDICATOR_CACHE_MAX_SIZE = 512
+# Keyed by (symbol, interval, bar count, last bar time, spec); a new bar changes the key.
+_cache: OrderedDict[tuple, dict[str, np.ndarray]] = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0}
+
+# Largest power the blocked EMA lets decay**-k reach before re-anchoring (e**50).
+_MAX_LOG_GROWTH = 50.0
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    kind: str
+    params: tuple[float, ...]
+
+    @property
+    def key(self) -> str:
+        return ":".join([self.kind, *(f"{value:g}" for value in self.params)])
+
+    @property
+    def warmup(self) -> int:
+        """Extra leading bars that let the output settle before the requested window."""
+        if self.kind == "macd":
+            return int(3 * (self.params[1] + self.params[2]))
+        if self.kind in ("ema", "rsi", "atr"):
+            return int(3 * self.params[0])
+        return int(self.params[0])
+
+
+# kind -> (default params, minimum param count)
+_SPECS = {
+    "sma": ((20,), 1),
+    "ema": ((20,), 1),
+    "rsi": ((14,), 1),
+    "macd": ((12, 26, 9), 3),
+    "bbands": ((20, 2), 2),
+    "atr": ((14,), 1),
+    "volatility": ((20,), 1),
+}
+
+
+def parse_specs(raw: str) -> list[IndicatorSpec]:
+    """Parse a comma-separated spec list; raises ValueError on unknown kinds or bad parameters."""
+    specs: list[IndicatorSpec] = []
+    for token in (part.strip().lower() for part in (raw or "").split(",")):
+        if not token:
+            continue
+        kind, *values = token.split(":")
+        if kind not in _SPECS:
+            raise ValueError(f"Unknown indicator '{kind}'; expected one of {', '.join(_SPECS)}")
+        defaults, count = _SPECS[kind]
+        try:
+            params = tuple(float(value) for value in values) if values else defaults
+        except ValueError:
+            raise ValueError(f"Invalid parameters for indicator '{token}'") from None
+        if len(params) != count or any(value <= 0 for value in params):
+            raise ValueError(f"Indicator '{kind}' takes {count} positive parameter(s)")
+        if kind != "bbands" and any(value != int(value) for value in params):
+            raise ValueError(f"Indicator '{kind}' windows must be whole numbers")
+        spec = IndicatorSpec(kind, params)
+        if spec not in specs:
+            specs.append(spec)
+    if not specs:
+        raise ValueError("At least one indicator is required")
+    return specs
+
+
+def _ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """y[t] = (1 - alpha) * y[t-1] + alpha * x[t], seeded with x[0].
+
+    Solved in closed form per block: y[j] = d^(j+1) * (y_prev + alpha * cumsum(x / d^(i+1))),
+    with blocks short enough that d^-k stays far from overflow.
+    """
+    out = np.empty(len(values))
+    if not len(values):
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[:] = values
+        return out
+    block = max(1, int(_MAX_LOG_GROWTH / -np.log(decay)))
+    out[0] = previous = values[0]
+    start = 1
+    while start < len(values):
+        chunk = values[start:start + block]
+        powers = decay ** np.arange(1, len(chunk) + 1)
+        out[start:start + len(chunk)] = powers * (previous + alpha * np.cumsum(chunk / powers))
+        previous = out[start + len(chunk) - 1]
+        start += len(chunk)
+    return out
+
+
+def _warm(values: np.ndarray, count: int) -> np.ndarray:
+    values[:min(count, len(values))] = np.nan
+    return values
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    return _warm(_ewm(values, 2.0 / (span + 1)), span - 1)
+
+
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's RSI."""
+    out = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return out
+    delta = np.diff(close)
+    gains = _ewm(np.clip(delta, 0, None), 1.0 / period)
+    losses = _ewm(np.clip(-delta, 0, None), 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strength = 100 - 100 / (1 + gains / losses)
+    strength = np.where(losses == 0, np.where(gains == 0, 50.0, 100.0), strength)
+    out[1:] = strength
+    return _warm(out, period)
+
+
+def macd(close: np.ndarray, fast: int, slow: int, signal: int) -> dict[str, np.ndarray]:
+    line = _ewm(close, 2.0 / (fast + 1)) - _ewm(close, 2.0 / (slow + 1))
+    signal_line = _ewm(line, 2.0 / (signal + 1))
+    warmup = slow + signal - 2
+    return {
+        "macd": _warm(line.copy(), slow - 1),
+        "signal": _warm(signal_line, warmup),
+        "histogram": _warm(line - signal_line, warmup),
+    }
+
+
+def bollinger(close: np.ndarray, window: int, width: float) -> dict[str, np.ndarray]:
+    middle = sma(close, window)
+    deviation = np.full(len(close), np.nan)
+    if len(close) >= window:
+        deviation[window - 1:] = sliding_window_view(close, window).std(axis=1)
+    return {"upper": middle + width * deviation, "middle": middle, "lower": middle - width * deviation}
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's average true range."""
+    if not len(close):
+        return np.empty(0)
+    previous_close = np.concatenate(([close[0]], close[:-1]))
+    true_range = np.maximum(high, previous_close) - np.minimum(low, previous_close)
+    true_range[0] = high[0] - low[0]
+    return _warm(_ewm(true_range, 1.0 / period), period - 1)
+
+
+def volatility(close: np.ndarray, window: int, periods_per_year: int) -> np.ndarray:
+    """Annualised rolling standard deviation of log returns."""
+    out = np.full(len(close), np.nan)
+    if len(close) > window:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(np.log(close))
+        out[window:] = sliding_window_view(returns, window).std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    return out
+
+
+def compute(spec: IndicatorSpec, series: PriceSeries, periods_per_year: int = 252) -> dict[str, np.ndarray]:
+    """Named output arrays for `spec`, each aligned with series.timestamps."""
+    window = int(spec.params[0])
+    if spec.kind == "sma":
+        return {"value": sma(series.close, window)}
+    if spec.kind == "ema":
+        return {"value": ema(series.close, window)}
+    if spec.kind == "rsi":
+        return {"value": rsi(series.close, window)}
+    if spec.kind == "macd":
+        return macd(series.close, window, int(spec.params[1]), int(spec.params[2]))
+    if spec.kind == "bbands":
+        return bollinger(series.close, window, spec.params[1])
+    if spec.kind == "atr":
+        return {"value": atr(series.high, series.low, series.close, window)}
+    return {"value": volatility(series.close, window, periods_per_year)}
+
+
+def compute_many(
+    symbol: str,
+    interval: str,
+    series: PriceSeries,
+    specs: list[IndicatorSpec],
+    periods_per_year: int = 252,
+) -> dict[str, dict[str, np.ndarray]]:
+    """Every spec over `series`, reusing cached results while the last bar (and its values) is unchanged."""
+    if not len(series):
+        return {spec.key: {} for spec in specs}
+    base = (symbol.strip().upper(), interval, *series.cache_key())
+    results: dict[str, dict[str, np.ndarray]] = {}
+    for spec in specs:
+        key = (*base, spec)
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+        else:
+            _cache_stats["misses"] += 1
+            cached = compute(spec, series, periods_per_year)
+            _cache[key] = cached
+            while len(_cache) > INDICATOR_CACHE_MAX_SIZE:
+                _cache.popitem(last=False)
+        results[spec.key] = cached
+    return results
+
+
+def clear_cache() -> None:
+    _cache.clear()
+    for key in _cache_stats:
+        _cache_stats[key] = 0
+
+
+def cache_stats() -> dict[str, int]:
+    return {**_cache_stats, "size": len(_cache)}
@@ -3,10 +3,17 @@
 Thin wrapper over the `holidays` NYSE financial calendar so the rest of the app can
 ask "is the market open?" / "when's the next session?" without re-deriving holiday rules.
 """
-from datetime import date, timedelta
+from datetime import UTC, date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
 
 import holidays
 
+MARKET_TZ = ZoneInfo("America/New_York")
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16, 0)
+# Closing-auction prints and late corrections keep arriving for a few minutes after the bell.
+SETTLE_AFTER_CLOSE = timedelta(minutes=15)
+
 # NYSE/Nasdaq share the same full-day market holidays. A wide year range is generated
 # lazily by the library, so this is cheap to keep at module scope.
 _market_holidays = holidays.financial_holidays("NYSE")
@@ -23,3 +30,56 @@ def next_trading_day(day: date) -> date:
     while not is_trading_day(current):
         current += timedelta(days=1)
     return current
+
+
+def _session_bounds(day: date) -> tuple[datetime, datetime]:
+    opens = datetime.combine(day, SESSION_OPEN, tzinfo=MARKET_TZ)
+    closes = datetime.combine(day, SESSION_CLOSE, tzinfo=MARKET_TZ) + SETTLE_AFTER_CLOSE
+    return opens, closes
+
+
+def _as_market_time(now: datetime | None) -> datetime:
+    now = now or datetime.now(UTC)
+    return (now if now.tzinfo else now.replace(tzinfo=UTC)).astimezone(MARKET_TZ)
+
+
+def is_market_open(now: datetime | None = None) -> bool:
+    """True during a regular session (plus the settle window after the close)."""
+    local = _as_market_time(now)
+    if not is_trading_day(local.date()):
+        return False
+    opens, closes = _session_bounds(local.date())
+    return opens <= local < closes
+
+
+def next_session_open(now: datetime | None = None) -> datetime:
+    """When the next regular session opens, strictly after `now`."""
+    local = _as_market_time(now)
+    day = local.date()
+    if is_trading_day(day) and local < _session_bounds(day)[0]:
+        return _session_bounds(day)[0]
+    return _session_bounds(next_trading_day(day + timedelta(days=1)))[0]
+
+
+def last_closed_session(now: datetime | None = None) -> date:
+    """The most recent trading day whose session (and settle window) has ended by `now`."""
+    local = _as_market_time(now)
+    day = local.date()
+    if is_trading_day(day) and local >= _session_bounds(day)[1]:
+        return day
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def cache_ttl(seconds: float, now: datetime | None = None) -> float:
+    """How long market data fetched at `now` stays fresh.
+
+    `seconds` while the market is open; otherwise prices can't move until the next
+    session, so data is kept until that session opens.
+    """
+    if is_market_open(now):
+        return seconds
+    local = _as_market_time(now)
+    return max(seconds, (next_session_open(local) - local).total_seconds())
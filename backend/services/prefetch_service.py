@@ -0,0 +1,151 @@
+"""Off-hours prefetch of market data for every symbol the app's users care about.
+
+After each session closes, the symbols in SnapTrade holdings, watchlists and
+recurring-buy schedules are warmed through the normal rate-limited paths: closing
+quotes in batches, then each symbol's daily bars (into the bar store) and profile.
+Work runs in the background lane, so interactive requests still go first.
+
+Progress is checkpointed to a small JSON file after every symbol. A pass cut
+short by a restart, the market opening or Twelve Data running out of credits
+resumes from the next symbol; a new session starts a fresh pass.
+"""
+import json
+import logging
+import os
+from datetime import UTC, datetime
+from pathlib import Path
+
+from sqlalchemy import select
+
+from config import TWELVE_DATA_PREFETCH_BARS, TWELVE_DATA_PREFETCH_STATE_PATH
+from database import SessionLocal
+from db_models import WatchlistItem
+from services import market_calendar
+from services import recurring_buy_service as recurring_buy_svc
+from services import snaptrade_service as snaptrade_svc
+from services import stock_data_service as stock_svc
+from services import user_service as user_svc
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_BARS = TWELVE_DATA_PREFETCH_BARS
+STATE_PATH = TWELVE_DATA_PREFETCH_STATE_PATH
+
+_progress: dict[str, object] = {
+    "status": "idle",
+    "session": None,
+    "total": 0,
+    "done": 0,
+    "failed": 0,
+    "startedAt": None,
+    "finishedAt": None,
+}
+
+
+def _load_state() -> dict | None:
+    try:
+        with open(STATE_PATH, encoding="utf-8") as handle:
+            state = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) and isinstance(state.get("symbols"), list) else None
+
+
+def _save_state(state: dict) -> None:
+    """Write the checkpoint, atomically replacing the previous one."""
+    path = Path(STATE_PATH)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Could not checkpoint prefetch progress to %s: %s", path, exc)
+
+
+def _publish(state: dict, status: str) -> None:
+    _progress.update(
+        status=status,
+        session=state["session"],
+        total=len(state["symbols"]),
+        done=state["next"],
+        failed=state["failed"],
+        startedAt=state.get("startedAt"),
+        finishedAt=state.get("finishedAt"),
+    )
+
+
+def prefetch_stats() -> dict[str, object]:
+    return dict(_progress)
+
+
+async def collect_symbols() -> list[str]:
+    """Every symbol held in a SnapTrade account, on a watchlist or in an active recurring buy."""
+    symbols = set(recurring_buy_svc.active_symbols())
+    with SessionLocal() as db:
+        symbols.update(db.scalars(select(WatchlistItem.symbol).distinct()))
+    for user_id, user_secret in (await user_svc.list_user_secrets()).items():
+        try:
+            portfolio = await snaptrade_svc.get_portfolio(user_id, user_secret)
+        except Exception as exc:
+            logger.warning("prefetch skipped holdings for user %s: %s", user_id, exc)
+            continue
+        symbols.update(holding.symbol for account in portfolio.accounts for holding in account.holdings)
+    return sorted({symbol.strip().upper() for symbol in symbols if symbol and symbol.strip()})
+
+
+async def run(now: datetime | None = None) -> dict[str, object]:
+    """Start or resume the pass for the last closed session; a no-op while the market is open."""
+    if market_calendar.is_market_open(now):
+        _progress["status"] = "waiting"
+        return prefetch_stats()
+    session = market_calendar.last_closed_session(now).isoformat()
+    state = _load_state()
+    if state is None or state.get("session") != session:
+        state = {
+            "session": session,
+            "symbols": await collect_symbols(),
+            "next": 0,
+            "failed": 0,
+            "startedAt": datetime.now(UTC).isoformat(),
+            "finishedAt": None,
+        }
+        _save_state(state)
+    symbols: list[str] = state["symbols"]
+    if state["next"] >= len(symbols):
+        _publish(state, "done")
+        return prefetch_stats()
+
+    _publish(state, "running")
+    logger.info("prefetch for %s session: %s/%s symbols done", session, state["next"], len(symbols))
+    quotes_warmed_to = state["next"]
+    while state["next"] < len(symbols):
+        if now is None and market_calendar.is_market_open():
+            _publish(state, "waiting")
+            return prefetch_stats()
+        symbol = symbols[state["next"]]
+        try:
+            if state["next"] >= quotes_warmed_to:
+                # Closing quotes stay cached until the next open; fetch them a batch at a time.
+                batch = symbols[state["next"]:state["next"] + stock_svc.quote_batch_size()]
+                with stock_svc.background_priority():
+                    await stock_svc.get_quote_batch(batch)
+                quotes_warmed_to = state["next"] + len(batch)
+            await stock_svc.warm_symbol(symbol, PREFETCH_BARS)
+        except (stock_svc.StockDataRateLimitError, stock_svc.StockDataUnavailableError) as exc:
+            logger.info("prefetch paused at %s (%s/%s): %s", symbol, state["next"], len(symbols), exc)
+            _publish(state, "paused")
+            return prefetch_stats()
+        except stock_svc.StockDataConfigurationError:
+            raise
+        except Exception as exc:
+            logger.warning("prefetch failed for %s: %s", symbol, exc)
+            state["failed"] += 1
+        state["next"] += 1
+        if state["next"] == len(symbols):
+            state["finishedAt"] = datetime.now(UTC).isoformat()
+        _save_state(state)
+        _publish(state, "running")
+    _publish(state, "done")
+    logger.info("prefetch for %s session finished: %s symbols, %s failed", session, len(symbols), state["failed"])
+    return prefetch_stats()
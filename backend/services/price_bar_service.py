@@ -0,0 +1,127 @@
+"""Persistent store for Twelve Data OHLCV bars.
+
+Bars are keyed by (symbol, interval, bar_time) so repeat chart loads read
+locally and upstream is only asked for bars newer than the last one stored
+(or for holes in the stored range).
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from db_models import StockPriceBar
+from services import market_calendar
+from services.price_series import PriceSeries
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def load_bars(db: Session, symbol: str, interval: str, limit: int) -> PriceSeries:
+    """The most recent `limit` stored bars, oldest first, as a columnar series."""
+    rows = db.execute(
+        select(
+            StockPriceBar.bar_time,
+            StockPriceBar.open,
+            StockPriceBar.high,
+            StockPriceBar.low,
+            StockPriceBar.close,
+            StockPriceBar.volume,
+        )
+        .where(StockPriceBar.symbol == symbol, StockPriceBar.interval == interval)
+        .order_by(StockPriceBar.bar_time.desc())
+        .limit(limit)
+    ).all()
+    if not rows:
+        return PriceSeries.empty()
+    times, opens, highs, lows, closes, volumes = zip(*rows)
+    return PriceSeries.from_columns(
+        [value.replace(tzinfo=None) for value in times],
+        [float(value) for value in opens],
+        [float(value) for value in highs],
+        [float(value) for value in lows],
+        [float(value) for value in closes],
+        [int(value or 0) for value in volumes],
+    )
+
+
+def latest_fetched_at(db: Session, symbol: str, interval: str) -> datetime | None:
+    """When the newest stored bar was last fetched from upstream."""
+    row = db.scalar(
+        select(StockPriceBar)
+        .where(StockPriceBar.symbol == symbol, StockPriceBar.interval == interval)
+        .order_by(StockPriceBar.bar_time.desc())
+        .limit(1)
+    )
+    return _as_utc(row.fetched_at) if row is not None and row.fetched_at else None
+
+
+def _upsert(db: Session, symbol: str, interval: str, bars: PriceSeries, now: datetime) -> None:
+    times = bars.datetimes()
+    existing = {
+        row.bar_time: row
+        for row in db.scalars(
+            select(StockPriceBar).where(
+                StockPriceBar.symbol == symbol,
+                StockPriceBar.interval == interval,
+                StockPriceBar.bar_time >= min(times),
+                StockPriceBar.bar_time <= max(times),
+            )
+        )
+    }
+    columns = zip(
+        times,
+        bars.open.tolist(),
+        bars.high.tolist(),
+        bars.low.tolist(),
+        bars.close.tolist(),
+        bars.volume.tolist(),
+    )
+    for bar_time, open_, high, low, close, volume in columns:
+        row = existing.get(bar_time)
+        if row is None:
+            row = StockPriceBar(symbol=symbol, interval=interval, bar_time=bar_time)
+            db.add(row)
+            existing[bar_time] = row
+        row.open = open_
+        row.high = high
+        row.low = low
+        row.close = close
+        row.volume = volume
+        row.fetched_at = now
+    db.commit()
+
+
+def store_bars(db: Session, symbol: str, interval: str, bars: PriceSeries, now: datetime) -> None:
+    if not len(bars):
+        return
+    try:
+        _upsert(db, symbol, interval, bars, now)
+    except IntegrityError:
+        # A concurrent load inserted some of the same bars — retry as updates
+        db.rollback()
+        _upsert(db, symbol, interval, bars, now)
+
+
+def missing_trading_days(bars: PriceSeries) -> list[tuple[date, date]]:
+    """Runs of NYSE trading days absent between the first and last daily bar."""
+    present = bars.dates()
+    if len(present) < 2:
+        return []
+    gaps: list[tuple[date, date]] = []
+    day = market_calendar.next_trading_day(min(present))
+    last = max(present)
+    gap_start: date | None = None
+    gap_end: date | None = None
+    while day <= last:
+        if day in present:
+            if gap_start is not None:
+                gaps.append((gap_start, gap_end))
+                gap_start = None
+        else:
+            gap_start = gap_start or day
+            gap_end = day
+        day = market_calendar.next_trading_day(day + timedelta(days=1))
+    return gaps
@@ -0,0 +1,224 @@
+"""Columnar OHLCV price series backed by NumPy arrays.
+
+Historical bars are parsed straight into arrays and analytics run on those
+arrays; pydantic StockHistoricalData models are only built at the API boundary.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Iterable
+
+import numpy as np
+
+from models.stock_models import StockHistoricalData
+
+TIMESTAMP_DTYPE = "datetime64[s]"
+# Intervals PriceSeries.resample can derive from daily bars.
+RESAMPLE_INTERVALS = ("1week", "1month", "3month")
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _float_column(raw: list[Any]) -> np.ndarray:
+    try:
+        column = np.array(raw, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.fromiter((_to_float(value) for value in raw), dtype=np.float64, count=len(raw))
+    # None parses to NaN; upstream gaps in a field are treated as 0 like the scalar parsers do.
+    return np.nan_to_num(column, nan=0.0)
+
+
+def _timestamp_column(raw: list[Any]) -> tuple[np.ndarray, np.ndarray]:
+    """Parsed timestamps plus a mask of the rows whose timestamp was usable."""
+    cleaned = [value.replace("Z", "") if isinstance(value, str) else value for value in raw]
+    try:
+        stamps = np.array(cleaned, dtype=TIMESTAMP_DTYPE)
+        return stamps, ~np.isnat(stamps)
+    except (TypeError, ValueError):
+        pass
+    stamps = np.empty(len(cleaned), dtype=TIMESTAMP_DTYPE)
+    for index, value in enumerate(cleaned):
+        try:
+            stamps[index] = np.datetime64(value, "s") if value else np.datetime64("NaT")
+        except (TypeError, ValueError):
+            stamps[index] = np.datetime64("NaT")
+    return stamps, ~np.isnat(stamps)
+
+
+@dataclass(frozen=True)
+class PriceSeries:
+    """Ascending, de-duplicated OHLCV bars as parallel arrays."""
+
+    timestamps: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        return cls(
+            timestamps=np.empty(0, dtype=TIMESTAMP_DTYPE),
+            open=np.empty(0),
+            high=np.empty(0),
+            low=np.empty(0),
+            close=np.empty(0),
+            volume=np.empty(0, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_columns(
+        cls,
+        timestamps: Iterable,
+        open: Iterable,
+        high: Iterable,
+        low: Iterable,
+        close: Iterable,
+        volume: Iterable,
+    ) -> "PriceSeries":
+        """Build from raw columns; sorts by time and keeps the last bar seen for each timestamp."""
+        stamps = np.asarray(timestamps, dtype=TIMESTAMP_DTYPE)
+        if not len(stamps):
+            return cls.empty()
+        order = np.argsort(stamps, kind="stable")
+        stamps = stamps[order]
+        keep = np.append(stamps[1:] != stamps[:-1], True)
+        return cls(
+            timestamps=stamps[keep],
+            open=np.asarray(open, dtype=np.float64)[order][keep],
+            high=np.asarray(high, dtype=np.float64)[order][keep],
+            low=np.asarray(low, dtype=np.float64)[order][keep],
+            close=np.asarray(close, dtype=np.float64)[order][keep],
+            volume=np.asarray(volume, dtype=np.int64)[order][keep],
+        )
+
+    @classmethod
+    def from_twelve_data(cls, values: list[dict]) -> "PriceSeries":
+        """Parse a Twelve Data time_series ``values`` list; rows without a usable datetime are dropped."""
+        if not values:
+            return cls.empty()
+        stamps, valid = _timestamp_column([value.get("datetime") for value in values])
+        return cls.from_columns(
+            stamps[valid],
+            _float_column([value.get("open") for value in values])[valid],
+            _float_column([value.get("high") for value in values])[valid],
+            _float_column([value.get("low") for value in values])[valid],
+            _float_column([value.get("close") for value in values])[valid],
+            _float_column([value.get("volume") for value in values])[valid].astype(np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def tail(self, count: int) -> "PriceSeries":
+        if count >= len(self):
+            return self
+        start = len(self) - count
+        return PriceSeries(
+            timestamps=self.timestamps[start:],
+            open=self.open[start:],
+            high=self.high[start:],
+            low=self.low[start:],
+            close=self.close[start:],
+            volume=self.volume[start:],
+        )
+
+    def cache_key(self) -> tuple:
+        """Bar count plus the whole newest bar, which intraday refreshes rewrite in place."""
+        if not len(self):
+            return (0,)
+        return (
+            len(self),
+            self.timestamps[-1].item(),
+            float(self.open[-1]),
+            float(self.high[-1]),
+            float(self.low[-1]),
+            float(self.close[-1]),
+            int(self.volume[-1]),
+        )
+
+    def since(self, start: datetime) -> "PriceSeries":
+        """Bars at or after `start`."""
+        first = int(np.searchsorted(self.timestamps, np.datetime64(start.replace(tzinfo=None), "s")))
+        return self.tail(len(self) - first)
+
+    def merge(self, other: "PriceSeries") -> "PriceSeries":
+        """Union of both series; bars in `other` replace bars here with the same timestamp."""
+        if not len(other):
+            return self
+        if not len(self):
+            return other
+        return PriceSeries.from_columns(
+            np.concatenate([self.timestamps, other.timestamps]),
+            np.concatenate([self.open, other.open]),
+            np.concatenate([self.high, other.high]),
+            np.concatenate([self.low, other.low]),
+            np.concatenate([self.close, other.close]),
+            np.concatenate([self.volume, other.volume]),
+        )
+
+    def resample(self, interval: str) -> "PriceSeries":
+        """Aggregate into weekly (Monday), monthly or quarterly bars labelled by period start.
+
+        Periods come from the bar dates, so the newest bar may cover a period still in progress.
+        """
+        if interval not in RESAMPLE_INTERVALS:
+            raise ValueError(f"Cannot resample to interval '{interval}'")
+        if not len(self):
+            return self
+        days = self.timestamps.astype("datetime64[D]")
+        if interval == "1week":
+            # Day 0 (1970-01-01) was a Thursday; shift so each key is that week's Monday.
+            ordinal = days.astype(np.int64)
+            keys = (ordinal - (ordinal + 3) % 7).astype("datetime64[D]")
+        else:
+            months = days.astype("datetime64[M]")
+            if interval == "3month":
+                months = (months.astype(np.int64) // 3 * 3).astype("datetime64[M]")
+            keys = months.astype("datetime64[D]")
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        ends = np.append(starts[1:], len(self)) - 1
+        return PriceSeries(
+            timestamps=keys[starts].astype(TIMESTAMP_DTYPE),
+            open=self.open[starts],
+            high=np.maximum.reduceat(self.high, starts),
+            low=np.minimum.reduceat(self.low, starts),
+            close=self.close[ends],
+            volume=np.add.reduceat(self.volume, starts),
+        )
+
+    def first_datetime(self) -> datetime:
+        return self.timestamps[0].astype("datetime64[us]").item()
+
+    def last_datetime(self) -> datetime:
+        return self.timestamps[-1].astype("datetime64[us]").item()
+
+    def datetimes(self) -> list[datetime]:
+        return self.timestamps.astype("datetime64[us]").tolist()
+
+    def dates(self) -> set[date]:
+        return set(self.timestamps.astype("datetime64[D]").tolist())
+
+    def high_max(self) -> float | None:
+        return float(self.high.max()) if len(self) else None
+
+    def low_min(self) -> float | None:
+        return float(self.low.min()) if len(self) else None
+
+    def to_models(self) -> list[StockHistoricalData]:
+        return [
+            StockHistoricalData(date=stamp, open=o, high=h, low=l, close=c, volume=v)
+            for stamp, o, h, l, c, v in zip(
+                self.datetimes(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist(),
+            )
+        ]
@@ -0,0 +1,184 @@
+"""Shared quote poller behind the streaming quotes endpoint.
+
+One background task refreshes the union of every subscriber's symbols through
+the batched quote path, so upstream cost follows the number of distinct symbols
+rather than the number of open tabs. Changed quotes are fanned out to the
+subscribers watching them.
+
+Each subscriber holds at most one pending quote per symbol: a slow reader gets
+the newest price when it catches up instead of an ever-growing backlog.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from config import (
+    QUOTE_STREAM_MAX_SUBSCRIBERS,
+    QUOTE_STREAM_MAX_SYMBOLS,
+    QUOTE_STREAM_POLL_SECONDS,
+)
+from models.stock_models import StockQuote
+from services import stock_data_service as stock_svc
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = QUOTE_STREAM_POLL_SECONDS
+MAX_SUBSCRIBERS = QUOTE_STREAM_MAX_SUBSCRIBERS
+MAX_SYMBOLS = QUOTE_STREAM_MAX_SYMBOLS
+
+
+class QuoteStreamFullError(RuntimeError):
+    pass
+
+
+@dataclass(eq=False)
+class Subscription:
+    symbols: frozenset[str]
+    conflated: int = 0
+    _pending: dict[str, StockQuote] = field(default_factory=dict)
+    _ready: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def offer(self, quote: StockQuote) -> None:
+        if quote.symbol in self._pending:
+            self.conflated += 1
+        self._pending[quote.symbol] = quote
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> list[StockQuote]:
+        """Quotes that changed since the last call; empty if none arrive within `timeout`."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except TimeoutError:
+            return []
+        self._ready.clear()
+        batch = list(self._pending.values())
+        self._pending.clear()
+        return batch
+
+
+_subscriptions: set[Subscription] = set()
+_latest: dict[str, StockQuote] = {}
+_poller: asyncio.Task | None = None
+_wake: asyncio.Event | None = None
+_stats = {"polls": 0, "pushed": 0, "rejected": 0, "conflated": 0}
+
+
+def _subscribed_symbols() -> set[str]:
+    return set().union(*(subscription.symbols for subscription in _subscriptions))
+
+
+def _changed(previous: StockQuote | None, quote: StockQuote) -> bool:
+    if previous is None:
+        return True
+    return (previous.price, previous.change, previous.change_percent, previous.volume) != (
+        quote.price,
+        quote.change,
+        quote.change_percent,
+        quote.volume,
+    )
+
+
+def subscribe(symbols: list[str]) -> Subscription:
+    """Register a viewer of `symbols`; raises QuoteStreamFullError at the subscriber cap."""
+    global _poller, _wake
+    wanted = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    if not wanted:
+        raise ValueError("At least one symbol is required")
+    if len(wanted) > MAX_SYMBOLS:
+        raise ValueError(f"At most {MAX_SYMBOLS} symbols can be streamed at once")
+    if len(_subscriptions) >= MAX_SUBSCRIBERS:
+        _stats["rejected"] += 1
+        raise QuoteStreamFullError("Too many open quote streams; try again shortly")
+    subscription = Subscription(frozenset(wanted))
+    new_symbols = subscription.symbols - _subscribed_symbols()
+    _subscriptions.add(subscription)
+    for symbol in wanted:
+        if symbol in _latest:
+            subscription.offer(_latest[symbol])
+    if _poller is None or _poller.done():
+        _wake = asyncio.Event()
+        _poller = asyncio.create_task(_poll_loop(_wake))
+    elif new_symbols and _wake is not None:
+        # Don't make a new viewer wait a full interval for symbols nobody was watching.
+        _wake.set()
+    return subscription
+
+
+def unsubscribe(subscription: Subscription) -> None:
+    if subscription in _subscriptions:
+        _subscriptions.discard(subscription)
+        _stats["conflated"] += subscription.conflated
+    for symbol in set(_latest) - _subscribed_symbols():
+        _latest.pop(symbol, None)
+
+
+async def poll_once() -> None:
+    """Refresh every subscribed symbol in one batched lookup and fan out the changes."""
+    symbols = _subscribed_symbols()
+    if not symbols:
+        return
+    with stock_svc.background_priority():
+        quotes, errors = await stock_svc.get_quote_batch(sorted(symbols))
+    _stats["polls"] += 1
+    for symbol, message in errors.items():
+        logger.debug("Streamed quote failed for %s: %s", symbol, message)
+    for quote in quotes:
+        if not _changed(_latest.get(quote.symbol), quote):
+            continue
+        _latest[quote.symbol] = quote
+        for subscription in _subscriptions:
+            if quote.symbol in subscription.symbols:
+                subscription.offer(quote)
+                _stats["pushed"] += 1
+
+
+async def _poll_loop(wake: asyncio.Event) -> None:
+    global _poller
+    try:
+        while _subscriptions:
+            try:
+                await poll_once()
+            except Exception as exc:
+                logger.warning("quote stream poll failed: %s", exc)
+            wake.clear()
+            try:
+                await asyncio.wait_for(wake.wait(), POLL_SECONDS)
+            except TimeoutError:
+                pass
+    finally:
+        if _poller is asyncio.current_task():
+            _poller = None
+
+
+async def stop() -> None:
+    """Cancel the poller and drop every subscription (app shutdown, tests)."""
+    global _poller, _wake
+    poller, _poller, _wake = _poller, None, None
+    _subscriptions.clear()
+    _latest.clear()
+    if poller is not None and not poller.done():
+        poller.cancel()
+        try:
+            await poller
+        except (asyncio.CancelledError, RuntimeError):
+            pass
+
+
+def reset() -> None:
+    """Forget all stream state without touching the event loop (tests)."""
+    global _poller, _wake
+    _poller = None
+    _wake = None
+    _subscriptions.clear()
+    _latest.clear()
+    for key in _stats:
+        _stats[key] = 0
+
+
+def stream_stats() -> dict[str, int]:
+    return {
+        **_stats,
+        "conflated": _stats["conflated"] + sum(subscription.conflated for subscription in _subscriptions),
+        "subscribers": len(_subscriptions),
+        "symbols": len(_subscribed_symbols()),
+    }
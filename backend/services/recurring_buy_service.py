@@ -11,6 +11,8 @@ import os
 from datetime import date, datetime, time, timedelta, timezone
 from zoneinfo import ZoneInfo
 
+import httpx
+import numpy as np
 from sqlalchemy import delete as sql_delete, select
 
 from database import SessionLocal
@@ -63,7 +65,8 @@ def compute_next_run_date(frequency: str, from_date: date) -> date:
     return market_calendar.next_trading_day(raw)
 
 
-def _validate(symbol: str, units: float | None, target_amount: float | None, frequency: str) -> tuple[str, str]:
+def validate_rule(symbol: str, units: float | None, target_amount: float | None, frequency: str) -> tuple[str, str]:
+    """Check a buy rule (exactly one of units or target amount) and return (symbol, frequency) normalized."""
     normalized_symbol = _normalize_symbol(symbol)
     if not normalized_symbol:
         raise ValueError("symbol is required")
@@ -81,6 +84,14 @@ def _validate(symbol: str, units: float | None, target_amount: float | None, fre
     return normalized_symbol, normalized_frequency
 
 
+def carry_budget(budget):
+    """The dollar-cost budget carried into the next run: never negative, rounded to cents.
+
+    Works elementwise on arrays too, so the backtest replays exactly the live rule.
+    """
+    return np.round(np.maximum(budget, 0.0), 2)
+
+
 def _field(row, key):
     return row[key] if isinstance(row, dict) else getattr(row, key)
 
@@ -134,7 +145,7 @@ async def create_schedule(
     target_amount: float | None = None,
     start_date: date | None = None,
 ) -> RecurringBuySchedule:
-    normalized_symbol, normalized_frequency = _validate(symbol, units, target_amount, frequency)
+    normalized_symbol, normalized_frequency = validate_rule(symbol, units, target_amount, frequency)
     next_run = market_calendar.next_trading_day(start_date or _central_now().date())
 
     if _use_database:
@@ -272,7 +283,7 @@ def _persist_run(
             row.last_status = status[:255]
             row.last_order_id = order_id
             if accumulated_budget is not None:
-                row.accumulated_budget = round(accumulated_budget, 2)
+                row.accumulated_budget = float(carry_budget(accumulated_budget))
             row.next_run_date = compute_next_run_date(row.frequency, run_date)
             db.commit()
         return
@@ -283,7 +294,7 @@ def _persist_run(
     item["last_status"] = status[:255]
     item["last_order_id"] = order_id
     if accumulated_budget is not None:
-        item["accumulated_budget"] = round(accumulated_budget, 2)
+        item["accumulated_budget"] = float(carry_budget(accumulated_budget))
     item["next_run_date"] = compute_next_run_date(str(item["frequency"]), run_date)
 
 
@@ -305,6 +316,20 @@ def _due_schedules(today: date) -> list[dict[str, object]]:
     ]
 
 
+def active_symbols() -> list[str]:
+    """Distinct symbols of every active schedule, across all users."""
+    if _use_database:
+        with SessionLocal() as db:
+            return sorted(
+                set(
+                    db.scalars(
+                        select(SnapTradeRecurringBuySchedule.symbol).where(SnapTradeRecurringBuySchedule.active.is_(True))
+                    )
+                )
+            )
+    return sorted({str(item["symbol"]) for item in _schedules.values() if item["active"]})
+
+
 def _due_dict(row) -> dict[str, object]:
     return {
         "id": _field(row, "id"),
@@ -336,7 +361,13 @@ async def _execute_one(schedule: dict, user_id: str, user_secret: str, run_date:
 
     # Dollar-cost mode: top up the budget, buy as many whole shares as it covers, carry the rest.
     budget = float(schedule.get("accumulated_budget") or 0) + float(target_amount)
-    quote = await stock_svc.get_stock_quote(symbol)
+    try:
+        with stock_svc.background_priority():
+            # Orders are sized from a fresh quote only; a stale one could overspend the budget.
+            quote = await stock_svc.get_stock_quote(symbol, allow_stale=False)
+    except (stock_svc.StockDataRateLimitError, stock_svc.StockDataUnavailableError, httpx.HTTPError) as exc:
+        logger.warning("No live price for recurring buy %s (%s): %s", schedule_id, symbol, exc)
+        quote = None
     price = float(getattr(quote, "price", 0) or 0) if quote else 0.0
     if price <= 0:
         _persist_run(schedule_id, user_id, "failed: no live price for symbol", None, run_date,
@@ -355,11 +386,11 @@ async def _execute_one(schedule: dict, user_id: str, user_secret: str, run_date:
         order_type="MARKET", time_in_force="DAY", units=float(shares),
     )
     fill_price = float(execution.price) if execution.price else price
-    remaining = budget - (shares * fill_price)
+    carried = float(carry_budget(budget - (shares * fill_price)))
     _persist_run(schedule_id, user_id,
-                 f"executed: {shares} share(s) (~${shares * fill_price:.2f}), ${remaining:.2f} carried",
+                 f"executed: {shares} share(s) (~${shares * fill_price:.2f}), ${carried:.2f} carried",
                  execution.brokerage_order_id or None, run_date,
-                 accumulated_budget=max(0.0, remaining))
+                 accumulated_budget=carried)
     return "placed"
 
 
@@ -160,16 +160,17 @@ def apply_preferences(
         preference = preferences.get(key)
         if preference and preference.get("hidden"):
             continue
-        item = investment.model_copy(deep=True)
-        if preference:
-            amount = preference.get("amount")
-            frequency = preference.get("frequency")
-            if isinstance(amount, (int, float)):
-                item.amount = float(amount)
-            if isinstance(frequency, str) and frequency:
-                item.frequency = frequency
-            item.source = "manual"
-        adjusted.append(item)
+        if not preference:
+            adjusted.append(investment)
+            continue
+        update: dict[str, object] = {"source": "manual"}
+        amount = preference.get("amount")
+        frequency = preference.get("frequency")
+        if isinstance(amount, (int, float)):
+            update["amount"] = float(amount)
+        if isinstance(frequency, str) and frequency:
+            update["frequency"] = frequency
+        adjusted.append(investment.model_copy(update=update))
     return adjusted
 
 
@@ -0,0 +1,401 @@
+"""Bounded cache storage for SnapTrade portfolio, recurring-investment and dividend results.
+
+Entries live in named namespaces on one shared backend:
+
+* ``MemoryBackend`` (default) keeps values in-process in LRU order under a byte
+  budget. An entry is charged its serialized JSON size.
+* ``SQLiteBackend`` stores serialized values in a local SQLite file, so several
+  uvicorn workers on one host share results (and invalidations).
+
+Both keep a per-user index, so dropping one user's entries doesn't scan the
+cache, and drop entries past their hard expiry on a sweep that runs every
+SWEEP_SECONDS (from a background loop, and as the cache is written to).
+
+Each backend also keeps per-user generations, bumped whenever a user's entries
+(or a whole namespace) are invalidated. A fetch records the generation before it
+starts and its result is only stored if that is still current, so a fetch that
+raced an invalidation, in any worker sharing the backend, can't store stale data.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import TypeAdapter
+
+from config import (
+    SNAPTRADE_CACHE_BACKEND,
+    SNAPTRADE_CACHE_MAX_BYTES,
+    SNAPTRADE_CACHE_SQLITE_PATH,
+    SNAPTRADE_CACHE_SWEEP_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = SNAPTRADE_CACHE_MAX_BYTES
+SWEEP_SECONDS = SNAPTRADE_CACHE_SWEEP_SECONDS
+# Generation row bumped when a whole namespace is cleared, for every user at once.
+_ALL_USERS = ""
+
+
+@dataclass
+class CacheEntry:
+    fresh_until: float
+    expires_at: float
+    value: object
+
+
+def _key_text(key) -> str:
+    return json.dumps(key, separators=(",", ":"))
+
+
+class MemoryBackend:
+    """In-process LRU over every namespace, evicting least recently used entries past `max_bytes`."""
+
+    # Operations never block, so async callers may run them on the event loop.
+    blocking = False
+
+    def __init__(self, max_bytes: int = MAX_BYTES, sweep_seconds: float = SWEEP_SECONDS):
+        self.max_bytes = max_bytes
+        self.sweep_seconds = sweep_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[str, int, CacheEntry]] = OrderedDict()
+        self._by_user: dict[str, set[tuple[str, str]]] = {}
+        self._generations: dict[str, int] = {}
+        self._bytes = 0
+        self._last_sweep = time.time()
+        self._stats = {"evictions": 0, "expired": 0}
+
+    def get(self, namespace: str, key, adapter: TypeAdapter) -> CacheEntry | None:
+        slot = (namespace, _key_text(key))
+        stored = self._entries.get(slot)
+        if stored is None:
+            return None
+        if stored[2].expires_at <= time.time():
+            self._remove(slot)
+            self._stats["expired"] += 1
+            return None
+        self._entries.move_to_end(slot)
+        return stored[2]
+
+    def generation(self, user_id: str) -> tuple[int, int]:
+        return self._generations.get(_ALL_USERS, 0), self._generations.get(user_id, 0)
+
+    def set(
+        self,
+        namespace: str,
+        key,
+        user_id: str,
+        entry: CacheEntry,
+        adapter: TypeAdapter,
+        generation: tuple[int, int] | None = None,
+    ) -> bool:
+        """Store `entry`, unless `generation` is given and the user's entries were invalidated since."""
+        if generation is not None and self.generation(user_id) != generation:
+            return False
+        slot = (namespace, _key_text(key))
+        size = len(adapter.dump_json(entry.value))
+        self._remove(slot)
+        if size > self.max_bytes:
+            return False
+        self._entries[slot] = (user_id, size, entry)
+        self._by_user.setdefault(user_id, set()).add(slot)
+        self._bytes += size
+        self._maybe_sweep()
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+        return True
+
+    def invalidate_user(self, user_id: str, namespace: str | None = None) -> int:
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        slots = [slot for slot in self._by_user.get(user_id, ()) if namespace is None or slot[0] == namespace]
+        for slot in slots:
+            self._remove(slot)
+        return len(slots)
+
+    def clear(self, namespace: str | None = None) -> None:
+        self._generations[_ALL_USERS] = self._generations.get(_ALL_USERS, 0) + 1
+        for slot in [slot for slot in self._entries if namespace is None or slot[0] == namespace]:
+            self._remove(slot)
+
+    def sweep(self) -> int:
+        now = time.time()
+        self._last_sweep = now
+        expired = [slot for slot, (_, _, entry) in self._entries.items() if entry.expires_at <= now]
+        for slot in expired:
+            self._remove(slot)
+        self._stats["expired"] += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "users": len(self._by_user),
+            "bytes": self._bytes,
+            "maxBytes": self.max_bytes,
+            **self._stats,
+        }
+
+    def _maybe_sweep(self) -> None:
+        if time.time() - self._last_sweep >= self.sweep_seconds:
+            self.sweep()
+
+    def _remove(self, slot: tuple[str, str]) -> None:
+        stored = self._entries.pop(slot, None)
+        if stored is None:
+            return
+        user_id, size, _ = stored
+        self._bytes -= size
+        user_slots = self._by_user.get(user_id)
+        if user_slots is not None:
+            user_slots.discard(slot)
+            if not user_slots:
+                del self._by_user[user_id]
+
+
+class SQLiteBackend:
+    """Entries in a local SQLite file shared by every worker process on the host.
+
+    Values are stored as JSON and decoded on each read, so callers always get
+    their own objects. `last_used` drives LRU eviction once the stored values
+    exceed `max_bytes`. Generations live in the file too, so an invalidation in
+    one worker stops stale writes from fetches running in the others.
+    """
+
+    # Every operation is file I/O; async callers should run them off the event loop.
+    blocking = True
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, sweep_seconds: float = SWEEP_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.sweep_seconds = sweep_seconds
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+        self._stats = {"evictions": 0, "expired": 0}
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snaptrade_cache (
+                namespace TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                fresh_until REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                size INTEGER NOT NULL,
+                value BLOB NOT NULL,
+                PRIMARY KEY (namespace, cache_key)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_snaptrade_cache_user ON snaptrade_cache (user_id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_snaptrade_cache_last_used ON snaptrade_cache (last_used)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_snaptrade_cache_expires ON snaptrade_cache (expires_at)")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS snaptrade_cache_generations (
+                user_id TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            )
+            """
+        )
+
+    @contextmanager
+    def _transaction(self):
+        """Hold the database write lock, across processes, until the block commits."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _generation(self, user_id: str) -> tuple[int, int]:
+        generations = dict(
+            self._db.execute(
+                "SELECT user_id, generation FROM snaptrade_cache_generations WHERE user_id IN (?, ?)",
+                (_ALL_USERS, user_id),
+            ).fetchall()
+        )
+        return generations.get(_ALL_USERS, 0), generations.get(user_id, 0)
+
+    def _bump_generation(self, user_id: str) -> None:
+        self._db.execute(
+            "INSERT INTO snaptrade_cache_generations VALUES (?, 1) "
+            "ON CONFLICT (user_id) DO UPDATE SET generation = generation + 1",
+            (user_id,),
+        )
+
+    def generation(self, user_id: str) -> tuple[int, int]:
+        with self._lock:
+            return self._generation(user_id)
+
+    def get(self, namespace: str, key, adapter: TypeAdapter) -> CacheEntry | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fresh_until, expires_at, value FROM snaptrade_cache WHERE namespace = ? AND cache_key = ?",
+                (namespace, _key_text(key)),
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            self._db.execute(
+                "UPDATE snaptrade_cache SET last_used = ? WHERE namespace = ? AND cache_key = ?",
+                (now, namespace, _key_text(key)),
+            )
+        try:
+            return CacheEntry(row[0], row[1], adapter.validate_json(row[2]))
+        except ValueError as exc:
+            # Written by a build with a different model shape; treat it as a miss.
+            logger.warning("Discarding unreadable %s cache entry: %s", namespace, exc)
+            return None
+
+    def set(
+        self,
+        namespace: str,
+        key,
+        user_id: str,
+        entry: CacheEntry,
+        adapter: TypeAdapter,
+        generation: tuple[int, int] | None = None,
+    ) -> bool:
+        """Store `entry`, unless `generation` is given and the user's entries were invalidated since."""
+        payload = adapter.dump_json(entry.value)
+        if len(payload) > self.max_bytes:
+            return False
+        now = time.time()
+        with self._lock:
+            with self._transaction():
+                if generation is not None and self._generation(user_id) != generation:
+                    return False
+                self._db.execute(
+                    "INSERT OR REPLACE INTO snaptrade_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        namespace,
+                        _key_text(key),
+                        user_id,
+                        entry.fresh_until,
+                        entry.expires_at,
+                        now,
+                        len(payload),
+                        payload,
+                    ),
+                )
+            if now - self._last_sweep >= self.sweep_seconds:
+                self._sweep(now)
+            self._evict()
+        return True
+
+    def invalidate_user(self, user_id: str, namespace: str | None = None) -> int:
+        with self._lock, self._transaction():
+            self._bump_generation(user_id)
+            if namespace is None:
+                cursor = self._db.execute("DELETE FROM snaptrade_cache WHERE user_id = ?", (user_id,))
+            else:
+                cursor = self._db.execute(
+                    "DELETE FROM snaptrade_cache WHERE user_id = ? AND namespace = ?", (user_id, namespace)
+                )
+            return cursor.rowcount
+
+    def clear(self, namespace: str | None = None) -> None:
+        with self._lock, self._transaction():
+            self._bump_generation(_ALL_USERS)
+            if namespace is None:
+                self._db.execute("DELETE FROM snaptrade_cache")
+            else:
+                self._db.execute("DELETE FROM snaptrade_cache WHERE namespace = ?", (namespace,))
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep(time.time())
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            entries, users, size = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT user_id), COALESCE(SUM(size), 0) FROM snaptrade_cache"
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            "entries": entries,
+            "users": users,
+            "bytes": size,
+            "maxBytes": self.max_bytes,
+            **self._stats,
+        }
+
+    def _sweep(self, now: float) -> int:
+        self._last_sweep = now
+        expired = self._db.execute("DELETE FROM snaptrade_cache WHERE expires_at <= ?", (now,)).rowcount
+        self._stats["expired"] += expired
+        return expired
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM snaptrade_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for namespace, cache_key, size in self._db.execute(
+            "SELECT namespace, cache_key, size FROM snaptrade_cache ORDER BY last_used"
+        ):
+            if total <= self.max_bytes:
+                break
+            victims.append((namespace, cache_key))
+            total -= size
+        self._db.executemany("DELETE FROM snaptrade_cache WHERE namespace = ? AND cache_key = ?", victims)
+        self._stats["evictions"] += len(victims)
+
+
+class CacheNamespace:
+    """One logical cache (e.g. portfolios) on the shared backend, keyed by JSON-serializable keys."""
+
+    def __init__(self, name: str, value_type, backend_getter):
+        self.name = name
+        self.adapter = TypeAdapter(value_type)
+        self._backend = backend_getter
+
+    @property
+    def blocking(self) -> bool:
+        return self._backend().blocking
+
+    def get(self, key) -> CacheEntry | None:
+        return self._backend().get(self.name, key, self.adapter)
+
+    def generation(self, user_id: str) -> tuple[int, int]:
+        return self._backend().generation(user_id)
+
+    def set(
+        self,
+        key,
+        user_id: str,
+        fresh_until: float,
+        expires_at: float,
+        value,
+        generation: tuple[int, int] | None = None,
+    ) -> bool:
+        return self._backend().set(
+            self.name, key, user_id, CacheEntry(fresh_until, expires_at, value), self.adapter, generation
+        )
+
+    def invalidate_user(self, user_id: str) -> int:
+        return self._backend().invalidate_user(user_id, self.name)
+
+    def clear(self) -> None:
+        self._backend().clear(self.name)
+
+
+def create_backend(kind: str = SNAPTRADE_CACHE_BACKEND) -> MemoryBackend | SQLiteBackend:
+    if kind == "sqlite":
+        return SQLiteBackend(SNAPTRADE_CACHE_SQLITE_PATH)
+    if kind != "memory":
+        logger.warning("Unknown SNAPTRADE_CACHE_BACKEND %r; using the in-memory cache", kind)
+    return MemoryBackend()
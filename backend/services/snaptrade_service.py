@@ -3,15 +3,29 @@ import ast
 import asyncio
 import json
 import logging
+import os
+import threading
 import time
+from collections import deque
 from collections.abc import Mapping, Sequence
-from datetime import date, datetime, timedelta
-from statistics import median
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime, timedelta
+from statistics import median, quantiles
 
 from snaptrade_client import exceptions as snaptrade_exceptions
-from snaptrade_client import SnapTrade
-
-from config import SNAPTRADE_API_URL, SNAPTRADE_CLIENT_ID, SNAPTRADE_CONSUMER_KEY, TRADING_LIVE
+from snaptrade_client import Configuration, SnapTrade
+
+from config import (
+    SNAPTRADE_API_URL,
+    SNAPTRADE_CACHE_HARD_EXPIRY_SECONDS,
+    SNAPTRADE_CLIENT_ID,
+    SNAPTRADE_CONSUMER_KEY,
+    SNAPTRADE_MAX_WORKERS,
+    SNAPTRADE_PER_USER_CONCURRENCY,
+    TRADING_LIVE,
+)
+from database import SessionLocal
 from models.snaptrade_models import (
     Account,
     Brokerage,
@@ -26,12 +40,50 @@ from models.snaptrade_models import (
     TradeExecution,
     TradeImpact,
 )
+from services import activity_ledger_service as activity_ledger_svc
+from services import snaptrade_cache
 
 logger = logging.getLogger(__name__)
 PORTFOLIO_CACHE_TTL_SECONDS = 15 * 60
-_portfolio_cache: dict[str, tuple[float, Portfolio]] = {}
-_recurring_cache: dict[tuple[str, tuple[str, ...], int], tuple[float, list[RecurringInvestment]]] = {}
-_dividend_income_cache: dict[tuple[str, tuple[str, ...], int], tuple[float, DividendIncomeSummary]] = {}
+# SnapTrade's largest page of account activities, and the most pages one fetch follows.
+ACTIVITY_PAGE_SIZE = 1000
+MAX_ACTIVITY_PAGES = 50
+CACHE_HARD_EXPIRY_SECONDS = SNAPTRADE_CACHE_HARD_EXPIRY_SECONDS
+_use_database = bool(os.getenv("DATABASE_URL"))
+_cache_backend: snaptrade_cache.MemoryBackend | snaptrade_cache.SQLiteBackend | None = None
+
+
+def _cache_store() -> snaptrade_cache.MemoryBackend | snaptrade_cache.SQLiteBackend:
+    global _cache_backend
+    if _cache_backend is None:
+        _cache_backend = snaptrade_cache.create_backend()
+    return _cache_backend
+
+
+_portfolio_cache = snaptrade_cache.CacheNamespace("portfolio", Portfolio, _cache_store)
+# Keyed by (user id, held positions, lookback days).
+_recurring_cache = snaptrade_cache.CacheNamespace("recurring", tuple[RecurringInvestment, ...], _cache_store)
+_dividend_income_cache = snaptrade_cache.CacheNamespace("dividendIncome", DividendIncomeSummary, _cache_store)
+# (cache name, key, generation) -> the fetch concurrent callers share. The generation comes
+# from the cache backend, so fetches started before a user's cache was cleared aren't joined.
+_cache_inflight: dict[tuple, asyncio.Task] = {}
+_cache_stats = {
+    name: {"hits": 0, "stale": 0, "misses": 0, "coalesced": 0, "refreshes": 0, "refreshFailures": 0}
+    for name in ("portfolio", "recurring", "dividendIncome")
+}
+
+MAX_WORKERS = max(1, SNAPTRADE_MAX_WORKERS)
+PER_USER_CONCURRENCY = max(1, SNAPTRADE_PER_USER_CONCURRENCY)
+WAIT_SAMPLE_SIZE = 500
+_client: SnapTrade | None = None
+_client_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+# user id -> [semaphore, calls holding or waiting for it]; dropped once the user is idle.
+_user_slots: dict[str, list] = {}
+_executor_lock = threading.Lock()
+_executor_stats = {"calls": 0, "active": 0, "queued": 0, "maxQueued": 0, "waitingOnUser": 0}
+_wait_samples: deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+_wait_totals = {"started": 0, "ms": 0.0, "maxMs": 0.0}
 
 
 class SnapTradeServiceError(RuntimeError):
@@ -42,36 +94,211 @@ class SnapTradeServiceError(RuntimeError):
 
 
 def clear_user_cache(user_id: str) -> None:
-    _portfolio_cache.pop(user_id, None)
-    for key in list(_recurring_cache):
-        if key[0] == user_id:
-            _recurring_cache.pop(key, None)
-    for key in list(_dividend_income_cache):
-        if key[0] == user_id:
-            _dividend_income_cache.pop(key, None)
+    _cache_store().invalidate_user(user_id)
 
 
 def clear_recurring_investments_cache(user_id: str | None = None) -> None:
     if user_id is None:
         _recurring_cache.clear()
-        return
-    for key in list(_recurring_cache):
-        if key[0] == user_id:
-            _recurring_cache.pop(key, None)
+    else:
+        _recurring_cache.invalidate_user(user_id)
+
+
+async def _cache_call(operation, *args):
+    """Run a cache backend operation, in a worker thread when the backend does file I/O."""
+    if _cache_store().blocking:
+        return await asyncio.to_thread(operation, *args)
+    return operation(*args)
+
+
+async def sweep_cache() -> int:
+    """Drop cache entries past their hard expiry; returns how many were dropped."""
+    return await _cache_call(_cache_store().sweep)
 
 
-def _cache_active(expires_at: float) -> bool:
-    return expires_at > time.monotonic()
+def _snapshot(value):
+    """Cached values are shared by every caller: models are frozen, lists become tuples."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _view(snapshot):
+    # A fresh list over the shared (frozen) items, so callers can filter or reorder it.
+    return list(snapshot) if isinstance(snapshot, tuple) else snapshot
+
+
+def _start_fetch(
+    cache: snaptrade_cache.CacheNamespace, key, user_id: str, generation: tuple[int, int], fetch, background: bool
+) -> asyncio.Task:
+    name = cache.name
+    flight_key = (name, key, generation)
+
+    async def run():
+        try:
+            value = _snapshot(await fetch())
+            # Wall-clock times, so entries shared through the SQLite backend mean the same in every worker.
+            now = time.time()
+            expires_at = max(now + PORTFOLIO_CACHE_TTL_SECONDS, now + CACHE_HARD_EXPIRY_SECONDS)
+            # Not stored if the user's cache was cleared (in any worker) since `generation` was read.
+            await _cache_call(
+                cache.set, key, user_id, now + PORTFOLIO_CACHE_TTL_SECONDS, expires_at, value, generation
+            )
+            return value
+        finally:
+            if _cache_inflight.get(flight_key) is task:
+                del _cache_inflight[flight_key]
+
+    def done(finished: asyncio.Task) -> None:
+        if finished.cancelled() or finished.exception() is None:
+            return
+        if background:
+            _cache_stats[name]["refreshFailures"] += 1
+            logger.warning("Background %s refresh failed for user %s: %s", name, user_id, finished.exception())
+
+    task = asyncio.create_task(run())
+    task.add_done_callback(done)
+    _cache_inflight[flight_key] = task
+    return task
+
+
+async def _cached_fetch(
+    cache: snaptrade_cache.CacheNamespace, key, user_id: str, fetch, force_refresh: bool = False
+):
+    """Serve `key` from `cache`, calling `fetch()` at most once at a time per key.
+
+    Fresh entries are returned as is. Past the TTL but before the hard expiry the
+    cached value is still returned, and a single background fetch refreshes it.
+    Otherwise (or on `force_refresh`) the caller waits on the fetch, sharing it with
+    every concurrent miss for the same key.
+    """
+    stats = _cache_stats[cache.name]
+    cached = None if force_refresh else await _cache_call(cache.get, key)
+    if cached is not None and time.time() < cached.fresh_until:
+        stats["hits"] += 1
+        return _view(cached.value)
+    generation = await _cache_call(cache.generation, user_id)
+    flight_key = (cache.name, key, generation)
+    if cached is not None and time.time() < cached.expires_at:
+        stats["stale"] += 1
+        if flight_key not in _cache_inflight:
+            stats["refreshes"] += 1
+            _start_fetch(cache, key, user_id, generation, fetch, background=True)
+        return _view(cached.value)
+    task = None if force_refresh else _cache_inflight.get(flight_key)
+    if task is not None:
+        stats["coalesced"] += 1
+    else:
+        stats["misses"] += 1
+        task = _start_fetch(cache, key, user_id, generation, fetch, background=False)
+    # Shielded so one cancelled caller doesn't cancel the fetch the others are waiting on.
+    return _view(await asyncio.shield(task))
+
+
+def cache_stats() -> dict[str, object]:
+    return {
+        "ttlSeconds": PORTFOLIO_CACHE_TTL_SECONDS,
+        "hardExpirySeconds": max(PORTFOLIO_CACHE_TTL_SECONDS, CACHE_HARD_EXPIRY_SECONDS),
+        "inFlight": len(_cache_inflight),
+        "store": _cache_store().stats(),
+        **{name: dict(counters) for name, counters in _cache_stats.items()},
+    }
 
 
 def _sdk_client() -> SnapTrade:
+    """The process-wide SDK client, built once.
+
+    Its urllib3 pool holds one connection per executor worker, so every call reuses
+    a warm connection instead of each call opening (and dropping) its own pool.
+    """
+    global _client
     if not SNAPTRADE_CLIENT_ID or not SNAPTRADE_CONSUMER_KEY:
         raise RuntimeError("SnapTrade credentials are not configured")
-    return SnapTrade(
-        host=SNAPTRADE_API_URL.rstrip("/"),
-        client_id=SNAPTRADE_CLIENT_ID,
-        consumer_key=SNAPTRADE_CONSUMER_KEY,
-    )
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                configuration = Configuration(
+                    host=SNAPTRADE_API_URL.rstrip("/"),
+                    client_id=SNAPTRADE_CLIENT_ID,
+                    consumer_key=SNAPTRADE_CONSUMER_KEY,
+                )
+                configuration.connection_pool_maxsize = MAX_WORKERS
+                _client = SnapTrade(configuration=configuration)
+    return _client
+
+
+def _sdk_executor() -> ThreadPoolExecutor:
+    # Created lazily so scripts and background jobs outside the app lifespan share it too.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="snaptrade")
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the SnapTrade worker threads, dropping calls that have not started yet."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+@asynccontextmanager
+async def _user_slot(user_id: str | None):
+    """Hold one of the user's PER_USER_CONCURRENCY slots for the duration of a call."""
+    if user_id is None:
+        yield
+        return
+    slot = _user_slots.get(user_id)
+    if slot is None:
+        slot = _user_slots[user_id] = [asyncio.Semaphore(PER_USER_CONCURRENCY), 0]
+    slot[1] += 1
+    waiting = slot[0].locked()
+    if waiting:
+        _executor_stats["waitingOnUser"] += 1
+    try:
+        async with slot[0]:
+            if waiting:
+                _executor_stats["waitingOnUser"] -= 1
+                waiting = False
+            yield
+    finally:
+        if waiting:
+            _executor_stats["waitingOnUser"] -= 1
+        slot[1] -= 1
+        if slot[1] == 0 and _user_slots.get(user_id) is slot:
+            del _user_slots[user_id]
+
+
+def _record_wait(waited_ms: float) -> None:
+    _wait_samples.append(waited_ms)
+    _wait_totals["started"] += 1
+    _wait_totals["ms"] += waited_ms
+    _wait_totals["maxMs"] = max(_wait_totals["maxMs"], waited_ms)
+
+
+def executor_stats() -> dict[str, object]:
+    """Queue depth, in-flight calls and wait time (ms) before a SnapTrade call starts running.
+
+    The wait covers both the per-user cap and the executor queue; p50/p95 are over the
+    last WAIT_SAMPLE_SIZE calls.
+    """
+    with _executor_lock:
+        counters = dict(_executor_stats)
+        samples = list(_wait_samples)
+        totals = dict(_wait_totals)
+    return {
+        "maxWorkers": MAX_WORKERS,
+        "perUserConcurrency": PER_USER_CONCURRENCY,
+        **counters,
+        "activeUsers": len(_user_slots),
+        "waitMs": {
+            "average": round(totals["ms"] / totals["started"], 2) if totals["started"] else 0.0,
+            "max": round(totals["maxMs"], 2),
+            "p50": round(median(samples), 2) if samples else 0.0,
+            "p95": round(quantiles(samples, n=20)[-1], 2) if len(samples) > 1 else round(sum(samples), 2),
+        },
+    }
 
 
 def _to_plain(value):
@@ -185,17 +412,49 @@ async def _call_snaptrade(operation):
         ) from exc
 
 
-async def _call_snaptrade_sync(operation):
-    """Run a *synchronous* SnapTrade SDK call in a worker thread.
+async def _call_snaptrade_sync(operation, user_id: str | None = None):
+    """Run a *synchronous* SnapTrade SDK call on the SnapTrade worker pool.
 
     The SDK's async (``a*``) methods build an aiohttp ``ClientResponse`` but route
     trade-order responses through the urllib3-only deserializer, which blows up with
     ``'ClientResponse' object has no attribute 'supports_chunked_reads'``. The sync
     methods use urllib3 end-to-end, so we use them for trading and wrap them in a
     thread to avoid blocking the event loop.
+
+    The pool is dedicated (portfolio fan-outs don't exhaust the default executor) and
+    a user never has more than PER_USER_CONCURRENCY calls in it at once.
     """
+    requested = time.monotonic()
+    call = {"started": False, "abandoned": False}
+
+    def run():
+        with _executor_lock:
+            if call["abandoned"]:
+                return None
+            call["started"] = True
+            _executor_stats["queued"] -= 1
+            _executor_stats["active"] += 1
+            _record_wait((time.monotonic() - requested) * 1000)
+        try:
+            return operation()
+        finally:
+            with _executor_lock:
+                _executor_stats["active"] -= 1
+
     try:
-        return await asyncio.to_thread(operation)
+        async with _user_slot(user_id):
+            with _executor_lock:
+                _executor_stats["calls"] += 1
+                _executor_stats["queued"] += 1
+                _executor_stats["maxQueued"] = max(_executor_stats["maxQueued"], _executor_stats["queued"])
+            try:
+                return await asyncio.get_running_loop().run_in_executor(_sdk_executor(), run)
+            finally:
+                with _executor_lock:
+                    if not call["started"]:
+                        # Cancelled (or the pool shut down) before a worker picked it up.
+                        call["abandoned"] = True
+                        _executor_stats["queued"] -= 1
     except snaptrade_exceptions.ApiException as exc:
         status = _snaptrade_error_status(exc)
         body = _snaptrade_error_body(exc)
@@ -210,7 +469,8 @@ async def create_user(user_id: str) -> SnapTradeUser:
         await _call_snaptrade_sync(
             lambda: _sdk_client().authentication.register_snap_trade_user(
                 body={"userId": user_id},
-            )
+            ),
+            user_id=user_id,
         )
     )
     return SnapTradeUser(
@@ -255,7 +515,8 @@ async def initiate_connection(
                 show_close_button=False,
                 connection_type=connection_type,
                 connection_portal_version="v4",
-            )
+            ),
+            user_id=user_id,
         )
     )
     if isinstance(result, str):
@@ -728,7 +989,8 @@ async def get_accounts(user_id: str, user_secret: str) -> list[Account]:
         await _call_snaptrade_sync(
             lambda: _sdk_client().account_information.list_user_accounts(
                 query_params={"userId": user_id, "userSecret": user_secret},
-            )
+            ),
+            user_id=user_id,
         )
     )
     accounts = []
@@ -756,7 +1018,8 @@ async def get_account_trading_map(user_id: str, user_secret: str) -> dict[str, b
             lambda: _sdk_client().connections.list_brokerage_authorizations(
                 user_id=user_id,
                 user_secret=user_secret,
-            )
+            ),
+            user_id=user_id,
         )
     )
     authorizations = result if isinstance(result, list) else result.get("authorizations", []) if isinstance(result, dict) else []
@@ -793,7 +1056,8 @@ async def get_account_holdings(
             lambda: _sdk_client().account_information.get_user_holdings(
                 account_id=account_id,
                 query_params={"userId": user_id, "userSecret": user_secret},
-            )
+            ),
+            user_id=user_id,
         )
     )
     holdings = []
@@ -817,7 +1081,8 @@ async def get_account_balance_history(
                 account_id=account_id,
                 user_id=user_id,
                 user_secret=user_secret,
-            )
+            ),
+            user_id=user_id,
         )
     )
     raw = result.get("history", []) if isinstance(result, dict) else (result if isinstance(result, list) else [])
@@ -849,6 +1114,39 @@ async def get_account_activities(
     end_date: date | None = None,
     activity_type: str = "BUY",
 ) -> list[dict]:
+    """Every activity in the date range, following SnapTrade's pages of ACTIVITY_PAGE_SIZE until a short one.
+
+    Also stops on a page repeating the previous one (a response ignoring `offset`)
+    and after MAX_ACTIVITY_PAGES, so a misbehaving response can't loop forever.
+    """
+    activities: list[dict] = []
+    previous: list[dict] | None = None
+    for _ in range(MAX_ACTIVITY_PAGES):
+        page, total = await _account_activities_page(
+            user_id, user_secret, account_id, start_date, end_date, activity_type, offset=len(activities)
+        )
+        if page == previous:
+            logger.warning("SnapTrade repeated a page of %s activities for account %s", activity_type, account_id)
+            return activities
+        activities.extend(page)
+        if len(page) < ACTIVITY_PAGE_SIZE or (total is not None and len(activities) >= total):
+            return activities
+        previous = page
+    logger.warning(
+        "Stopped after %s pages of %s activities for account %s", MAX_ACTIVITY_PAGES, activity_type, account_id
+    )
+    return activities
+
+
+async def _account_activities_page(
+    user_id: str,
+    user_secret: str,
+    account_id: str,
+    start_date: date | None,
+    end_date: date | None,
+    activity_type: str,
+    offset: int,
+) -> tuple[list[dict], int | None]:
     result = _sdk_body(
         await _call_snaptrade_sync(
             lambda: _sdk_client().account_information.get_account_activities(
@@ -857,21 +1155,74 @@ async def get_account_activities(
                 user_secret=user_secret,
                 start_date=start_date,
                 end_date=end_date,
-                limit=1000,
+                offset=offset,
+                limit=ACTIVITY_PAGE_SIZE,
                 type=activity_type,
-            )
+            ),
+            user_id=user_id,
         )
     )
     if isinstance(result, list):
-        return result
+        return result, None
     if isinstance(result, dict):
+        pagination = result.get("pagination")
+        total = pagination.get("total") if isinstance(pagination, dict) else None
+        total = int(total) if isinstance(total, (int, float)) else None
         data = result.get("data")
         if isinstance(data, list):
-            return data
+            return data, total
         activities = result.get("activities")
         if isinstance(activities, list):
-            return activities
-    return []
+            return activities, total
+    return [], None
+
+
+async def _ledger_activities(
+    user_id: str,
+    user_secret: str,
+    account_id: str,
+    activity_type: str,
+    start: date,
+    end: date,
+    full: bool = False,
+) -> list[dict]:
+    """One account's activities traded between `start` and `end`, read from the activity ledger.
+
+    Only activities from the account's sync watermark onward are fetched (all of them
+    when `full`); if SnapTrade fails the stored activities are served instead.
+    """
+    if not _use_database:
+        return await get_account_activities(
+            user_id, user_secret, account_id, start_date=start, end_date=end, activity_type=activity_type
+        )
+    with SessionLocal() as db:
+        fetch_from = activity_ledger_svc.fetch_start(db, user_id, account_id, activity_type, start, full=full)
+    try:
+        activities = await get_account_activities(
+            user_id, user_secret, account_id, start_date=fetch_from, end_date=end, activity_type=activity_type
+        )
+    except Exception as exc:
+        with SessionLocal() as db:
+            stored = activity_ledger_svc.load_activities(db, user_id, account_id, activity_type, start, end)
+        if not stored:
+            raise
+        logger.warning(
+            "Serving stored %s activities for account %s; SnapTrade failed: %s", activity_type, account_id, exc
+        )
+        return stored
+
+    dated: list[tuple[date, dict]] = []
+    for activity in activities:
+        if not isinstance(activity, dict):
+            continue
+        trade_date = _parse_activity_date(activity.get("trade_date") or activity.get("tradeDate"))
+        if trade_date:
+            dated.append((trade_date, activity))
+    with SessionLocal() as db:
+        activity_ledger_svc.store_activities(
+            db, user_id, account_id, activity_type, fetch_from, end, dated, now=datetime.now(UTC)
+        )
+        return activity_ledger_svc.load_activities(db, user_id, account_id, activity_type, start, end)
 
 
 async def get_recurring_investments(
@@ -884,43 +1235,38 @@ async def get_recurring_investments(
     accounts = accounts if accounts is not None else await get_accounts(user_id, user_secret)
     current_holdings = _current_holdings_by_account_symbol(accounts)
     cache_key = (user_id, _current_holding_cache_key(accounts), lookback_days)
-    cached = _recurring_cache.get(cache_key)
-    if cached and not force_refresh and _cache_active(cached[0]):
-        return [item.model_copy(deep=True) for item in cached[1]]
-    if not current_holdings:
-        _recurring_cache[cache_key] = (time.monotonic() + PORTFOLIO_CACHE_TTL_SECONDS, [])
-        return []
-
-    end = date.today()
-    start = end - timedelta(days=lookback_days)
-    activity_results = await asyncio.gather(
-        *(
-            get_account_activities(user_id, user_secret, account.id, start_date=start, end_date=end)
-            for account in accounts
-        ),
-        return_exceptions=True,
-    )
 
-    buys: list[dict[str, object]] = []
-    for account, activities in zip(accounts, activity_results):
-        if isinstance(activities, Exception):
-            logger.warning("Activities failed for account %s: %s", account.id, activities)
-            continue
-        for activity in activities:
-            if not isinstance(activity, dict):
+    async def fetch() -> list[RecurringInvestment]:
+        if not current_holdings:
+            return []
+
+        end = date.today()
+        start = end - timedelta(days=lookback_days)
+        activity_results = await asyncio.gather(
+            *(
+                _ledger_activities(user_id, user_secret, account.id, "BUY", start, end, full=force_refresh)
+                for account in accounts
+            ),
+            return_exceptions=True,
+        )
+
+        buys: list[dict[str, object]] = []
+        for account, activities in zip(accounts, activity_results):
+            if isinstance(activities, Exception):
+                logger.warning("Activities failed for account %s: %s", account.id, activities)
                 continue
-            parsed = _parse_buy_activity(activity, account)
-            if parsed:
-                symbol = str(parsed["symbol"]).strip().upper()
-                if not current_holdings.get((account.id, symbol), 0.0):
+            for activity in activities:
+                if not isinstance(activity, dict):
                     continue
-                buys.append(parsed)
-    recurring = _infer_recurring_from_buys(buys)
-    _recurring_cache[cache_key] = (
-        time.monotonic() + PORTFOLIO_CACHE_TTL_SECONDS,
-        [item.model_copy(deep=True) for item in recurring],
-    )
-    return recurring
+                parsed = _parse_buy_activity(activity, account)
+                if parsed:
+                    symbol = str(parsed["symbol"]).strip().upper()
+                    if not current_holdings.get((account.id, symbol), 0.0):
+                        continue
+                    buys.append(parsed)
+        return _infer_recurring_from_buys(buys)
+
+    return await _cached_fetch(_recurring_cache, cache_key, user_id, fetch, force_refresh)
 
 
 async def get_dividend_income(
@@ -934,93 +1280,85 @@ async def get_dividend_income(
     accounts = accounts if accounts is not None else await get_accounts(user_id, user_secret)
     current_holdings = _current_holdings_by_account_symbol(accounts)
     cache_key = (user_id, _current_holding_cache_key(accounts), lookback_days)
-    cached = _dividend_income_cache.get(cache_key)
-    if cached and not force_refresh and _cache_active(cached[0]):
-        return cached[1].model_copy(deep=True)
-    if not current_holdings:
-        summary = _summarize_dividend_income(user_id, [], lookback_days, frequency_overrides=frequency_overrides)
-        _dividend_income_cache[cache_key] = (
-            time.monotonic() + PORTFOLIO_CACHE_TTL_SECONDS,
-            summary.model_copy(deep=True),
+
+    async def fetch() -> DividendIncomeSummary:
+        if not current_holdings:
+            return _summarize_dividend_income(user_id, [], lookback_days, frequency_overrides=frequency_overrides)
+
+        end = date.today()
+        start = end - timedelta(days=lookback_days)
+        activity_results = await asyncio.gather(
+            *(
+                _ledger_activities(user_id, user_secret, account.id, "DIVIDEND", start, end, full=force_refresh)
+                for account in accounts
+            ),
+            return_exceptions=True,
         )
-        return summary
-
-    end = date.today()
-    start = end - timedelta(days=lookback_days)
-    activity_results = await asyncio.gather(
-        *(
-            get_account_activities(
-                user_id,
-                user_secret,
-                account.id,
-                start_date=start,
-                end_date=end,
-                activity_type="DIVIDEND",
-            )
-            for account in accounts
-        ),
-        return_exceptions=True,
-    )
 
-    dividends: list[dict[str, object]] = []
-    for account, activities in zip(accounts, activity_results):
-        if isinstance(activities, Exception):
-            logger.warning("Dividend activities failed for account %s: %s", account.id, activities)
-            continue
-        for activity in activities:
-            if not isinstance(activity, dict):
+        dividends: list[dict[str, object]] = []
+        for account, activities in zip(accounts, activity_results):
+            if isinstance(activities, Exception):
+                logger.warning("Dividend activities failed for account %s: %s", account.id, activities)
                 continue
-            parsed = _parse_dividend_activity(activity, account)
-            if not parsed:
-                continue
-            symbol = str(parsed["symbol"]).upper()
-            position_key = (account.id, symbol)
-            current_quantity = current_holdings.get(position_key, 0.0)
-            if not current_quantity:
-                continue
-            activity_quantity = float(parsed.get("activity_quantity") or 0)
-            reference_quantity = activity_quantity if activity_quantity > 0 else current_quantity
-            payout_per_share = float(parsed["amount"]) / reference_quantity if reference_quantity else 0.0
-            parsed["amount"] = payout_per_share * current_quantity
-            parsed["current_quantity"] = current_quantity
-            parsed["payout_per_share"] = payout_per_share
-            parsed["position_key"] = f"{account.id}:{symbol}"
-            dividends.append(parsed)
-
-    summary = _summarize_dividend_income(
-        user_id,
-        dividends,
-        lookback_days,
-        frequency_overrides=frequency_overrides,
-    )
-    _dividend_income_cache[cache_key] = (
-        time.monotonic() + PORTFOLIO_CACHE_TTL_SECONDS,
-        summary.model_copy(deep=True),
-    )
-    return summary
+            for activity in activities:
+                if not isinstance(activity, dict):
+                    continue
+                parsed = _parse_dividend_activity(activity, account)
+                if not parsed:
+                    continue
+                symbol = str(parsed["symbol"]).upper()
+                position_key = (account.id, symbol)
+                current_quantity = current_holdings.get(position_key, 0.0)
+                if not current_quantity:
+                    continue
+                activity_quantity = float(parsed.get("activity_quantity") or 0)
+                reference_quantity = activity_quantity if activity_quantity > 0 else current_quantity
+                payout_per_share = float(parsed["amount"]) / reference_quantity if reference_quantity else 0.0
+                parsed["amount"] = payout_per_share * current_quantity
+                parsed["current_quantity"] = current_quantity
+                parsed["payout_per_share"] = payout_per_share
+                parsed["position_key"] = f"{account.id}:{symbol}"
+                dividends.append(parsed)
+
+        return _summarize_dividend_income(
+            user_id,
+            dividends,
+            lookback_days,
+            frequency_overrides=frequency_overrides,
+        )
+
+    return await _cached_fetch(_dividend_income_cache, cache_key, user_id, fetch, force_refresh)
 
 
 async def get_portfolio(user_id: str, user_secret: str, force_refresh: bool = False) -> Portfolio:
-    cached = _portfolio_cache.get(user_id)
-    if cached and not force_refresh and _cache_active(cached[0]):
-        return cached[1].model_copy(deep=True)
+    return await _cached_fetch(
+        _portfolio_cache, user_id, user_id, lambda: _fetch_portfolio(user_id, user_secret), force_refresh
+    )
 
+
+async def _fetch_portfolio(user_id: str, user_secret: str) -> Portfolio:
     accounts = await get_accounts(user_id, user_secret)
     holdings_results = await asyncio.gather(
         *(get_account_holdings(user_id, user_secret, acc.id) for acc in accounts),
         return_exceptions=True,
     )
-    for acc, holdings in zip(accounts, holdings_results):
+    updates: list[dict[str, object]] = [{} for _ in accounts]
+    for acc, update, holdings in zip(accounts, updates, holdings_results):
         if isinstance(holdings, Exception):
             logger.warning("Holdings failed for account %s: %s", acc.id, holdings)
             continue
-        acc.holdings = holdings
+        update["holdings"] = tuple(holdings)
     try:
         trading_map = await get_account_trading_map(user_id, user_secret)
-        for acc in accounts:
-            acc.supports_trading = trading_map.get(acc.brokerage_id, False)
+        for acc, update in zip(accounts, updates):
+            update["supports_trading"] = trading_map.get(acc.brokerage_id, False)
     except Exception as exc:
         logger.warning("Could not resolve account trading support for user %s: %s", user_id, exc)
+    accounts = [acc.model_copy(update=update) if update else acc for acc, update in zip(accounts, updates)]
+    return Portfolio(user_id=user_id, **_portfolio_totals(accounts, "USD"))
+
+
+def _portfolio_totals(accounts: list[Account], currency: str) -> dict[str, object]:
     total_balance = sum(a.balance or 0 for a in accounts)
     total_gain_loss = sum(sum(h.gain_loss for h in a.holdings) for a in accounts)
     total_gain_loss_percent = (
@@ -1028,20 +1366,22 @@ async def get_portfolio(user_id: str, user_secret: str, force_refresh: bool = Fa
         if (total_balance - total_gain_loss)
         else 0
     )
-    currency = accounts[0].currency if accounts else "USD"
-    portfolio = Portfolio(
-        user_id=user_id,
-        accounts=accounts,
-        total_balance=total_balance,
-        total_gain_loss=total_gain_loss,
-        total_gain_loss_percent=total_gain_loss_percent,
-        currency=currency,
-    )
-    _portfolio_cache[user_id] = (
-        time.monotonic() + PORTFOLIO_CACHE_TTL_SECONDS,
-        portfolio.model_copy(deep=True),
-    )
-    return portfolio
+    return {
+        "accounts": tuple(accounts),
+        "total_balance": total_balance,
+        "total_gain_loss": total_gain_loss,
+        "total_gain_loss_percent": total_gain_loss_percent,
+        "currency": accounts[0].currency if accounts else currency,
+    }
+
+
+def portfolio_view(portfolio: Portfolio, accounts: list[Account]) -> Portfolio:
+    """`portfolio` restricted to (possibly adjusted) `accounts`, with its totals recomputed.
+
+    Cached portfolios are shared, so this is how callers derive their own: only the
+    top-level model is new, holdings and untouched accounts are reused as they are.
+    """
+    return portfolio.model_copy(update=_portfolio_totals(accounts, portfolio.currency))
 
 
 # --- Trading -----------------------------------------------------------------
@@ -1062,7 +1402,8 @@ async def _resolve_universal_symbol_id(
                 user_id=user_id,
                 user_secret=user_secret,
                 substring=symbol,
-            )
+            ),
+            user_id=user_id,
         )
     )
     matches = result if isinstance(result, list) else result.get("symbols", []) if isinstance(result, dict) else []
@@ -1165,7 +1506,8 @@ async def check_order_impact(
                 stop=stop_price,
                 units=units,
                 notional_value=notional_value,
-            )
+            ),
+            user_id=user_id,
         )
     )
     impact = _parse_trade_impact(result if isinstance(result, dict) else {}, symbol)
@@ -1209,7 +1551,8 @@ async def place_checked_order(
                 user_id=user_id,
                 user_secret=user_secret,
                 wait_to_confirm=True,
-            )
+            ),
+            user_id=user_id,
         )
     )
     return _parse_trade_execution(result if isinstance(result, dict) else {}, account_id, "")
@@ -1264,7 +1607,8 @@ async def cancel_order(
                 user_id=user_id,
                 user_secret=user_secret,
                 brokerage_order_id=brokerage_order_id,
-            )
+            ),
+            user_id=user_id,
         )
     )
     clear_user_cache(user_id)
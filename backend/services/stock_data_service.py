@@ -1,44 +1,701 @@
 """Twelve Data API client for stock search, quotes, details, and historical data."""
 import logging
 import asyncio
-from datetime import UTC, datetime
-from typing import Any
+import heapq
+import itertools
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, date, datetime, time as dt_time, timedelta
+from statistics import median, quantiles
+from typing import Any, Iterator
 from urllib.parse import quote_plus
 
 import httpx
 
-from config import TWELVE_DATA_API_KEY, TWELVE_DATA_API_URL
+from config import (
+    TWELVE_DATA_API_KEY,
+    TWELVE_DATA_API_URL,
+    TWELVE_DATA_BREAKER_FAILURE_RATIO,
+    TWELVE_DATA_BREAKER_MIN_CALLS,
+    TWELVE_DATA_BREAKER_OPEN_SECONDS,
+    TWELVE_DATA_BREAKER_SLOW_CALL_SECONDS,
+    TWELVE_DATA_BREAKER_WINDOW,
+    TWELVE_DATA_CREDITS_PER_MINUTE,
+    TWELVE_DATA_HEDGE_MIN_SAMPLES,
+    TWELVE_DATA_HEDGE_REQUESTS,
+    TWELVE_DATA_HISTORY_REFRESH_SECONDS,
+    TWELVE_DATA_HTTP2,
+    TWELVE_DATA_KEEPALIVE_EXPIRY_SECONDS,
+    TWELVE_DATA_MAX_CONNECTIONS,
+    TWELVE_DATA_MAX_KEEPALIVE_CONNECTIONS,
+    TWELVE_DATA_PROFILE_CACHE_MAX_SIZE,
+    TWELVE_DATA_PROFILE_CACHE_TTL_SECONDS,
+    TWELVE_DATA_QUOTE_BATCH_CONCURRENCY,
+    TWELVE_DATA_QUOTE_BATCH_SIZE,
+    TWELVE_DATA_QUOTE_CACHE_MAX_SIZE,
+    TWELVE_DATA_QUOTE_CACHE_TTL_SECONDS,
+    TWELVE_DATA_RATE_LIMIT_MAX_WAIT_SECONDS,
+    TWELVE_DATA_STALE_QUOTE_SECONDS,
+    TWELVE_DATA_SYMBOL_INDEX_COUNTRY,
+    TWELVE_DATA_SYMBOL_INDEX_PATH,
+    TWELVE_DATA_SYMBOL_INDEX_REFRESH_SECONDS,
+)
+from database import SessionLocal
 from models.stock_models import (
     StockDetails,
     StockHistoricalData,
+    StockIndicators,
     StockQuote,
     StockSearchResult,
 )
+from services import indicators as indicator_svc
+from services import market_calendar
+from services import price_bar_service as price_bar_svc
+from services.price_series import RESAMPLE_INTERVALS, PriceSeries
+from services.symbol_index import SymbolEntry, SymbolIndex
 
 logger = logging.getLogger(__name__)
 DEFAULT_TIMEOUT = httpx.Timeout(10.0)
+LATENCY_SAMPLE_SIZE = 500
+# Twelve Data error bodies are a short JSON object; larger bodies are never checked for one.
+ERROR_BODY_MAX_BYTES = 2048
+
+# One pooled client shared by every call, opened/closed by the FastAPI lifespan.
+_http_client: httpx.AsyncClient | None = None
+_client_stats = {"requests": 0, "connections_opened": 0}
+_hedge_stats = {"sent": 0, "won": 0}
+_latency_samples: dict[str, deque[float]] = {}
+HEDGE_REQUESTS = TWELVE_DATA_HEDGE_REQUESTS
+HEDGE_MIN_SAMPLES = TWELVE_DATA_HEDGE_MIN_SAMPLES
+
+QUOTE_CACHE_TTL_SECONDS = TWELVE_DATA_QUOTE_CACHE_TTL_SECONDS
+QUOTE_CACHE_MAX_SIZE = TWELVE_DATA_QUOTE_CACHE_MAX_SIZE
+STALE_QUOTE_SECONDS = TWELVE_DATA_STALE_QUOTE_SECONDS
+# LRU of symbol -> (expires_at, quote); in-flight fetches are shared by concurrent misses.
+_quote_cache: OrderedDict[str, tuple[float, StockQuote]] = OrderedDict()
+_quote_inflight: dict[str, asyncio.Task] = {}
+_quote_cache_stats = {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0}
+
+PROFILE_CACHE_TTL_SECONDS = TWELVE_DATA_PROFILE_CACHE_TTL_SECONDS
+PROFILE_CACHE_MAX_SIZE = TWELVE_DATA_PROFILE_CACHE_MAX_SIZE
+# LRU of symbol -> (expires_at, parsed profile fields); only successful lookups are kept.
+_profile_cache: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+_profile_inflight: dict[str, asyncio.Task] = {}
+_profile_cache_stats = {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0}
+# Daily bars covering a 52-week range, with slack for holidays.
+_FIFTY_TWO_WEEK_BARS = 260
+
+QUOTE_BATCH_SIZE = max(1, TWELVE_DATA_QUOTE_BATCH_SIZE)
+QUOTE_BATCH_CONCURRENCY = max(1, TWELVE_DATA_QUOTE_BATCH_CONCURRENCY)
+
+_use_database = bool(os.getenv("DATABASE_URL"))
+HISTORY_REFRESH_SECONDS = TWELVE_DATA_HISTORY_REFRESH_SECONDS
+# Twelve Data caps a single time_series response at 5000 bars.
+MAX_OUTPUT_SIZE = 5000
+_DEFAULT_OUTPUT_SIZE = {"1day": 30, "1week": 12, "1month": 12, "3month": 8}
+_BARS_PER_YEAR = {"1day": 252, "1week": 52, "1month": 12, "3month": 4}
+# Weekly/monthly/quarterly bars are built from stored daily bars rather than fetched;
+# these are the most trading days one such period can hold.
+_DAILY_BARS_PER_PERIOD = {"1week": 5, "1month": 23, "3month": 66}
+RESAMPLE_CACHE_MAX_SIZE = 256
+# (symbol, interval, daily bar count, last daily bar) -> resampled series; a new daily bar changes the key.
+_resample_cache: OrderedDict[tuple, PriceSeries] = OrderedDict()
+_PERIOD_YEARS = {"1m": 1 / 12, "3m": 0.25, "6m": 0.5, "1y": 1, "2y": 2, "3y": 3, "5y": 5}
+# Earliest bar upstream has for (symbol, interval), learned when a fetch comes back short,
+# so young listings don't re-request history that doesn't exist on every load.
+_history_floor: dict[tuple[str, str], datetime] = {}
+# Gaps already asked for once this process; holes upstream can't fill aren't retried.
+_attempted_gaps: set[tuple[str, str, date]] = set()
 
 
 class StockDataConfigurationError(RuntimeError):
     pass
 
 
+class StockDataRateLimitError(RuntimeError):
+    pass
+
+
+class StockDataUnavailableError(RuntimeError):
+    """Raised without calling upstream while the circuit breaker is open, or for an outage reported in a body."""
+
+
+# Twelve Data credits charged per symbol on each endpoint; anything unlisted costs 1.
+# With a plan configured, a call must fit in one minute's credits, so /profile needs at least 10.
+CREDIT_COSTS = {"quote": 1, "time_series": 1, "symbol_search": 1, "profile": 10}
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+_LANE_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+_priority: ContextVar[int] = ContextVar("twelve_data_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Run Twelve Data calls made inside the block in the background lane."""
+    token = _priority.set(PRIORITY_BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class CreditLimiter:
+    """Token bucket over Twelve Data credits with strict priority between lanes.
+
+    The bucket refills continuously at credits_per_minute / 60 per second up to one
+    minute's worth. Callers that can't be served immediately queue by (priority,
+    arrival) and are woken as credits accrue; a call that would queue longer than
+    max_wait seconds raises StockDataRateLimitError instead of hitting a 429, as does
+    one costing more than a minute's credits, which the plan could never serve.
+
+    credits_per_minute of 0 or less turns limiting off: every call is granted at once.
+    """
+
+    def __init__(self, credits_per_minute: float, max_wait: float) -> None:
+        self.limited = credits_per_minute > 0
+        self.capacity = max(1.0, float(credits_per_minute)) if self.limited else math.inf
+        # Unlimited, the bucket stays infinitely full and never needs refilling.
+        self.rate = self.capacity / 60.0 if self.limited else 0.0
+        self.max_wait = max_wait
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._stats = {
+            lane: {"granted": 0, "credits": 0.0, "waited": 0, "waitMs": 0.0, "rejected": 0}
+            for lane in _LANE_NAMES.values()
+        }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters:
+            _, _, cost, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+            elif self._tokens >= cost:
+                heapq.heappop(self._waiters)
+                self._tokens -= cost
+                future.set_result(None)
+            else:
+                delay = (cost - self._tokens) / self.rate
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+    def fits(self, cost: float) -> bool:
+        """Whether a single call costing `cost` credits can ever be served."""
+        return cost <= self.capacity
+
+    async def acquire(self, cost: float, priority: int = PRIORITY_INTERACTIVE) -> None:
+        lane = self._stats[_LANE_NAMES.get(priority, "background")]
+        if not self.fits(cost):
+            lane["rejected"] += 1
+            raise StockDataRateLimitError(
+                f"Twelve Data call costs {cost:g} credits but the plan allows {self.capacity:g} per minute"
+            )
+        self._refill()
+        if not self.limited or (not self._waiters and self._tokens >= cost):
+            self._tokens -= cost
+        else:
+            started = time.monotonic()
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), cost, future))
+            if self._timer is not None:
+                self._timer.cancel()
+            self._dispatch()
+            try:
+                await asyncio.wait_for(future, self.max_wait)
+            except TimeoutError:
+                lane["rejected"] += 1
+                raise StockDataRateLimitError(
+                    f"Twelve Data credit budget exhausted; waited {self.max_wait:g}s for {cost:g} credits"
+                ) from None
+            lane["waited"] += 1
+            lane["waitMs"] += (time.monotonic() - started) * 1000
+        lane["granted"] += 1
+        lane["credits"] += cost
+
+    def try_acquire(self, cost: float, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        """Take `cost` credits only if they are free right now, without queueing."""
+        self._refill()
+        if self.limited and (not self.fits(cost) or self._waiters or self._tokens < cost):
+            return False
+        self._tokens -= cost
+        lane = self._stats[_LANE_NAMES.get(priority, "background")]
+        lane["granted"] += 1
+        lane["credits"] += cost
+        return True
+
+    def stats(self) -> dict[str, object]:
+        self._refill()
+        queued = {name: 0 for name in _LANE_NAMES.values()}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                queued[_LANE_NAMES.get(priority, "background")] += 1
+        return {
+            "creditsPerMinute": self.capacity if self.limited else None,
+            "availableCredits": round(self._tokens, 2) if self.limited else None,
+            "queued": queued,
+            "lanes": {
+                name: {**lane, "credits": round(lane["credits"], 2), "waitMs": round(lane["waitMs"], 2)}
+                for name, lane in self._stats.items()
+            },
+        }
+
+
+CREDITS_PER_MINUTE = TWELVE_DATA_CREDITS_PER_MINUTE
+RATE_LIMIT_MAX_WAIT_SECONDS = TWELVE_DATA_RATE_LIMIT_MAX_WAIT_SECONDS
+_rate_limiter = CreditLimiter(CREDITS_PER_MINUTE, RATE_LIMIT_MAX_WAIT_SECONDS)
+
+
+def reset_rate_limiter(credits_per_minute: float | None = None, max_wait: float | None = None) -> None:
+    global _rate_limiter
+    _rate_limiter = CreditLimiter(
+        CREDITS_PER_MINUTE if credits_per_minute is None else credits_per_minute,
+        RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait,
+    )
+
+
+def rate_limiter_stats() -> dict[str, object]:
+    return _rate_limiter.stats()
+
+
+def quote_batch_size() -> int:
+    """QUOTE_BATCH_SIZE, shrunk so one batch fits in a minute's credits."""
+    return max(1, int(min(QUOTE_BATCH_SIZE, _rate_limiter.capacity // CREDIT_COSTS["quote"])))
+
+
+def _unaffordable_error(endpoint: str) -> StockDataConfigurationError:
+    return StockDataConfigurationError(
+        f"TWELVE_DATA_CREDITS_PER_MINUTE={_rate_limiter.capacity:g} is below the {CREDIT_COSTS[endpoint]} credits "
+        f"one /{endpoint} call costs; set it to your plan's limit, or leave it unset to turn credit limiting off"
+    )
+
+
+def check_credit_plan() -> None:
+    """Log at startup the endpoints the configured plan can't afford; requests needing them fail."""
+    for name, cost in CREDIT_COSTS.items():
+        if not _rate_limiter.fits(cost):
+            logger.error("%s", _unaffordable_error(name))
+
+
+class CircuitBreaker:
+    """Fails Twelve Data calls fast while the upstream is erroring or slow.
+
+    Closed, every call's outcome goes into a window of the last `window` calls. Once
+    `min_calls` are recorded and the share that failed, or the share that took
+    slow_call_seconds or longer, reaches failure_ratio, the breaker opens: calls raise
+    StockDataUnavailableError without touching the network for open_seconds. Then a
+    single probe is let through (half-open); if it succeeds promptly the breaker
+    closes, otherwise it opens again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window: int,
+        min_calls: int,
+        failure_ratio: float,
+        slow_call_seconds: float,
+        open_seconds: float,
+    ) -> None:
+        self.min_calls = max(1, min_calls)
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        # (failed, slow) per call, newest last.
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=max(self.min_calls, window))
+        self._opened_at = 0.0
+        self._probing = False
+        self._last_transition: datetime | None = None
+        self._stats = {"rejected": 0, "failures": 0, "slowCalls": 0}
+        self._transitions = {self.OPEN: 0, self.HALF_OPEN: 0, self.CLOSED: 0}
+
+    def _transition(self, state: str) -> None:
+        previous, self.state = self.state, state
+        self._transitions[state] += 1
+        self._last_transition = datetime.now(UTC)
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        log = logger.warning if state == self.OPEN else logger.info
+        log(
+            "Twelve Data circuit breaker %s -> %s",
+            previous,
+            state,
+            extra={"metric": "twelve_data.circuit_breaker.state", "state": state, "previous_state": previous},
+        )
+
+    def before_call(self) -> None:
+        """Raise StockDataUnavailableError unless a call may go upstream now."""
+        if self.state == self.OPEN:
+            remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                self._stats["rejected"] += 1
+                raise StockDataUnavailableError(
+                    f"Twelve Data is unavailable; retrying upstream in {math.ceil(remaining)}s"
+                )
+            self._transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                self._stats["rejected"] += 1
+                raise StockDataUnavailableError("Twelve Data is unavailable; a recovery probe is in flight")
+            self._probing = True
+
+    def record(self, ok: bool, seconds: float) -> None:
+        slow = seconds >= self.slow_call_seconds
+        self._stats["failures"] += not ok
+        self._stats["slowCalls"] += slow
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+            self._transition(self.CLOSED if ok and not slow else self.OPEN)
+            return
+        if self.state == self.OPEN:
+            return
+        self._outcomes.append((not ok, slow))
+        if len(self._outcomes) < self.min_calls:
+            return
+        threshold = self.failure_ratio * len(self._outcomes)
+        if (
+            sum(failed for failed, _ in self._outcomes) >= threshold
+            or sum(slow for _, slow in self._outcomes) >= threshold
+        ):
+            self._transition(self.OPEN)
+
+    def abandon(self) -> None:
+        """A permitted call ended without an upstream outcome (cancelled, out of credits)."""
+        self._probing = False
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "state": self.state,
+            "windowCalls": len(self._outcomes),
+            **self._stats,
+            "transitions": {
+                "open": self._transitions[self.OPEN],
+                "halfOpen": self._transitions[self.HALF_OPEN],
+                "closed": self._transitions[self.CLOSED],
+            },
+            "lastTransitionAt": self._last_transition.isoformat() if self._last_transition else None,
+        }
+
+
+BREAKER_WINDOW = TWELVE_DATA_BREAKER_WINDOW
+BREAKER_MIN_CALLS = TWELVE_DATA_BREAKER_MIN_CALLS
+BREAKER_FAILURE_RATIO = TWELVE_DATA_BREAKER_FAILURE_RATIO
+BREAKER_SLOW_CALL_SECONDS = TWELVE_DATA_BREAKER_SLOW_CALL_SECONDS
+BREAKER_OPEN_SECONDS = TWELVE_DATA_BREAKER_OPEN_SECONDS
+_circuit_breaker = CircuitBreaker(
+    BREAKER_WINDOW, BREAKER_MIN_CALLS, BREAKER_FAILURE_RATIO, BREAKER_SLOW_CALL_SECONDS, BREAKER_OPEN_SECONDS
+)
+# Failures after which cached or stored data is served instead of an error.
+_UPSTREAM_UNAVAILABLE = (
+    StockDataUnavailableError,
+    StockDataRateLimitError,
+    httpx.TransportError,
+    httpx.HTTPStatusError,
+)
+
+
+def reset_circuit_breaker(**overrides: float) -> None:
+    """Start a closed breaker; keyword overrides replace the configured thresholds (tests)."""
+    global _circuit_breaker
+    settings = {
+        "window": BREAKER_WINDOW,
+        "min_calls": BREAKER_MIN_CALLS,
+        "failure_ratio": BREAKER_FAILURE_RATIO,
+        "slow_call_seconds": BREAKER_SLOW_CALL_SECONDS,
+        "open_seconds": BREAKER_OPEN_SECONDS,
+    }
+    settings.update(overrides)
+    _circuit_breaker = CircuitBreaker(**settings)
+
+
+def circuit_breaker_stats() -> dict[str, object]:
+    return _circuit_breaker.stats()
+
+
 def _require_api_key() -> None:
     if not TWELVE_DATA_API_KEY:
         raise StockDataConfigurationError("TWELVE_DATA_API_KEY is not configured")
 
 
+def _new_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=DEFAULT_TIMEOUT,
+        http2=TWELVE_DATA_HTTP2,
+        limits=httpx.Limits(
+            max_connections=TWELVE_DATA_MAX_CONNECTIONS,
+            max_keepalive_connections=TWELVE_DATA_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=TWELVE_DATA_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+async def start_client() -> None:
+    global _http_client
+    if _http_client is None:
+        _http_client = _new_http_client()
+
+
+async def close_client() -> None:
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
+
+
+def _shared_client() -> httpx.AsyncClient:
+    # Created lazily so scripts and background jobs outside the app lifespan still pool.
+    global _http_client
+    if _http_client is None:
+        _http_client = _new_http_client()
+    return _http_client
+
+
+async def _trace(event_name: str, info: dict) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        _client_stats["connections_opened"] += 1
+
+
+def _hedge_delay(endpoint: str) -> float | None:
+    """Seconds to wait before hedging a call to `endpoint`: its p95 latency, once known."""
+    samples = _latency_samples.get(endpoint)
+    if not HEDGE_REQUESTS or not samples or len(samples) < max(2, HEDGE_MIN_SAMPLES):
+        return None
+    return quantiles(samples, n=20)[-1] / 1000
+
+
+def _attempt_failed(task: asyncio.Future) -> bool:
+    # exception() raises CancelledError on a cancelled task, so check that first.
+    return task.cancelled() or task.exception() is not None
+
+
+async def _send(url: str, endpoint: str, client: httpx.AsyncClient | None, cost: float) -> httpx.Response:
+    async def attempt() -> httpx.Response:
+        if client is not None:
+            return await client.get(url)
+        _client_stats["requests"] += 1
+        return await _shared_client().get(url, extensions={"trace": _trace})
+
+    delay = _hedge_delay(endpoint)
+    if delay is None:
+        return await attempt()
+    first = asyncio.ensure_future(attempt())
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    # A hedge is a second paid call, so it only goes out when credits are free right now.
+    if done or not _rate_limiter.try_acquire(cost, _priority.get()):
+        return await first
+    _hedge_stats["sent"] += 1
+    hedge = asyncio.ensure_future(attempt())
+    pending = {first, hedge}
+    try:
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer an answer over an error; only give up once both attempts failed.
+            for task in sorted(done, key=_attempt_failed):
+                if not _attempt_failed(task) or not pending:
+                    if task is hedge and not _attempt_failed(task):
+                        _hedge_stats["won"] += 1
+                    return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _body_error_code(body: Any) -> int | None:
+    """The ``code`` of a Twelve Data ``{"status": "error"}`` body, if there is one."""
+    if not isinstance(body, dict) or body.get("status") != "error":
+        return None
+    try:
+        return int(body.get("code"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _upstream_ok(resp: httpx.Response) -> bool:
+    """Whether the breaker counts this as a success: not 5xx/429, in the HTTP status or the body.
+
+    Twelve Data reports throttling and outages as HTTP 200 with ``{"status": "error", "code": 429}``.
+    """
+    code = resp.status_code
+    content = resp.content
+    if code == 200 and len(content) <= ERROR_BODY_MAX_BYTES and b'"error"' in content:
+        try:
+            code = _body_error_code(json.loads(content)) or code
+        except ValueError:
+            pass
+    return code < 500 and code != 429
+
+
+def _raise_for_body_error(result: Any) -> None:
+    """Raise for a 200 body reporting throttling (429) or an outage (5xx), as for the HTTP status."""
+    code = _body_error_code(result)
+    if code == 429:
+        raise StockDataRateLimitError(result.get("message") or "Twelve Data rate limit reached")
+    if code is not None and code >= 500:
+        raise StockDataUnavailableError(result.get("message") or f"Twelve Data error {code}")
+
+
+async def _get(
+    url: str, endpoint: str, client: httpx.AsyncClient | None = None, symbols: int = 1
+) -> httpx.Response:
+    """GET through the shared pool (or a caller-supplied client), recording reuse and latency.
+
+    Fails fast with StockDataUnavailableError while the circuit breaker is open, then
+    waits on the credit limiter in the lane of the calling context. With hedging on,
+    a duplicate request is sent once the first outlives the endpoint's p95 latency.
+    """
+    breaker = _circuit_breaker
+    breaker.before_call()
+    cost = CREDIT_COSTS.get(endpoint, 1) * symbols
+    ok: bool | None = None
+    started = time.perf_counter()
+    try:
+        await _rate_limiter.acquire(cost, _priority.get())
+        started = time.perf_counter()
+        resp = await _send(url, endpoint, client, cost)
+        ok = _upstream_ok(resp)
+    except httpx.TransportError:
+        ok = False
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        if ok is None:
+            breaker.abandon()
+        else:
+            breaker.record(ok, elapsed)
+    samples = _latency_samples.setdefault(endpoint, deque(maxlen=LATENCY_SAMPLE_SIZE))
+    samples.append(elapsed * 1000)
+    return resp
+
+
+def client_stats() -> dict[str, object]:
+    """Connection reuse counters and rolling p50 latency (ms) per Twelve Data endpoint."""
+    requests = _client_stats["requests"]
+    opened = _client_stats["connections_opened"]
+    return {
+        "requests": requests,
+        "connectionsOpened": opened,
+        "connectionsReused": max(0, requests - opened),
+        "hedgedRequests": _hedge_stats["sent"],
+        "hedgeWins": _hedge_stats["won"],
+        "p50LatencyMs": {
+            endpoint: round(median(samples), 2) for endpoint, samples in _latency_samples.items() if samples
+        },
+    }
+
+
+SEARCH_RESULT_LIMIT = 5
+SYMBOL_INDEX_PATH = TWELVE_DATA_SYMBOL_INDEX_PATH
+SYMBOL_INDEX_REFRESH_SECONDS = TWELVE_DATA_SYMBOL_INDEX_REFRESH_SECONDS
+_symbol_index: SymbolIndex | None = None
+_search_stats = {"local": 0, "upstream": 0}
+
+
+def load_symbol_index() -> bool:
+    """Load the persisted autocomplete index from disk; False when there is none yet."""
+    global _symbol_index
+    index = SymbolIndex.load(SYMBOL_INDEX_PATH)
+    if index is None:
+        return False
+    _symbol_index = index
+    return True
+
+
+def _symbol_index_is_stale() -> bool:
+    if _symbol_index is None:
+        return True
+    return (datetime.now(UTC) - _symbol_index.built_at).total_seconds() > SYMBOL_INDEX_REFRESH_SECONDS
+
+
+async def _fetch_reference_list(endpoint: str, default_type: str) -> list[SymbolEntry]:
+    url = f"{TWELVE_DATA_API_URL}/{endpoint}?country={quote_plus(TWELVE_DATA_SYMBOL_INDEX_COUNTRY)}&apikey={TWELVE_DATA_API_KEY}"
+    resp = await _get(url, endpoint)
+    resp.raise_for_status()
+    result = resp.json()
+    _raise_for_body_error(result)
+    if result.get("status") == "error":
+        raise RuntimeError(f"Twelve Data /{endpoint} error: {result.get('message')}")
+    return [
+        SymbolEntry(
+            symbol=str(item.get("symbol") or "").strip(),
+            name=str(item.get("name") or "").strip(),
+            exchange=str(item.get("exchange") or "").strip(),
+            type=str(item.get("type") or default_type).strip(),
+        )
+        for item in result.get("data") or []
+        if item.get("symbol")
+    ]
+
+
+async def refresh_symbol_index(force: bool = False) -> bool:
+    """Rebuild the autocomplete index from Twelve Data's stock and ETF lists when stale.
+
+    The new index replaces the old one in memory and on disk; returns True if rebuilt.
+    """
+    global _symbol_index
+    if not force and not _symbol_index_is_stale():
+        return False
+    _require_api_key()
+    with background_priority():
+        stocks = await _fetch_reference_list("stocks", "Common Stock")
+        etfs = await _fetch_reference_list("etf", "ETF")
+    index = SymbolIndex(stocks + etfs)
+    if not len(index):
+        logger.warning("Symbol index refresh returned no listings; keeping the previous index")
+        return False
+    _symbol_index = index
+    try:
+        index.save(SYMBOL_INDEX_PATH)
+    except OSError as exc:
+        logger.warning("Could not persist symbol index to %s: %s", SYMBOL_INDEX_PATH, exc)
+    logger.info("Symbol index rebuilt with %s listings", len(index))
+    return True
+
+
+def symbol_index_stats() -> dict[str, object]:
+    return {
+        "entries": len(_symbol_index) if _symbol_index is not None else 0,
+        "builtAt": _symbol_index.built_at.isoformat() if _symbol_index is not None else None,
+        "localHits": _search_stats["local"],
+        "upstreamSearches": _search_stats["upstream"],
+    }
+
+
 async def search_stocks(query: str) -> list[StockSearchResult]:
+    """Autocomplete matches from the local index; Twelve Data is only asked when it has none."""
     if not query or not query.strip():
         return []
+    if _symbol_index is not None:
+        results = _symbol_index.search(query, SEARCH_RESULT_LIMIT)
+        if results:
+            _search_stats["local"] += 1
+            return results
     _require_api_key()
+    _search_stats["upstream"] += 1
     url = f"{TWELVE_DATA_API_URL}/symbol_search?symbol={quote_plus(query.strip())}&apikey={TWELVE_DATA_API_KEY}"
-    async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-        resp = await client.get(url)
-        resp.raise_for_status()
+    resp = await _get(url, "symbol_search")
+    resp.raise_for_status()
     data = resp.json()
+    _raise_for_body_error(data)
     results = []
-    for item in data.get("data", [])[:5]:
+    for item in data.get("data", [])[:SEARCH_RESULT_LIMIT]:
         results.append(
             StockSearchResult(
                 symbol=item.get("symbol", ""),
@@ -78,19 +735,106 @@ def _needs_name_fallback(symbol: str, name: str | None) -> bool:
     return not normalized_name or normalized_name == normalized_symbol
 
 
-async def get_stock_quote(symbol: str, client: httpx.AsyncClient | None = None) -> StockQuote | None:
+def clear_quote_cache() -> None:
+    _quote_cache.clear()
+    for key in _quote_cache_stats:
+        _quote_cache_stats[key] = 0
+
+
+def quote_cache_stats() -> dict[str, int]:
+    return {**_quote_cache_stats, "size": len(_quote_cache)}
+
+
+def _cached_quote(key: str, stale: bool = False) -> StockQuote | None:
+    """The cached quote for `key`; with `stale`, also one up to STALE_QUOTE_SECONDS past expiry."""
+    cached = _quote_cache.get(key)
+    if not cached:
+        return None
+    now = time.monotonic()
+    if cached[0] <= now:
+        if cached[0] + STALE_QUOTE_SECONDS <= now:
+            _quote_cache.pop(key, None)
+            return None
+        if not stale:
+            return None
+    _quote_cache.move_to_end(key)
+    return cached[1]
+
+
+def _stale_quote(key: str) -> StockQuote | None:
+    quote = _cached_quote(key, stale=True)
+    if quote is not None:
+        _quote_cache_stats["stale"] += 1
+    return quote
+
+
+def _quote_ttl(key: str) -> float:
+    # Pairs like BTC/USD trade around the clock; listed stocks can't move until the next session.
+    if "/" in key:
+        return QUOTE_CACHE_TTL_SECONDS
+    return market_calendar.cache_ttl(QUOTE_CACHE_TTL_SECONDS)
+
+
+def _store_quote(key: str, quote: StockQuote) -> None:
+    _quote_cache[key] = (time.monotonic() + _quote_ttl(key), quote)
+    _quote_cache.move_to_end(key)
+    while len(_quote_cache) > QUOTE_CACHE_MAX_SIZE:
+        _quote_cache.popitem(last=False)
+
+
+async def _fetch_and_cache_quote(key: str, symbol: str, client: httpx.AsyncClient | None) -> StockQuote | None:
+    try:
+        quote = await _fetch_stock_quote(symbol, client)
+        if quote is not None:
+            _store_quote(key, quote)
+        return quote
+    finally:
+        _quote_inflight.pop(key, None)
+
+
+async def get_stock_quote(
+    symbol: str, client: httpx.AsyncClient | None = None, allow_stale: bool = True
+) -> StockQuote | None:
+    """Quote for `symbol`, served from the TTL cache; concurrent misses share one upstream call.
+
+    When upstream fails, a quote up to STALE_QUOTE_SECONDS past its TTL is served instead,
+    unless `allow_stale` is False (e.g. for sizing orders), in which case the error is raised.
+    """
     _require_api_key()
-    url = f"{TWELVE_DATA_API_URL}/quote?symbol={quote_plus(symbol)}&apikey={TWELVE_DATA_API_KEY}"
-    if client:
-        resp = await client.get(url)
-        resp.raise_for_status()
+    key = symbol.strip().upper()
+    quote = _cached_quote(key)
+    if quote is not None:
+        _quote_cache_stats["hits"] += 1
+        return quote.model_copy()
+    task = _quote_inflight.get(key)
+    if task is not None:
+        _quote_cache_stats["coalesced"] += 1
     else:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as owned_client:
-            resp = await owned_client.get(url)
-            resp.raise_for_status()
+        _quote_cache_stats["misses"] += 1
+        task = asyncio.create_task(_fetch_and_cache_quote(key, symbol, client))
+        _quote_inflight[key] = task
+    try:
+        # Shielded so one cancelled caller doesn't cancel the fetch the others are waiting on.
+        quote = await asyncio.shield(task)
+    except _UPSTREAM_UNAVAILABLE:
+        quote = _stale_quote(key) if allow_stale else None
+        if quote is None:
+            raise
+    return quote.model_copy() if quote is not None else None
+
+
+async def _fetch_stock_quote(symbol: str, client: httpx.AsyncClient | None = None) -> StockQuote | None:
+    url = f"{TWELVE_DATA_API_URL}/quote?symbol={quote_plus(symbol)}&apikey={TWELVE_DATA_API_KEY}"
+    resp = await _get(url, "quote", client)
+    resp.raise_for_status()
     result = resp.json()
+    _raise_for_body_error(result)
     if result.get("status") == "error":
         return None
+    return _parse_quote(result, symbol)
+
+
+def _parse_quote(result: dict, symbol: str) -> StockQuote:
     price = _parse_decimal(result.get("close"), 0)
     prev_close = _parse_decimal(result.get("previous_close"), price)
     change = _parse_decimal(result.get("change"), price - prev_close)
@@ -109,40 +853,146 @@ async def get_stock_quote(symbol: str, client: httpx.AsyncClient | None = None)
     )
 
 
-async def get_stock_details(symbol: str) -> StockDetails | None:
-    quote = await get_stock_quote(symbol)
-    if not quote:
-        return None
-    details = StockDetails(
-        symbol=quote.symbol,
-        current_price=quote.price,
-        change=quote.change,
-        change_percent=quote.change_percent,
-        volume=quote.volume,
-    )
-    profile_url = f"{TWELVE_DATA_API_URL}/profile?symbol={quote_plus(symbol)}&apikey={TWELVE_DATA_API_KEY}"
-    async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-        profile_resp = await client.get(profile_url)
-    if profile_resp.is_success:
+def clear_profile_cache() -> None:
+    _profile_cache.clear()
+    for key in _profile_cache_stats:
+        _profile_cache_stats[key] = 0
+
+
+def profile_cache_stats() -> dict[str, int]:
+    return {**_profile_cache_stats, "size": len(_profile_cache)}
+
+
+def _parse_profile(profile: dict) -> dict[str, Any]:
+    return {
+        "name": profile.get("name", ""),
+        "exchange": profile.get("exchange", ""),
+        "sector": profile.get("sector"),
+        "industry": profile.get("industry"),
+        "description": profile.get("description"),
+        "market_cap": _parse_decimal(profile.get("market_capitalization")) or None,
+        "pe_ratio": _parse_decimal(profile.get("pe_ratio")) or None,
+        "dividend_yield": _parse_decimal(profile.get("dividend_yield")) or None,
+        "high_52_week": _parse_decimal(profile.get("52_week_high") or profile.get("fifty_two_week_high")) or None,
+        "low_52_week": _parse_decimal(profile.get("52_week_low") or profile.get("fifty_two_week_low")) or None,
+        "average_volume": _parse_int(profile.get("average_volume")) or None,
+    }
+
+
+async def _fetch_and_cache_profile(key: str, symbol: str) -> dict[str, Any]:
+    try:
+        profile_url = f"{TWELVE_DATA_API_URL}/profile?symbol={quote_plus(symbol)}&apikey={TWELVE_DATA_API_KEY}"
+        profile_resp = await _get(profile_url, "profile")
+        if profile_resp.status_code == 429 or profile_resp.status_code >= 500:
+            profile_resp.raise_for_status()
+        if not profile_resp.is_success:
+            return {}
         profile = profile_resp.json()
+        _raise_for_body_error(profile)
         if profile.get("status") == "error":
             logger.warning(
                 "Profile API returned error for symbol %s: %s",
                 symbol,
                 profile.get("message", "Unknown"),
             )
-        else:
-            details.name = profile.get("name", "")
-            details.exchange = profile.get("exchange", "")
-            details.sector = profile.get("sector")
-            details.industry = profile.get("industry")
-            details.description = profile.get("description")
-            details.market_cap = _parse_decimal(profile.get("market_capitalization")) or None
-            details.pe_ratio = _parse_decimal(profile.get("pe_ratio")) or None
-            details.dividend_yield = _parse_decimal(profile.get("dividend_yield")) or None
-            details.high_52_week = _parse_decimal(profile.get("52_week_high") or profile.get("fifty_two_week_high")) or None
-            details.low_52_week = _parse_decimal(profile.get("52_week_low") or profile.get("fifty_two_week_low")) or None
-            details.average_volume = _parse_int(profile.get("average_volume")) or None
+            return {}
+        fields = _parse_profile(profile)
+        _profile_cache[key] = (time.monotonic() + PROFILE_CACHE_TTL_SECONDS, fields)
+        _profile_cache.move_to_end(key)
+        while len(_profile_cache) > PROFILE_CACHE_MAX_SIZE:
+            _profile_cache.popitem(last=False)
+        return fields
+    finally:
+        _profile_inflight.pop(key, None)
+
+
+async def _get_profile(symbol: str) -> dict[str, Any]:
+    """Parsed /profile fields for `symbol` (empty when unavailable), cached for PROFILE_CACHE_TTL_SECONDS.
+
+    Raises StockDataConfigurationError when the configured plan can't afford one /profile call.
+    """
+    if not _rate_limiter.fits(CREDIT_COSTS["profile"]):
+        raise _unaffordable_error("profile")
+    key = symbol.strip().upper()
+    cached = _profile_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        _profile_cache.move_to_end(key)
+        _profile_cache_stats["hits"] += 1
+        return dict(cached[1])
+    task = _profile_inflight.get(key)
+    if task is not None:
+        _profile_cache_stats["coalesced"] += 1
+    else:
+        _profile_cache_stats["misses"] += 1
+        task = asyncio.create_task(_fetch_and_cache_profile(key, symbol))
+        _profile_inflight[key] = task
+    try:
+        return dict(await asyncio.shield(task))
+    except _UPSTREAM_UNAVAILABLE:
+        if not cached:
+            raise
+        _profile_cache_stats["stale"] += 1
+        return dict(cached[1])
+
+
+async def _get_52_week_range(symbol: str) -> tuple[float | None, float | None]:
+    """High/low over the last 52 weeks of stored daily bars."""
+    with background_priority():
+        series = await get_price_series(symbol, "1day", _FIFTY_TWO_WEEK_BARS)
+    if not len(series):
+        return None, None
+    year = series.since(series.last_datetime() - timedelta(weeks=52))
+    return year.high_max(), year.low_min()
+
+
+async def warm_symbol(symbol: str, bars: int) -> None:
+    """Load `symbol`'s latest daily bars into the store and its profile into the cache, in the background lane."""
+    with background_priority():
+        await get_price_series(symbol, "1day", bars)
+        await _get_profile(symbol)
+
+
+async def get_stock_details(symbol: str, require_profile: bool = False) -> StockDetails | None:
+    """Quote, profile and 52-week range fetched concurrently and merged.
+
+    The quote is required; a failed profile or history lookup only leaves its
+    fields empty, unless the credit plan can't afford /profile at all, which is
+    raised as a configuration error. With `require_profile`, any profile failure
+    is raised instead. The name fallback runs afterwards but is normally answered by
+    the local symbol index, so a cold details page costs one upstream round-trip.
+    """
+    quote_result, profile_result, range_result = await asyncio.gather(
+        get_stock_quote(symbol),
+        _get_profile(symbol),
+        _get_52_week_range(symbol),
+        return_exceptions=True,
+    )
+    if isinstance(quote_result, BaseException):
+        raise quote_result
+    if not quote_result:
+        return None
+    details = StockDetails(
+        symbol=quote_result.symbol,
+        current_price=quote_result.price,
+        change=quote_result.change,
+        change_percent=quote_result.change_percent,
+        volume=quote_result.volume,
+    )
+    if isinstance(profile_result, StockDataConfigurationError) or (
+        require_profile and isinstance(profile_result, BaseException)
+    ):
+        raise profile_result
+    if isinstance(profile_result, BaseException):
+        logger.warning("Failed to get profile for %s: %s", symbol, profile_result)
+    else:
+        details = details.model_copy(update=profile_result)
+    if isinstance(range_result, BaseException):
+        logger.warning("Failed to get 52-week range from historical for %s: %s", symbol, range_result)
+    else:
+        high, low = range_result
+        if high is not None and low is not None:
+            details.high_52_week = high
+            details.low_52_week = low
     if _needs_name_fallback(symbol, details.name):
         try:
             search_results = await search_stocks(symbol)
@@ -160,64 +1010,277 @@ async def get_stock_details(symbol: str) -> StockDetails | None:
                     details.exchange = exact_match.exchange
         except Exception as e:
             logger.warning("Failed to get fallback name from search for %s: %s", symbol, e)
-    if details.high_52_week is None or details.low_52_week is None:
-        try:
-            hist = await get_historical_data(symbol, "1day", 30)
-            if hist:
-                details.high_52_week = max(h.high for h in hist)
-                details.low_52_week = min(h.low for h in hist)
-        except Exception as e:
-            logger.exception("Failed to get 52-week from historical for %s: %s", symbol, e)
     return details
 
 
-async def get_multiple_stock_quotes(symbols: list[str]) -> list[StockQuote]:
+def _batch_entries(result: Any, batch: list[str]) -> dict[str, Any]:
+    """Map each requested symbol to its slice of a /quote response.
+
+    Twelve Data answers a single symbol with a flat object and several symbols with
+    an object keyed by symbol. A top-level error (e.g. out of credits) applies to all.
+    """
+    if not isinstance(result, dict):
+        return {}
+    if len(batch) == 1:
+        return {batch[0]: result}
+    if result.get("status") == "error" and not any(symbol in result for symbol in batch):
+        return {symbol: result for symbol in batch}
+    return {symbol: result.get(symbol) for symbol in batch}
+
+
+async def _fetch_quote_batch(
+    batch: list[str], semaphore: asyncio.Semaphore
+) -> tuple[dict[str, StockQuote], dict[str, str]]:
+    quotes: dict[str, StockQuote] = {}
+    errors: dict[str, str] = {}
+    url = f"{TWELVE_DATA_API_URL}/quote?symbol={quote_plus(','.join(batch))}&apikey={TWELVE_DATA_API_KEY}"
+    try:
+        async with semaphore:
+            resp = await _get(url, "quote", symbols=len(batch))
+            resp.raise_for_status()
+        result = resp.json()
+        _raise_for_body_error(result)
+        entries = _batch_entries(result, batch)
+    except Exception as exc:
+        logger.warning("Quote batch %s failed: %s", ",".join(batch), exc)
+        for symbol in batch:
+            stale = _stale_quote(symbol) if isinstance(exc, _UPSTREAM_UNAVAILABLE) else None
+            if stale is not None:
+                quotes[symbol] = stale.model_copy()
+            else:
+                errors[symbol] = str(exc) or type(exc).__name__
+        return quotes, errors
+    for symbol in batch:
+        entry = entries.get(symbol)
+        if not isinstance(entry, dict):
+            errors[symbol] = "No quote returned"
+        elif entry.get("status") == "error":
+            errors[symbol] = str(entry.get("message") or "Quote unavailable")
+        else:
+            quote = _parse_quote(entry, symbol)
+            _store_quote(symbol, quote)
+            quotes[symbol] = quote.model_copy()
+    return quotes, errors
+
+
+async def get_quote_batch(symbols: list[str]) -> tuple[list[StockQuote], dict[str, str]]:
+    """Quotes for many symbols plus a per-symbol error map.
+
+    Cached symbols are served locally; the rest go upstream as comma-separated
+    batches of quote_batch_size(), at most QUOTE_BATCH_CONCURRENCY at a time. A bad
+    symbol (or a failed batch) only costs the symbols it covers.
+    """
+    _require_api_key()
     unique_symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
-    async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-        tasks = [get_stock_quote(symbol, client) for symbol in unique_symbols]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-    quotes = []
-    for r in results:
-        if isinstance(r, StockQuote):
-            quotes.append(r)
-        elif isinstance(r, Exception):
-            logger.warning("Quote failed: %s", r)
+    found: dict[str, StockQuote] = {}
+    errors: dict[str, str] = {}
+    pending: list[str] = []
+    for symbol in unique_symbols:
+        cached = _cached_quote(symbol)
+        if cached is not None:
+            _quote_cache_stats["hits"] += 1
+            found[symbol] = cached.model_copy()
+        else:
+            _quote_cache_stats["misses"] += 1
+            pending.append(symbol)
+
+    semaphore = asyncio.Semaphore(QUOTE_BATCH_CONCURRENCY)
+    size = quote_batch_size()
+    batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+    for batch_quotes, batch_errors in await asyncio.gather(
+        *(_fetch_quote_batch(batch, semaphore) for batch in batches)
+    ):
+        found.update(batch_quotes)
+        errors.update(batch_errors)
+    quotes = [found[symbol] for symbol in unique_symbols if symbol in found]
+    return quotes, errors
+
+
+async def get_multiple_stock_quotes(symbols: list[str]) -> list[StockQuote]:
+    quotes, errors = await get_quote_batch(symbols)
+    for symbol, message in errors.items():
+        logger.warning("Quote failed for %s: %s", symbol, message)
     return quotes
 
 
-async def get_historical_data(
+def output_size_for_period(interval: str, period: str) -> int:
+    """Bar count covering `period` (e.g. "1y", "5y") at `interval`."""
+    years = _PERIOD_YEARS.get((period or "").strip().lower())
+    per_year = _BARS_PER_YEAR.get(interval)
+    if years is None or per_year is None:
+        raise ValueError(f"Unsupported period '{period}' for interval '{interval}'")
+    return min(MAX_OUTPUT_SIZE, math.ceil(years * per_year))
+
+
+def clear_history_memo() -> None:
+    _history_floor.clear()
+    _attempted_gaps.clear()
+    _resample_cache.clear()
+
+
+def _parse_bars(result: dict) -> PriceSeries:
+    return PriceSeries.from_twelve_data(result.get("values") or [])
+
+
+async def _fetch_time_series(
     symbol: str,
-    interval: str = "1day",
-    output_size: int | None = None,
-) -> list[StockHistoricalData]:
-    _require_api_key()
-    if output_size is None:
-        output_size = {"1day": 30, "1week": 12, "1month": 12}.get(interval, 30)
+    interval: str,
+    output_size: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> PriceSeries:
     url = f"{TWELVE_DATA_API_URL}/time_series?symbol={quote_plus(symbol)}&interval={interval}&outputsize={output_size}&apikey={TWELVE_DATA_API_KEY}"
-    async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-        resp = await client.get(url)
-        resp.raise_for_status()
+    if start is not None:
+        url += f"&start_date={quote_plus(start.strftime('%Y-%m-%d %H:%M:%S'))}"
+    if end is not None:
+        url += f"&end_date={quote_plus(end.strftime('%Y-%m-%d %H:%M:%S'))}"
+    resp = await _get(url, "time_series")
+    resp.raise_for_status()
     result = resp.json()
+    _raise_for_body_error(result)
     if result.get("status") == "error":
         logger.warning("Historical API error for %s: %s", symbol, result.get("message"))
-        return []
-    out = []
-    for v in result.get("values", []):
-        dt_str = v.get("datetime")
-        if not dt_str:
-            continue
+        return PriceSeries.empty()
+    return _parse_bars(result)
+
+
+def _history_is_stale(fetched_at: datetime | None) -> bool:
+    """Bars fetched off-hours stay fresh until the next session opens."""
+    if fetched_at is None:
+        return True
+    ttl = market_calendar.cache_ttl(HISTORY_REFRESH_SECONDS, fetched_at)
+    return (datetime.now(UTC) - fetched_at).total_seconds() > ttl
+
+
+async def get_price_series(
+    symbol: str,
+    interval: str = "1day",
+    output_size: int | None = None,
+) -> PriceSeries:
+    """The latest `output_size` bars, read from the bar store and topped up from upstream.
+
+    Only bars newer than the last stored one, older bars the window still lacks, and
+    holes between stored daily bars are requested from Twelve Data; if it is
+    unavailable the stored bars are returned as they are. Weekly, monthly and
+    quarterly ("3month") bars are resampled from daily bars, never fetched.
+    """
+    _require_api_key()
+    if output_size is None:
+        output_size = _DEFAULT_OUTPUT_SIZE.get(interval, 30)
+    output_size = max(1, min(output_size, MAX_OUTPUT_SIZE))
+    if interval in RESAMPLE_INTERVALS:
+        return await _resampled_series(symbol, interval, output_size)
+    if not _use_database:
+        return (await _fetch_time_series(symbol, interval, output_size)).tail(output_size)
+
+    key = (symbol.strip().upper(), interval)
+    with SessionLocal() as db:
+        stored = price_bar_svc.load_bars(db, *key, limit=output_size)
+        fetched_at = price_bar_svc.latest_fetched_at(db, *key)
+
+    fetched = PriceSeries.empty()
+    if not len(stored):
+        fetched = await _fetch_time_series(symbol, interval, output_size)
+        if len(fetched) and len(fetched) < output_size:
+            _history_floor[key] = fetched.first_datetime()
+    else:
         try:
-            date = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-        except ValueError:
-            continue
-        out.append(
-            StockHistoricalData(
-                date=date,
-                open=_parse_decimal(v.get("open")),
-                high=_parse_decimal(v.get("high")),
-                low=_parse_decimal(v.get("low")),
-                close=_parse_decimal(v.get("close")),
-                volume=_parse_int(v.get("volume")),
-            )
-        )
-    return sorted(out, key=lambda x: x.date)
+            if _history_is_stale(fetched_at):
+                fetched = fetched.merge(
+                    await _fetch_time_series(symbol, interval, MAX_OUTPUT_SIZE, start=stored.last_datetime())
+                )
+            missing = output_size - len(stored)
+            floor = _history_floor.get(key)
+            if missing > 0 and (floor is None or stored.first_datetime() > floor):
+                # The boundary bar comes back too, so ask for one extra.
+                older = await _fetch_time_series(symbol, interval, missing + 1, end=stored.first_datetime())
+                if len(older) <= missing:
+                    _history_floor[key] = older.first_datetime() if len(older) else stored.first_datetime()
+                fetched = fetched.merge(older)
+            if interval == "1day":
+                for gap_start, gap_end in price_bar_svc.missing_trading_days(stored):
+                    if (*key, gap_start) in _attempted_gaps:
+                        continue
+                    fetched = fetched.merge(
+                        await _fetch_time_series(
+                            symbol,
+                            interval,
+                            MAX_OUTPUT_SIZE,
+                            start=datetime.combine(gap_start, dt_time.min),
+                            end=datetime.combine(gap_end, dt_time.max.replace(microsecond=0)),
+                        )
+                    )
+                    _attempted_gaps.add((*key, gap_start))
+        except _UPSTREAM_UNAVAILABLE as exc:
+            # Stored bars (plus anything fetched before the failure) beat an error page.
+            logger.warning("Serving stored %s %s bars; Twelve Data unavailable: %s", symbol, interval, exc)
+
+    if not len(fetched):
+        return stored
+    with SessionLocal() as db:
+        price_bar_svc.store_bars(db, *key, fetched, now=datetime.now(UTC))
+        return price_bar_svc.load_bars(db, *key, limit=output_size)
+
+
+async def _resampled_series(symbol: str, interval: str, output_size: int) -> PriceSeries:
+    # One spare period so a partial oldest period can be dropped.
+    daily_bars = min(MAX_OUTPUT_SIZE, (output_size + 1) * _DAILY_BARS_PER_PERIOD[interval])
+    daily = await get_price_series(symbol, "1day", daily_bars)
+    if not len(daily):
+        return daily
+    key = (symbol.strip().upper(), interval, *daily.cache_key())
+    resampled = _resample_cache.get(key)
+    if resampled is None:
+        resampled = daily.resample(interval)
+        if len(daily) >= daily_bars and len(resampled) > 1:
+            # A full window starts mid-period; a shorter one reaches the symbol's first bar.
+            resampled = resampled.tail(len(resampled) - 1)
+        _resample_cache[key] = resampled
+        while len(_resample_cache) > RESAMPLE_CACHE_MAX_SIZE:
+            _resample_cache.popitem(last=False)
+    else:
+        _resample_cache.move_to_end(key)
+    if len(resampled) > output_size:
+        return resampled.tail(output_size)
+    return resampled
+
+
+async def get_historical_data(
+    symbol: str,
+    interval: str = "1day",
+    output_size: int | None = None,
+) -> list[StockHistoricalData]:
+    """API-boundary view of get_price_series as StockHistoricalData models."""
+    return (await get_price_series(symbol, interval, output_size)).to_models()
+
+
+def _json_floats(values) -> list[float | None]:
+    return [None if value != value else round(value, 6) for value in values.tolist()]
+
+
+async def get_indicators(
+    symbol: str,
+    indicator_specs: str,
+    interval: str = "1day",
+    output_size: int | None = None,
+) -> StockIndicators:
+    """Indicators for the latest `output_size` bars, computed on bars with extra warm-up history."""
+    specs = indicator_svc.parse_specs(indicator_specs)
+    if output_size is None:
+        output_size = _DEFAULT_OUTPUT_SIZE.get(interval, 30)
+    output_size = max(1, min(output_size, MAX_OUTPUT_SIZE))
+    warmup = max(spec.warmup for spec in specs)
+    series = await get_price_series(symbol, interval, min(MAX_OUTPUT_SIZE, output_size + warmup))
+    computed = indicator_svc.compute_many(
+        symbol, interval, series, specs, periods_per_year=_BARS_PER_YEAR.get(interval, 252)
+    )
+    start = max(0, len(series) - output_size)
+    return StockIndicators(
+        symbol=symbol.strip().upper(),
+        interval=interval,
+        dates=series.tail(output_size).datetimes(),
+        indicators={
+            key: {name: _json_floats(values[start:]) for name, values in outputs.items()}
+            for key, outputs in computed.items()
+        },
+    )
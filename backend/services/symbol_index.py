@@ -0,0 +1,177 @@
+"""In-memory symbol/name index for search autocomplete.
+
+Symbols (bucketed by length), full instrument names and the inner words of each
+name live in sorted arrays, so a prefix lookup is a bisect plus a bounded forward
+scan. Only when nothing starts with the query are keys sharing its first two
+characters checked for a prefix within one edit, which catches most typos
+without scanning the whole index.
+"""
+import gzip
+import json
+import os
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from models.stock_models import StockSearchResult
+
+_NON_WORD = re.compile(r"[^A-Z0-9]+")
+# Primary US listings win when a symbol appears on several exchanges.
+_PREFERRED_EXCHANGES = ("NASDAQ", "NYSE", "NYSE ARCA", "CBOE", "BATS")
+
+# Name/word matches examined per lookup before ranking; keeps one-letter queries cheap.
+_SCAN_LIMIT = 64
+
+
+@dataclass(frozen=True)
+class SymbolEntry:
+    symbol: str
+    name: str
+    exchange: str
+    type: str
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", (text or "").upper()).strip()
+
+
+def _exchange_rank(exchange: str) -> int:
+    try:
+        return _PREFERRED_EXCHANGES.index(exchange.upper())
+    except ValueError:
+        return len(_PREFERRED_EXCHANGES)
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = j = edits = 0
+    while i < len(a) and j < len(b):
+        if a[i] != b[j]:
+            edits += 1
+            if edits > 1:
+                return False
+            if len(a) == len(b):
+                i += 1
+            j += 1
+        else:
+            i += 1
+            j += 1
+    return edits + (len(b) - j) <= 1
+
+
+class _SortedKeys:
+    def __init__(self, keys: list[tuple[str, int]]) -> None:
+        keys.sort()
+        self._text = [key for key, _ in keys]
+        self._positions = [position for _, position in keys]
+
+    def _range(self, prefix: str) -> tuple[int, int]:
+        start = bisect_left(self._text, prefix)
+        return start, bisect_left(self._text, prefix + "\uffff", lo=start)
+
+    def positions(self, prefix: str, limit: int) -> list[int]:
+        """Entry positions of the first `limit` keys starting with `prefix`."""
+        start, end = self._range(prefix)
+        return self._positions[start:min(end, start + limit)]
+
+    def items(self, prefix: str) -> list[tuple[str, int]]:
+        start, end = self._range(prefix)
+        return list(zip(self._text[start:end], self._positions[start:end]))
+
+
+class SymbolIndex:
+    def __init__(self, entries: list[SymbolEntry], built_at: datetime | None = None) -> None:
+        by_symbol: dict[str, SymbolEntry] = {}
+        for entry in entries:
+            if not entry.symbol:
+                continue
+            current = by_symbol.get(entry.symbol)
+            if current is None or _exchange_rank(entry.exchange) < _exchange_rank(current.exchange):
+                by_symbol[entry.symbol] = entry
+        self.entries = sorted(by_symbol.values(), key=lambda entry: entry.symbol)
+        self.built_at = built_at or datetime.now(timezone.utc)
+        symbols: dict[int, list[tuple[str, int]]] = {}
+        names: list[tuple[str, int]] = []
+        words: list[tuple[str, int]] = []
+        for position, entry in enumerate(self.entries):
+            symbol = _normalize(entry.symbol)
+            symbols.setdefault(len(symbol), []).append((symbol, position))
+            name = _normalize(entry.name)
+            if name:
+                names.append((name, position))
+                words.extend((word, position) for word in set(name.split()[1:]))
+        self._symbols = {length: _SortedKeys(keys) for length, keys in sorted(symbols.items())}
+        self._names = _SortedKeys(names)
+        self._words = _SortedKeys(words)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str, limit: int = 5) -> list[StockSearchResult]:
+        """Best `limit` matches: symbol prefix (shortest first), name prefix, inner word prefix, then typos."""
+        prefix = _normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        found: list[int] = []
+
+        def take(positions: list[int]) -> None:
+            for position in positions:
+                if len(found) >= limit:
+                    return
+                if position not in found:
+                    found.append(position)
+
+        for length, keys in self._symbols.items():
+            if length >= len(prefix) and len(found) < limit:
+                take(keys.positions(prefix, limit))
+        for keys in (self._names, self._words):
+            if len(found) < limit:
+                take(self._shortest_names(keys.positions(prefix, _SCAN_LIMIT)))
+        if not found and len(prefix) >= 3:
+            take(self._shortest_names(self._typo_matches(prefix)))
+        return [
+            StockSearchResult(symbol=entry.symbol, name=entry.name, exchange=entry.exchange, type=entry.type)
+            for entry in (self.entries[position] for position in found)
+        ]
+
+    def _shortest_names(self, positions: list[int]) -> list[int]:
+        return sorted(positions, key=lambda position: (len(self.entries[position].name), position))
+
+    def _typo_matches(self, prefix: str) -> list[int]:
+        size = len(prefix)
+        matches: list[int] = []
+        for keys in (*self._symbols.values(), self._names, self._words):
+            for key, position in keys.items(prefix[:2]):
+                if any(_within_one_edit(prefix, key[:length]) for length in (size - 1, size, size + 1)):
+                    matches.append(position)
+        return matches
+
+    def save(self, path: str | Path) -> None:
+        """Write the entries as gzipped JSON, atomically replacing any previous file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "builtAt": self.built_at.isoformat(),
+            "entries": [[entry.symbol, entry.name, entry.exchange, entry.type] for entry in self.entries],
+        }
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+            json.dump(payload, handle, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SymbolIndex | None":
+        """The index saved at `path`, or None when there is no usable file."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            built_at = datetime.fromisoformat(payload["builtAt"])
+            entries = [SymbolEntry(*row) for row in payload["entries"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return cls(entries, built_at=built_at)
@@ -29,9 +29,13 @@ from database import SessionLocal, init_db
 from routers import persistence
 from services import (
     account_preference_service,
+    analytics_service,
     dividend_preference_service,
+    indicators,
+    quote_stream,
     recurring_preference_service,
     snaptrade_service,
+    stock_data_service,
     user_service,
 )
 
@@ -58,6 +62,8 @@ def clear_user_secrets():
             db_models.TaxProfile,
             db_models.ExternalApiUsage,
             db_models.RentcastListingCache,
+            db_models.StockPriceBar,
+            db_models.StockFundamental,
             db_models.WatchlistItem,
             db_models.Watchlist,
             db_models.SnapTradeUserSecret,
@@ -67,6 +73,8 @@ def clear_user_secrets():
             db_models.SnapTradeRecurringBuySchedule,
             db_models.SnapTradeAccountBalanceSnapshot,
             db_models.SnapTradePortfolioBalanceSnapshot,
+            db_models.SnapTradeActivity,
+            db_models.SnapTradeActivitySync,
             db_models.AppUser,
         ):
             db.execute(sql_delete(model))
@@ -78,7 +86,18 @@ def clear_user_secrets():
     snaptrade_service._portfolio_cache.clear()
     snaptrade_service._recurring_cache.clear()
     snaptrade_service._dividend_income_cache.clear()
+    snaptrade_service._cache_inflight.clear()
     persistence._rate_buckets.clear()
+    stock_data_service.clear_quote_cache()
+    stock_data_service.clear_profile_cache()
+    stock_data_service.clear_history_memo()
+    # Fakes answer instantly, so give the credit limiter room; its own tests set real budgets.
+    stock_data_service.reset_rate_limiter(credits_per_minute=1_000_000)
+    stock_data_service.reset_circuit_breaker()
+    stock_data_service._symbol_index = None
+    quote_stream.reset()
+    indicators.clear_cache()
+    analytics_service.clear_cache()
     yield
     user_service._user_secrets.clear()
     account_preference_service._preferences.clear()
@@ -87,4 +106,12 @@ def clear_user_secrets():
     snaptrade_service._portfolio_cache.clear()
     snaptrade_service._recurring_cache.clear()
     snaptrade_service._dividend_income_cache.clear()
+    snaptrade_service._cache_inflight.clear()
     persistence._rate_buckets.clear()
+    stock_data_service.clear_quote_cache()
+    stock_data_service.clear_profile_cache()
+    stock_data_service.clear_history_memo()
+    stock_data_service._symbol_index = None
+    quote_stream.reset()
+    indicators.clear_cache()
+    analytics_service.clear_cache()
@@ -0,0 +1,141 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from database import SessionLocal
+from services import activity_ledger_service as ledger
+from services import snaptrade_service as svc
+
+NOW = datetime(2026, 10, 18, 21, 0, tzinfo=timezone.utc)
+
+
+def _buy(day: date, amount: float = 25) -> dict:
+    return {"symbol": {"symbol": "VTI"}, "type": "BUY", "amount": -amount, "trade_date": day.isoformat()}
+
+
+def test_store_replaces_window_and_advances_watermark():
+    start, end = date(2025, 10, 18), date(2026, 10, 18)
+    with SessionLocal() as db:
+        assert ledger.fetch_start(db, "u", "a1", "BUY", start) == start
+
+        ledger.store_activities(
+            db, "u", "a1", "BUY", start, end, [(date(2026, 1, 5), _buy(date(2026, 1, 5))), (end, _buy(end))], NOW
+        )
+        assert ledger.fetch_start(db, "u", "a1", "BUY", start) == end - timedelta(days=ledger.RESYNC_DAYS)
+        assert ledger.fetch_start(db, "u", "a1", "BUY", start, full=True) == start
+        assert ledger.fetch_start(db, "u", "a1", "BUY", start - timedelta(days=1)) == start - timedelta(days=1)
+        assert ledger.fetch_start(db, "u", "a1", "DIVIDEND", start) == start
+
+        # A later sync of the recent stretch replaces it (a corrected amount) and keeps older rows.
+        window = end - timedelta(days=ledger.RESYNC_DAYS)
+        ledger.store_activities(db, "u", "a1", "BUY", window, end, [(end, _buy(end, amount=30))], NOW)
+
+        stored = ledger.load_activities(db, "u", "a1", "BUY", start, end)
+        assert [(activity["trade_date"], activity["amount"]) for activity in stored] == [
+            ("2026-01-05", -25),
+            ("2026-10-18", -30),
+        ]
+        assert ledger.load_activities(db, "u", "a2", "BUY", start, end) == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_fetches_only_activities_after_the_watermark(monkeypatch):
+    today = date.today()
+    accounts = [
+        svc.Account(
+            id="a1",
+            name="One",
+            account_number="",
+            type="",
+            brokerage_id="",
+            holdings=[svc.Holding(symbol="VTI", quantity=3)],
+        )
+    ]
+    history = [_buy(today - timedelta(days=days)) for days in (28, 21, 14)]
+    requested: list[date] = []
+
+    async def fake_activities(user_id, user_secret, account_id, start_date=None, end_date=None, activity_type="BUY"):
+        requested.append(start_date)
+        return [activity for activity in history if activity["trade_date"] >= start_date.isoformat()]
+
+    monkeypatch.setattr(svc, "get_account_activities", fake_activities)
+
+    first = await svc.get_recurring_investments("u", "s", accounts=accounts)
+    history.append(_buy(today - timedelta(days=7)))
+    svc.clear_recurring_investments_cache("u")
+    second = await svc.get_recurring_investments("u", "s", accounts=accounts)
+    refreshed = await svc.get_recurring_investments("u", "s", accounts=accounts, force_refresh=True)
+
+    assert requested == [
+        today - timedelta(days=365),
+        today - timedelta(days=ledger.RESYNC_DAYS),
+        today - timedelta(days=365),
+    ]
+    assert first[0].frequency == second[0].frequency == refreshed[0].frequency == "weekly"
+    assert first[0].occurrences == 3
+    assert second[0].occurrences == refreshed[0].occurrences == 4
+
+
+@pytest.mark.asyncio
+async def test_stored_activities_are_served_when_snaptrade_fails(monkeypatch):
+    today = date.today()
+    accounts = [
+        svc.Account(
+            id="a1",
+            name="Taxable",
+            account_number="",
+            type="",
+            brokerage_id="",
+            holdings=[svc.Holding(symbol="SCHD", quantity=2)],
+        )
+    ]
+    dividend = {"symbol": "SCHD", "type": "DIVIDEND", "amount": "6", "units": "2", "trade_date": today.isoformat()}
+    calls = {"activities": 0}
+
+    async def fake_activities(user_id, user_secret, account_id, start_date=None, end_date=None, activity_type="BUY"):
+        calls["activities"] += 1
+        if calls["activities"] > 1:
+            raise svc.SnapTradeServiceError("SnapTrade is down", status_code=503)
+        return [dividend]
+
+    monkeypatch.setattr(svc, "get_account_activities", fake_activities)
+
+    first = await svc.get_dividend_income("u", "s", accounts=accounts)
+    refreshed = await svc.get_dividend_income("u", "s", accounts=accounts, force_refresh=True)
+
+    assert calls["activities"] == 2
+    assert refreshed.payment_count == first.payment_count == 1
+    assert refreshed.symbols[0].average_payment_per_share == 3
+
+
+@pytest.mark.asyncio
+async def test_backfill_pages_past_a_full_page_of_activities(monkeypatch):
+    today = date.today()
+    accounts = [
+        svc.Account(
+            id="a1",
+            name="One",
+            account_number="",
+            type="",
+            brokerage_id="",
+            holdings=[svc.Holding(symbol="VTI", quantity=3)],
+        )
+    ]
+    # Newest first, like SnapTrade; five weekly buys on pages of two.
+    history = [_buy(today - timedelta(days=days)) for days in (7, 14, 21, 28, 35)]
+    offsets: list[int] = []
+
+    class AccountInformation:
+        def get_account_activities(self, offset=None, limit=None, **kwargs):
+            offsets.append(offset)
+            return {"data": history[offset : offset + limit], "pagination": {"offset": offset, "limit": limit}}
+
+    monkeypatch.setattr(svc, "ACTIVITY_PAGE_SIZE", 2)
+    monkeypatch.setattr(svc, "_sdk_client", lambda: type("Client", (), {"account_information": AccountInformation()})())
+
+    recurring = await svc.get_recurring_investments("u", "s", accounts=accounts)
+
+    assert offsets == [0, 2, 4]
+    assert recurring[0].occurrences == 5
+    with SessionLocal() as db:
+        assert len(ledger.load_activities(db, "u", "a1", "BUY", today - timedelta(days=365), today)) == 5
@@ -0,0 +1,235 @@
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from models.snaptrade_models import Account, Holding, Portfolio
+from services import analytics_service as svc
+from services.price_series import PriceSeries
+
+
+def _series(days: list[date], closes) -> PriceSeries:
+    closes = list(closes)
+    return PriceSeries.from_columns(days, closes, closes, closes, closes, [1] * len(closes))
+
+
+def _trading_days(count: int) -> list[date]:
+    start = date(2024, 1, 1)
+    return [start + timedelta(days=i) for i in range(count)]
+
+
+def _signup_and_login(client, password: str = "very-secure-pass") -> None:
+    last_code: list[str] = []
+
+    async def capture(to_email: str, code: str) -> None:
+        last_code.append(code)
+
+    with patch("services.email_service.send_otp_email", new=AsyncMock(side_effect=capture)):
+        resp = client.post("/api/auth/signup", json={"email": f"user-{uuid4()}@example.com", "password": password})
+    pending_user_id = resp.json()["data"]["pendingUserId"]
+    client.post("/api/auth/verify-otp", json={"pendingUserId": pending_user_id, "code": last_code[0]})
+
+
+def test_align_closes_places_each_symbol_on_the_union_grid():
+    days = _trading_days(4)
+    grid, closes = svc.align_closes(
+        {"A": _series(days, [1, 2, 3, 4]), "B": _series([days[1], days[3]], [20, 40])}
+    )
+
+    assert grid.tolist() == days
+    assert closes[:, 0].tolist() == [1, 2, 3, 4]
+    assert np.isnan(closes[[0, 2], 1]).all()
+    assert closes[[1, 3], 1].tolist() == [20, 40]
+
+
+def test_pairwise_moments_match_numpy_on_complete_data():
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0, 0.01, size=(300, 5))
+    returns[:, 1] = returns[:, 0] * 0.8 + returns[:, 1] * 0.2
+
+    correlation, covariance = svc.pairwise_moments(returns)
+
+    np.testing.assert_allclose(correlation, np.corrcoef(returns, rowvar=False), atol=1e-10)
+    np.testing.assert_allclose(covariance, np.cov(returns, rowvar=False), atol=1e-12)
+
+
+def test_pairwise_moments_use_only_shared_rows_and_blank_thin_pairs():
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0, 0.01, size=(100, 3))
+    returns[:60, 1] = np.nan
+    returns[:90, 2] = np.nan
+
+    correlation, covariance = svc.pairwise_moments(returns, min_overlap=20)
+
+    shared = returns[60:, :2]
+    assert correlation[0, 1] == pytest.approx(np.corrcoef(shared, rowvar=False)[0, 1])
+    assert covariance[1, 0] == pytest.approx(np.cov(shared, rowvar=False)[0, 1])
+    assert np.isnan(correlation[0, 2]) and np.isnan(covariance[2, 1])
+    assert correlation[1, 1] == 1.0
+    assert np.isnan(correlation[2, 2])
+
+
+@pytest.mark.asyncio
+async def test_correlation_matrix_is_cached_per_symbol_set_and_period(monkeypatch):
+    days = _trading_days(60)
+    rng = np.random.default_rng(1)
+    paths = {symbol: 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 60))) for symbol in ("AAPL", "MSFT", "SPY")}
+    loads = []
+
+    async def fake_series(symbol, interval, output_size):
+        loads.append((symbol, interval, output_size))
+        return _series(days, paths[symbol])
+
+    monkeypatch.setattr(svc.stock_svc, "get_price_series", fake_series)
+    monkeypatch.setattr(svc.market_calendar, "cache_ttl", lambda seconds, now=None: seconds)
+
+    first, errors = await svc.correlation_matrix(["msft", "AAPL", "SPY"], "3m")
+    again, _ = await svc.correlation_matrix(["SPY", "AAPL", "MSFT", "aapl"], "3M")
+
+    assert errors == {}
+    assert again is first
+    assert len(loads) == 3
+    assert loads[0][1:] == ("1day", 64)
+    assert first.symbols == ["AAPL", "MSFT", "SPY"]
+    assert first.observations == 59
+    assert first.correlation[0][0] == 1.0
+    assert first.correlation[0][1] == first.correlation[1][0]
+    assert svc.cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+@pytest.mark.asyncio
+async def test_correlation_matrix_reports_failed_symbols_and_skips_the_cache(monkeypatch):
+    days = _trading_days(30)
+
+    async def fake_series(symbol, interval, output_size):
+        if symbol == "BAD":
+            raise RuntimeError("upstream said no")
+        return _series(days, np.linspace(10, 20, 30) * (2 if symbol == "B" else 1))
+
+    monkeypatch.setattr(svc.stock_svc, "get_price_series", fake_series)
+
+    matrix, errors = await svc.correlation_matrix(["A", "B", "BAD"], "1m")
+
+    assert matrix.symbols == ["A", "B"]
+    assert errors == {"BAD": "upstream said no"}
+    assert svc.cache_stats()["size"] == 0
+    with pytest.raises(ValueError):
+        await svc.correlation_matrix(["A"], "1y")
+
+
+def test_correlation_route_reads_watchlist_symbols(client):
+    _signup_and_login(client)
+    watchlist_id = client.post("/api/watchlists", json={"name": "Tech"}).json()["data"]["id"]
+    for symbol in ("AAPL", "MSFT"):
+        client.post(f"/api/watchlists/{watchlist_id}/items", json={"symbol": symbol})
+    matrix = svc.CorrelationMatrix(symbols=["AAPL", "MSFT"], correlation=[[1.0, 0.5], [0.5, 1.0]])
+    compute = AsyncMock(return_value=(matrix, {}))
+
+    with patch("routers.analytics.analytics_svc.correlation_matrix", new=compute):
+        resp = client.get(f"/api/analytics/correlation?watchlistId={watchlist_id}&period=2y")
+        both = client.get(f"/api/analytics/correlation?watchlistId={watchlist_id}&symbols=AAPL")
+        missing = client.get("/api/analytics/correlation?watchlistId=nope")
+
+    assert resp.status_code == 200
+    assert sorted(compute.await_args.args[0]) == ["AAPL", "MSFT"]
+    assert compute.await_args.args[1] == "2y"
+    assert resp.json()["data"]["correlation"] == [[1.0, 0.5], [0.5, 1.0]]
+    assert both.status_code == 400
+    assert missing.status_code == 404
+
+
+def test_correlation_route_requires_session(client):
+    assert client.get("/api/analytics/correlation?symbols=AAPL,MSFT").status_code == 401
+
+
+def _portfolio(*accounts: dict[str, float]) -> Portfolio:
+    return Portfolio(
+        accounts=[
+            Account(id=f"acct-{index}", holdings=[Holding(symbol=s, quantity=1, total_value=v) for s, v in held.items()])
+            for index, held in enumerate(accounts)
+        ]
+    )
+
+
+def test_risk_measures_on_a_single_holding_tracking_the_benchmark():
+    closes = np.array([100.0, 120.0, 90.0, 110.0] * 10)
+
+    measures = svc.risk_measures(closes[:, None], np.array([1.0]), closes, confidence=0.95)
+
+    daily = closes[1:] / closes[:-1] - 1
+    assert measures["beta"] == pytest.approx(1.0)
+    assert measures["holding_beta"][0] == pytest.approx(1.0)
+    assert measures["volatility"] == pytest.approx(np.std(np.diff(np.log(closes)), ddof=1) * np.sqrt(252))
+    assert measures["historical_var"] == pytest.approx(-np.quantile(daily, 0.05))
+    assert measures["max_drawdown"] == pytest.approx(0.25)
+    assert measures["risk_contribution"][0] == pytest.approx(1.0)
+
+
+def test_risk_measures_weight_holdings_by_covariance():
+    rng = np.random.default_rng(11)
+    returns = rng.normal(0, 0.01, size=(250, 3))
+    closes = 100 * np.exp(np.cumsum(returns, axis=0))
+    weights = np.array([0.5, 0.3, 0.2])
+
+    measures = svc.risk_measures(closes[:, :2], weights[:2] / 0.8, closes[:, 2])
+
+    cov = np.cov(returns[1:, :2], rowvar=False)
+    w = weights[:2] / 0.8
+    assert measures["volatility"] == pytest.approx(np.sqrt(w @ cov @ w * 252))
+    assert measures["risk_contribution"].sum() == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_portfolio_risk_is_cached_per_user_until_holdings_change(monkeypatch):
+    days = _trading_days(80)
+    rng = np.random.default_rng(2)
+    paths = {symbol: 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 80))) for symbol in ("AAPL", "MSFT", "SPY")}
+    loads = []
+
+    async def fake_series(symbol, interval, output_size):
+        loads.append(symbol)
+        return _series(days, paths[symbol])
+
+    monkeypatch.setattr(svc.stock_svc, "get_price_series", fake_series)
+    portfolio = _portfolio({"AAPL": 600.0, "msft": 200.0}, {"MSFT": 200.0})
+
+    risk, errors = await svc.portfolio_risk("user-1", portfolio, "spy", "3m")
+    again, _ = await svc.portfolio_risk("user-1", portfolio, "SPY", "3m")
+    other, _ = await svc.portfolio_risk("user-2", portfolio, "SPY", "3m")
+    changed, _ = await svc.portfolio_risk("user-1", _portfolio({"AAPL": 600.0}), "SPY", "3m")
+
+    assert errors == {}
+    assert again is risk
+    assert other is not risk
+    assert sorted(loads[:3]) == ["AAPL", "MSFT", "SPY"]
+    assert len(loads) == 8
+    assert risk.value == 1000.0
+    assert [(h.symbol, h.weight) for h in risk.holdings] == [("AAPL", 0.6), ("MSFT", 0.4)]
+    assert risk.benchmark == "SPY"
+    assert risk.historical_var == pytest.approx(risk.historical_var_percent * 10, abs=0.01)
+    assert changed.holdings[0].risk_contribution == pytest.approx(1.0)
+    assert svc.risk_cache_stats() == {"hits": 1, "misses": 3, "size": 2}
+
+
+def test_portfolio_risk_route_uses_the_snaptrade_portfolio(client):
+    _signup_and_login(client)
+    risk = svc.PortfolioRisk(benchmark="SPY", value=1000.0, volatility=0.2)
+    compute = AsyncMock(return_value=(risk, {"BAD": "No price history"}))
+    portfolio = _portfolio({"AAPL": 1000.0})
+
+    with (
+        patch("routers.analytics.user_svc.get_user_secret", new=AsyncMock(return_value="secret")),
+        patch("routers.analytics.snaptrade_svc.get_portfolio", new=AsyncMock(return_value=portfolio)),
+        patch("routers.analytics.analytics_svc.portfolio_risk", new=compute),
+    ):
+        resp = client.get("/api/analytics/portfolio-risk?benchmark=QQQ&confidence=0.99")
+    with patch("routers.analytics.user_svc.get_user_secret", new=AsyncMock(return_value=None)):
+        missing = client.get("/api/analytics/portfolio-risk")
+
+    assert resp.status_code == 200
+    assert compute.await_args.args[1:] == (portfolio, "QQQ", "1y", 0.99)
+    assert resp.json()["data"]["volatility"] == 0.2
+    assert resp.json()["errors"] == ["BAD: No price history"]
+    assert missing.status_code == 404
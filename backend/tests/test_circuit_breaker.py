@@ -0,0 +1,197 @@
+import asyncio
+from collections import deque
+
+import httpx
+import pytest
+
+from services import stock_data_service as svc
+
+
+class FakeUpstream:
+    """Local stand-in for Twelve Data: answers /quote, optionally slow or failing."""
+
+    def __init__(self):
+        self.calls = 0
+        self.status = 200
+        self.delays: list[float] = []
+        self.body_error: int | None = None
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.delays:
+            await asyncio.sleep(self.delays.pop(0))
+        if self.status != 200:
+            return httpx.Response(self.status, json={"status": "error"})
+        if self.body_error is not None:
+            return httpx.Response(200, json={"code": self.body_error, "message": "upstream", "status": "error"})
+        symbol = request.url.params["symbol"]
+        return httpx.Response(200, json={"symbol": symbol, "close": str(self.calls)})
+
+
+@pytest.fixture
+async def upstream(monkeypatch):
+    fake = FakeUpstream()
+    monkeypatch.setattr(svc, "TWELVE_DATA_API_KEY", "test-key")
+    monkeypatch.setattr(svc.market_calendar, "cache_ttl", lambda seconds, now=None: seconds)
+    monkeypatch.setattr(svc, "_latency_samples", {})
+    monkeypatch.setattr(svc, "_hedge_stats", {"sent": 0, "won": 0})
+    monkeypatch.setattr(svc, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(fake.handle)))
+    yield fake
+    await svc.close_client()
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_errors_and_serves_stale_quotes(upstream, monkeypatch):
+    svc.reset_circuit_breaker(window=4, min_calls=4, open_seconds=60)
+    monkeypatch.setattr(svc, "QUOTE_CACHE_TTL_SECONDS", 0)
+    await svc.get_stock_quote("AAPL")
+
+    upstream.status = 500
+    served = [await svc.get_stock_quote("AAPL") for _ in range(4)]
+
+    assert [quote.price for quote in served] == [1.0] * 4
+    # One success and three failures fill the window; the fourth call never leaves.
+    assert svc.circuit_breaker_stats()["state"] == "open"
+    assert upstream.calls == 4
+
+    stale = await svc.get_stock_quote("AAPL")
+    quotes, errors = await svc.get_quote_batch(["AAPL", "MSFT"])
+
+    assert stale.price == 1.0
+    assert [quote.symbol for quote in quotes] == ["AAPL"]
+    assert "unavailable" in errors["MSFT"]
+    with pytest.raises(svc.StockDataUnavailableError):
+        await svc.get_stock_quote("MSFT")
+    assert upstream.calls == 4
+    stats = svc.circuit_breaker_stats()
+    assert stats["transitions"]["open"] == 1
+    assert stats["rejected"] == 4
+    assert svc.quote_cache_stats()["stale"] == 6
+
+
+@pytest.mark.asyncio
+async def test_breaker_counts_error_codes_sent_in_a_200_body(upstream):
+    svc.reset_circuit_breaker(window=4, min_calls=4, open_seconds=60)
+    upstream.body_error = 400
+    await svc.get_quote_batch(["AAPL", "MSFT"])
+    assert svc.circuit_breaker_stats()["state"] == "closed"
+
+    upstream.body_error = 429
+    for _ in range(2):
+        await svc.get_quote_batch(["AAPL", "MSFT"])
+    upstream.body_error = 503
+    await svc.get_quote_batch(["AAPL", "MSFT"])
+
+    assert svc.circuit_breaker_stats()["state"] == "open"
+    with pytest.raises(svc.StockDataUnavailableError):
+        await svc.get_stock_quote("NVDA")
+    assert upstream.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_throttling_or_outage_in_a_200_body_serves_stale_quotes_or_raises(upstream, monkeypatch):
+    monkeypatch.setattr(svc, "QUOTE_CACHE_TTL_SECONDS", 0)
+    await svc.get_stock_quote("AAPL")
+
+    upstream.body_error = 429
+    stale = await svc.get_stock_quote("AAPL")
+    with pytest.raises(svc.StockDataRateLimitError, match="upstream"):
+        await svc.get_stock_quote("MSFT")
+    upstream.body_error = 503
+    with pytest.raises(svc.StockDataUnavailableError, match="upstream"):
+        await svc.get_stock_quote("MSFT")
+    upstream.body_error = 400
+
+    assert stale.price == 1.0
+    assert await svc.get_stock_quote("MSFT") is None
+
+
+@pytest.mark.asyncio
+async def test_breaker_trips_on_slow_calls_and_closes_after_a_good_probe(upstream):
+    svc.reset_circuit_breaker(min_calls=2, slow_call_seconds=0.05, open_seconds=0.1)
+    upstream.delays = [0.06, 0.06]
+
+    await svc.get_stock_quote("AAPL")
+    await svc.get_stock_quote("MSFT")
+
+    assert svc.circuit_breaker_stats()["state"] == "open"
+    with pytest.raises(svc.StockDataUnavailableError):
+        await svc.get_stock_quote("NVDA")
+
+    await asyncio.sleep(0.12)
+    quote = await svc.get_stock_quote("NVDA")
+
+    stats = svc.circuit_breaker_stats()
+    assert quote.price == 3.0
+    assert stats["state"] == "closed"
+    assert stats["transitions"] == {"open": 1, "halfOpen": 1, "closed": 1}
+    assert stats["slowCalls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_reopens_the_breaker(upstream):
+    svc.reset_circuit_breaker(min_calls=1, open_seconds=0.05)
+    upstream.status = 503
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await svc.get_stock_quote("AAPL")
+    await asyncio.sleep(0.06)
+    with pytest.raises(httpx.HTTPStatusError):
+        await svc.get_stock_quote("AAPL")
+
+    stats = svc.circuit_breaker_stats()
+    assert stats["state"] == "open"
+    assert stats["transitions"]["open"] == 2
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_answers_when_the_first_attempt_stalls(upstream, monkeypatch):
+    monkeypatch.setattr(svc, "HEDGE_REQUESTS", True)
+    monkeypatch.setattr(svc, "HEDGE_MIN_SAMPLES", 5)
+    svc._latency_samples["quote"] = deque([10.0] * 20, maxlen=svc.LATENCY_SAMPLE_SIZE)
+    upstream.delays = [5.0, 0.0]
+
+    started = asyncio.get_running_loop().time()
+    quote = await svc.get_stock_quote("AAPL")
+
+    assert asyncio.get_running_loop().time() - started < 1
+    assert quote.price == 2.0
+    assert upstream.calls == 2
+    stats = svc.client_stats()
+    assert (stats["hedgedRequests"], stats["hedgeWins"]) == (1, 1)
+    assert svc.rate_limiter_stats()["lanes"]["interactive"]["granted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_survives_a_cancelled_attempt(upstream, monkeypatch):
+    monkeypatch.setattr(svc, "HEDGE_REQUESTS", True)
+    monkeypatch.setattr(svc, "HEDGE_MIN_SAMPLES", 5)
+    svc._latency_samples["quote"] = deque([10.0] * 20, maxlen=svc.LATENCY_SAMPLE_SIZE)
+    handle = upstream.handle
+
+    async def cancel_first(request: httpx.Request) -> httpx.Response:
+        if upstream.calls == 0:
+            upstream.calls += 1
+            await asyncio.sleep(0.05)
+            raise asyncio.CancelledError
+        await asyncio.sleep(0.1)
+        return await handle(request)
+
+    monkeypatch.setattr(svc, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(cancel_first)))
+
+    quote = await svc.get_stock_quote("AAPL")
+
+    assert quote.price == 2.0
+    assert svc.client_stats()["hedgeWins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_enough_latency_samples(upstream, monkeypatch):
+    monkeypatch.setattr(svc, "HEDGE_REQUESTS", True)
+    upstream.delays = [0.05]
+
+    await svc.get_stock_quote("AAPL")
+
+    assert upstream.calls == 1
+    assert svc.client_stats()["hedgedRequests"] == 0
@@ -191,7 +191,8 @@ class TestFreshMigrations:
             "signin_otps", "password_reset_tokens", "plaid_items", "plaid_accounts",
             "cashflow_entries", "snaptrade_user_secrets", "snaptrade_account_preferences",
             "snaptrade_portfolio_balance_snapshots", "snaptrade_account_balance_snapshots", "alembic_version",
-            "real_estate_properties", "external_api_usage", "rentcast_listing_cache",
+            "real_estate_properties", "external_api_usage", "rentcast_listing_cache", "stock_price_bars",
+            "stock_fundamentals", "snaptrade_activities", "snaptrade_activity_sync",
         }
         assert required <= tables
 
@@ -0,0 +1,183 @@
+import math
+from datetime import date, datetime, time, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from models.analytics_models import DcaVariant
+from models.snaptrade_models import TradeExecution
+from services import dca_backtest as svc
+from services import market_calendar
+from services import recurring_buy_service as recurring_svc
+from services.price_series import PriceSeries
+
+
+def _trading_days(start: date, count: int) -> list[date]:
+    days = [market_calendar.next_trading_day(start)]
+    while len(days) < count:
+        days.append(recurring_svc.compute_next_run_date("daily", days[-1]))
+    return days
+
+
+def _series(days: list[date], closes) -> PriceSeries:
+    closes = list(closes)
+    return PriceSeries.from_columns(days, closes, closes, closes, closes, [1] * len(closes))
+
+
+def _replay(variant: DcaVariant, prices: dict[date, float], start: date, end: date) -> tuple[float, float, float]:
+    """Scalar replay of the live scheduler's rules: (shares, carried budget, invested)."""
+    shares = budget = invested = 0.0
+    for run in svc.run_dates(variant.frequency, start, end):
+        price = prices.get(run, 0.0)
+        if variant.target_amount is None:
+            if price > 0:
+                shares += variant.units
+                invested += variant.units * price
+            continue
+        budget += variant.target_amount
+        invested += variant.target_amount
+        bought = math.floor(budget / price) if price > 0 else 0
+        if bought >= 1:
+            shares += bought
+            budget = max(0.0, budget - bought * price)
+        budget = round(budget, 2)
+    return shares, budget, invested
+
+
+def _signup_and_login(client, password: str = "very-secure-pass") -> None:
+    last_code: list[str] = []
+
+    async def capture(to_email: str, code: str) -> None:
+        last_code.append(code)
+
+    with patch("services.email_service.send_otp_email", new=AsyncMock(side_effect=capture)):
+        resp = client.post("/api/auth/signup", json={"email": f"user-{uuid4()}@example.com", "password": password})
+    pending_user_id = resp.json()["data"]["pendingUserId"]
+    client.post("/api/auth/verify-otp", json={"pendingUserId": pending_user_id, "code": last_code[0]})
+
+
+def test_run_dates_follow_the_live_schedule_rules():
+    dates = svc.run_dates("monthly", date(2024, 1, 31), date(2024, 6, 30))
+
+    expected = [market_calendar.next_trading_day(date(2024, 1, 31))]
+    while (following := recurring_svc.compute_next_run_date("monthly", expected[-1])) <= date(2024, 6, 30):
+        expected.append(following)
+    assert dates == expected
+    assert all(market_calendar.is_trading_day(day) for day in dates)
+
+
+def test_simulate_matches_a_scalar_replay_for_every_variant():
+    days = _trading_days(date(2023, 1, 3), 300)
+    rng = np.random.default_rng(5)
+    closes = 80 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))
+    # A missing bar on a run day: the budget grows and nothing is bought.
+    del days[40]
+    closes = np.delete(closes, 40)
+    variants = [
+        DcaVariant(frequency=frequency, target_amount=amount)
+        for frequency in sorted(recurring_svc.FREQUENCIES)
+        for amount in (25.0, 60.0, 137.5, 500.0)
+    ] + [DcaVariant(frequency="weekly", units=2.5)]
+
+    result = svc.simulate(_series(days, closes), variants, days[0], days[-1])
+
+    prices = dict(zip(days, closes))
+    for variant, outcome in zip(variants, result.results):
+        shares, budget, invested = _replay(variant, prices, days[0], days[-1])
+        assert outcome.shares == pytest.approx(shares)
+        assert outcome.cash == pytest.approx(budget)
+        assert outcome.invested == pytest.approx(invested, abs=0.01)
+        assert outcome.final_value == pytest.approx(shares * closes[-1] + budget, abs=0.01)
+        assert outcome.equity[-1] == pytest.approx(outcome.final_value, abs=0.01)
+        assert len(outcome.equity) == len(result.dates)
+    assert result.results[-1].label == "weekly 2.5 sh"
+
+
+def test_simulate_accumulates_until_the_budget_covers_a_share():
+    days = _trading_days(date(2024, 3, 4), 10)
+
+    (outcome,) = svc.simulate(
+        _series(days, [250.0] * len(days)), [DcaVariant(frequency="daily", target_amount=100.0)], days[0], days[-1]
+    ).results
+
+    # 100, 200, 300 -> 1 share (50 left), 150, 250 -> 1 share (0 left), ...
+    assert outcome.runs == 10
+    assert outcome.buys == 4
+    assert outcome.shares == 4
+    assert outcome.cash == 0.0
+    assert outcome.average_cost == 250.0
+    assert outcome.max_drawdown_percent == pytest.approx(0.0)
+
+
+async def test_simulate_carries_the_same_budget_as_live_runs(monkeypatch):
+    days = _trading_days(date(2026, 6, 15), 40)
+    closes = [13.37 + 0.413 * (index % 7) for index in range(len(days))]
+    await recurring_svc.create_schedule("u1", "acc", "AAPL", "daily", target_amount=33.33, start_date=days[0])
+    live = {"price": 0.0, "shares": 0.0}
+
+    async def fake_quote(symbol, client=None, allow_stale=True):
+        return SimpleNamespace(price=live["price"])
+
+    async def fake_place_order(user_id, user_secret, account_id, action, symbol, **kwargs):
+        live["shares"] += kwargs["units"]
+        return TradeExecution(brokerage_order_id="ord", account_id=account_id, status="EXECUTED", price=live["price"])
+
+    monkeypatch.setattr(recurring_svc.user_svc, "get_user_secret", AsyncMock(return_value="secret"))
+    monkeypatch.setattr(recurring_svc.stock_svc, "get_stock_quote", fake_quote)
+    monkeypatch.setattr(recurring_svc.snaptrade_svc, "place_order", fake_place_order)
+
+    carried = []
+    for day, close in zip(days, closes):
+        live["price"] = close
+        # Noon Central, after the 11:00 buy window.
+        await recurring_svc.run_due_schedules(now=datetime.combine(day, time(17, 0), tzinfo=timezone.utc))
+        carried.append((await recurring_svc.list_schedules("u1"))[0].accumulated_budget)
+
+    (outcome,) = svc.simulate(
+        _series(days, closes), [DcaVariant(frequency="daily", target_amount=33.33)], days[0], days[-1]
+    ).results
+
+    assert outcome.runs == len(days)
+    assert outcome.shares == live["shares"]
+    assert outcome.cash == carried[-1]
+
+
+def test_dca_backtest_endpoint_replays_a_saved_schedule_with_variants(client, monkeypatch):
+    _signup_and_login(client)
+    user_id = client.get("/api/auth/me").json()["data"]["user"]["id"]
+    days = _trading_days(date(2024, 1, 2), 120)
+
+    async def fake_series(symbol, interval, output_size):
+        assert (symbol, interval) == ("VTI", "1day")
+        return _series(days, np.linspace(200, 260, len(days)))
+
+    monkeypatch.setattr(svc.stock_svc, "get_price_series", fake_series)
+    schedule = client.portal.call(
+        lambda: recurring_svc.create_schedule(user_id, "acct-1", "vti", "weekly", target_amount=150.0)
+    )
+
+    resp = client.post(
+        "/api/analytics/dca-backtest",
+        json={
+            "scheduleId": schedule.id,
+            "startDate": "2024-01-02",
+            "endDate": days[-1].isoformat(),
+            "variants": [{"frequency": "Monthly", "targetAmount": 600}, {"frequency": "daily", "units": 1}],
+        },
+    )
+
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["symbol"] == "VTI"
+    assert [item["label"] for item in data["results"]] == ["schedule", "monthly $600", "daily 1 sh"]
+    assert data["results"][0]["runs"] == len(svc.run_dates("weekly", date(2024, 1, 2), days[-1]))
+    assert data["results"][2]["buys"] == len(days)
+
+    bad = client.post(
+        "/api/analytics/dca-backtest",
+        json={"symbol": "VTI", "startDate": "2024-01-02", "variants": [{"frequency": "hourly", "units": 1}]},
+    )
+    assert bad.status_code == 400
@@ -0,0 +1,158 @@
+import logging
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from database import SessionLocal
+from db_models import StockFundamental, Watchlist, WatchlistItem
+from models.stock_models import StockDetails, StockQuote
+from services import fundamentals_service as svc
+
+
+def _details(symbol: str, **fields) -> StockDetails:
+    return StockDetails(symbol=symbol, name=f"{symbol} Inc", current_price=fields.pop("price", 50.0), **fields)
+
+
+def _seed(*rows: dict) -> None:
+    now = datetime.now(UTC)
+    with SessionLocal() as db:
+        for row in rows:
+            db.add(StockFundamental(updated_at=now, **row))
+        db.commit()
+
+
+@pytest.mark.asyncio
+async def test_refresh_fills_stale_universe_rows_including_watchlisted_symbols(monkeypatch):
+    monkeypatch.setattr(svc, "UNIVERSE", ["AAPL", "MSFT"])
+    with SessionLocal() as db:
+        watchlist = Watchlist(user_id="00000000-0000-0000-0000-000000000001", name="Mine")
+        db.add(watchlist)
+        db.flush()
+        db.add(WatchlistItem(watchlist_id=watchlist.id, symbol="nvda"))
+        db.commit()
+    fetched = []
+
+    async def fake_details(symbol, require_profile=False):
+        fetched.append(symbol)
+        return _details(symbol, price=150.0, sector="Technology", high_52_week=200.0, low_52_week=100.0, pe_ratio=30.0)
+
+    monkeypatch.setattr(svc.stock_svc, "get_stock_details", fake_details)
+
+    first = await svc.refresh()
+    again = await svc.refresh()
+    later = await svc.refresh(now=datetime.now(UTC) + timedelta(seconds=svc.REFRESH_SECONDS + 1))
+
+    assert first == {"stale": 3, "refreshed": 3, "failed": 0}
+    assert again == {"stale": 0, "refreshed": 0, "failed": 0}
+    assert later["refreshed"] == 3
+    assert sorted(fetched[:3]) == ["AAPL", "MSFT", "NVDA"]
+    with SessionLocal() as db:
+        row = db.get(StockFundamental, "NVDA")
+        assert (row.sector, row.price, row.range_position) == ("Technology", 150.0, 0.5)
+
+
+@pytest.mark.asyncio
+async def test_refresh_stops_when_upstream_is_unavailable(monkeypatch):
+    monkeypatch.setattr(svc, "UNIVERSE", ["A", "B", "C"])
+    monkeypatch.setattr(svc, "INCLUDE_WATCHLISTS", False)
+
+    async def fake_details(symbol, require_profile=False):
+        if symbol == "B":
+            raise svc.stock_svc.StockDataUnavailableError("circuit open")
+        return None if symbol == "A" else _details(symbol)
+
+    monkeypatch.setattr(svc.stock_svc, "get_stock_details", fake_details)
+
+    counts = await svc.refresh()
+
+    assert counts == {"stale": 3, "refreshed": 0, "failed": 1}
+    with SessionLocal() as db:
+        assert db.get(StockFundamental, "C") is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_leaves_rows_stale_until_the_profile_is_fetched(monkeypatch, caplog):
+    monkeypatch.setattr(svc, "UNIVERSE", ["AAPL", "MSFT"])
+    monkeypatch.setattr(svc, "INCLUDE_WATCHLISTS", False)
+    profile_error: list[Exception] = [svc.stock_svc.StockDataConfigurationError("plan below 10 credits")]
+
+    async def fake_quote(symbol):
+        return StockQuote(symbol=symbol, price=150.0, change=0, change_percent=0, volume=100)
+
+    async def fake_profile(symbol):
+        if profile_error:
+            raise profile_error[0]
+        return {"name": f"{symbol} Inc", "sector": "Technology", "market_cap": 3e12}
+
+    async def fake_range(symbol):
+        return 200.0, 100.0
+
+    monkeypatch.setattr(svc.stock_svc, "get_stock_quote", fake_quote)
+    monkeypatch.setattr(svc.stock_svc, "_get_profile", fake_profile)
+    monkeypatch.setattr(svc.stock_svc, "_get_52_week_range", fake_range)
+
+    # Alembic's fileConfig disables loggers that already exist when migrations run.
+    monkeypatch.setattr(svc.logger, "disabled", False)
+    with caplog.at_level(logging.ERROR, logger="services.fundamentals_service"):
+        unaffordable = await svc.refresh()
+    profile_error[0] = RuntimeError("profile lookup failed")
+    failed = await svc.refresh()
+    profile_error.clear()
+    refreshed = await svc.refresh()
+
+    assert unaffordable == {"stale": 2, "refreshed": 0, "failed": 0}
+    assert "can't be filled" in caplog.text
+    assert failed == {"stale": 2, "refreshed": 0, "failed": 2}
+    assert refreshed == {"stale": 2, "refreshed": 2, "failed": 0}
+    with SessionLocal() as db:
+        assert (db.get(StockFundamental, "MSFT").sector, db.get(StockFundamental, "MSFT").market_cap) == (
+            "Technology",
+            3e12,
+        )
+
+
+def test_screen_combines_filters_sorts_and_pages():
+    _seed(
+        {"symbol": "AAPL", "sector": "Technology", "market_cap": 3e12, "pe_ratio": 30.0, "dividend_yield": 0.5},
+        {"symbol": "MSFT", "sector": "Technology", "market_cap": 2.8e12, "pe_ratio": 35.0, "dividend_yield": 0.8},
+        {"symbol": "INTC", "sector": "Technology", "market_cap": 1e11, "pe_ratio": None, "dividend_yield": 1.5},
+        {"symbol": "KO", "sector": "Consumer Defensive", "market_cap": 2.6e11, "pe_ratio": 24.0, "dividend_yield": 3.0},
+    )
+
+    with SessionLocal() as db:
+        tech = svc.screen(db, sectors=["Technology"], ranges={"marketCap": (1e12, None)}, sort="peRatio:desc")
+        yielders = svc.screen(db, ranges={"dividendYield": (0.7, 3.0)}, sort="dividendYield:desc", limit=2)
+        by_pe = svc.screen(db, sort="peRatio", limit=2, offset=2)
+        with pytest.raises(ValueError):
+            svc.screen(db, sort="volume:sideways")
+        with pytest.raises(ValueError):
+            svc.screen(db, ranges={"peRatio": (30, 10)})
+
+    assert [item.symbol for item in tech.items] == ["MSFT", "AAPL"]
+    assert tech.total == 2
+    assert [item.symbol for item in yielders.items] == ["KO", "INTC"]
+    assert yielders.total == 3
+    assert [item.symbol for item in by_pe.items] == ["MSFT", "INTC"]
+
+
+def test_screener_route_reads_only_the_local_table(client, monkeypatch):
+    _seed(
+        {"symbol": "AAPL", "sector": "Technology", "market_cap": 3e12, "range_position": 0.9},
+        {"symbol": "KO", "sector": "Consumer Defensive", "market_cap": 2.6e11, "range_position": 0.2},
+    )
+
+    async def upstream(*args, **kwargs):
+        raise AssertionError("the screener must not call upstream")
+
+    monkeypatch.setattr(svc.stock_svc, "get_stock_details", upstream)
+    monkeypatch.setattr(svc.stock_svc, "get_stock_quote", upstream)
+
+    resp = client.get("/api/stock/screener?minRangePosition=0.5&sector=Technology,Utilities")
+    bad = client.get("/api/stock/screener?maxPeRatio=cheap")
+
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["total"] == 1
+    assert data["items"][0]["symbol"] == "AAPL"
+    assert data["items"][0]["rangePosition"] == 0.9
+    assert bad.status_code == 400
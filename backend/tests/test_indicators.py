@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from services import indicators
+from services.price_series import PriceSeries
+
+
+def _series(closes: list[float]) -> PriceSeries:
+    count = len(closes)
+    stamps = np.datetime64("2024-01-01") + np.arange(count)
+    close = np.asarray(closes, dtype=float)
+    return PriceSeries.from_columns(stamps, close, close + 1, close - 1, close, [100] * count)
+
+
+def _ema_reference(values, span):
+    alpha = 2 / (span + 1)
+    out = [values[0]]
+    for value in values[1:]:
+        out.append((1 - alpha) * out[-1] + alpha * value)
+    return np.array(out)
+
+
+def test_parse_specs_applies_defaults_dedupes_and_rejects_bad_input():
+    specs = indicators.parse_specs("SMA:20, macd, sma:20, bbands:20:2.5")
+
+    assert [spec.key for spec in specs] == ["sma:20", "macd:12:26:9", "bbands:20:2.5"]
+    for bad in ("", "foo:3", "sma:0", "sma:2.5", "macd:12:26", "rsi:x"):
+        with pytest.raises(ValueError):
+            indicators.parse_specs(bad)
+
+
+def test_moving_averages_match_reference_loops():
+    closes = np.linspace(10, 40, 300) + np.sin(np.arange(300))
+
+    sma = indicators.sma(closes, 5)
+    ema = indicators.ema(closes, 12)
+
+    assert np.isnan(sma[:4]).all()
+    assert sma[4] == pytest.approx(closes[:5].mean())
+    assert np.isnan(ema[:11]).all()
+    np.testing.assert_allclose(ema[11:], _ema_reference(closes, 12)[11:], rtol=1e-12)
+
+
+def test_oscillators_and_bands_have_expected_shape_and_bounds():
+    closes = list(100 + 5 * np.sin(np.arange(120) / 4))
+    series = _series(closes)
+
+    rsi = indicators.compute(indicators.IndicatorSpec("rsi", (14,)), series)["value"]
+    bands = indicators.compute(indicators.IndicatorSpec("bbands", (20, 2)), series)
+    macd = indicators.compute(indicators.IndicatorSpec("macd", (12, 26, 9)), series)
+    atr = indicators.compute(indicators.IndicatorSpec("atr", (14,)), series)["value"]
+
+    assert np.isnan(rsi[:14]).all() and ((rsi[14:] >= 0) & (rsi[14:] <= 100)).all()
+    assert (bands["upper"][19:] >= bands["middle"][19:]).all()
+    np.testing.assert_allclose(macd["histogram"][40:], macd["macd"][40:] - macd["signal"][40:])
+    assert atr[-1] >= 2.0
+    assert indicators.rsi(np.arange(1.0, 31.0), 14)[-1] == 100
+
+
+def test_compute_many_caches_until_a_new_bar_arrives():
+    specs = indicators.parse_specs("sma:3,volatility:5")
+    series = _series([float(value) for value in range(1, 21)])
+
+    indicators.compute_many("aapl", "1day", series, specs)
+    indicators.compute_many("AAPL", "1day", series, specs)
+    assert indicators.cache_stats() == {"hits": 2, "misses": 2, "size": 2}
+
+    indicators.compute_many("AAPL", "1day", series.merge(_series([50.0] * 21).tail(1)), specs)
+    assert indicators.cache_stats()["misses"] == 4
+
+
+def test_compute_many_recomputes_when_the_last_bar_is_updated_in_place():
+    specs = indicators.parse_specs("sma:3")
+    series = _series([float(value) for value in range(1, 21)])
+    before = indicators.compute_many("AAPL", "1day", series, specs)["sma:3"]["value"]
+
+    updated = series.merge(_series([float(value) for value in range(1, 20)] + [50.0]).tail(1))
+    after = indicators.compute_many("AAPL", "1day", updated, specs)["sma:3"]["value"]
+
+    assert len(updated) == len(series)
+    assert before[-1] == 19
+    assert after[-1] == pytest.approx((18 + 19 + 50) / 3)
+    assert indicators.cache_stats()["misses"] == 2
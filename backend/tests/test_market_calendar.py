@@ -0,0 +1,39 @@
+from datetime import date, datetime, timezone
+
+from services import market_calendar as cal
+
+
+def _utc(text: str) -> datetime:
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+
+
+def test_trading_days_skip_weekends_and_holidays():
+    assert cal.is_trading_day(date(2026, 10, 16))
+    assert not cal.is_trading_day(date(2026, 10, 17))
+    assert cal.next_trading_day(date(2026, 11, 26)) == date(2026, 11, 27)
+
+
+def test_session_hours_include_the_settle_window():
+    assert cal.is_market_open(_utc("2026-10-16 13:30"))
+    assert cal.is_market_open(_utc("2026-10-16 20:10"))
+    assert not cal.is_market_open(_utc("2026-10-16 20:20"))
+    assert not cal.is_market_open(_utc("2026-10-17 15:00"))
+
+
+def test_next_session_open_rolls_over_weekends_and_holidays():
+    assert cal.next_session_open(_utc("2026-10-16 12:00")) == _utc("2026-10-16 13:30")
+    assert cal.next_session_open(_utc("2026-10-16 21:00")) == _utc("2026-10-19 13:30")
+    assert cal.next_session_open(_utc("2026-11-26 15:00")) == _utc("2026-11-27 14:30")
+
+
+def test_cache_ttl_is_short_in_session_and_lasts_until_the_open_otherwise():
+    assert cal.cache_ttl(15, _utc("2026-10-16 15:00")) == 15
+    assert cal.cache_ttl(15, _utc("2026-10-17 13:30")) == 48 * 3600
+    assert cal.cache_ttl(15, _utc("2026-10-19 13:29:55")) == 15
+
+
+def test_last_closed_session_waits_for_the_settle_window():
+    assert cal.last_closed_session(_utc("2026-10-16 20:10")) == date(2026, 10, 15)
+    assert cal.last_closed_session(_utc("2026-10-16 20:20")) == date(2026, 10, 16)
+    assert cal.last_closed_session(_utc("2026-10-19 12:00")) == date(2026, 10, 16)
+    assert cal.last_closed_session(_utc("2026-11-27 12:00")) == date(2026, 11, 25)
@@ -1,7 +1,9 @@
+import json
+
 import pytest
 from models.stock_models import StockQuote
 from models.snaptrade_models import Account, Holding, Portfolio
-from models.common import ApiResponse
+from models.common import ApiResponse, json_response
 from services.snaptrade_service import _parse_holding, _parse_account
 
 
@@ -34,6 +36,16 @@ class TestApiResponse:
         assert resp.data is None
         assert resp.message == "Not found"
 
+    def test_json_response_matches_dumped_dict(self):
+        portfolio = Portfolio(accounts=[Account(id="a1", holdings=[Holding(symbol="AAPL", total_value=float("nan"))])])
+        resp = json_response(ApiResponse(success=True, data=portfolio), status_code=201)
+        body = json.loads(resp.body)
+        assert resp.status_code == 201
+        assert resp.media_type == "application/json"
+        assert body["data"]["accounts"][0]["holdings"][0]["symbol"] == "AAPL"
+        assert body["data"]["accounts"][0]["holdings"][0]["totalValue"] is None
+        assert body["data"]["totalGainLossPercent"] == 0.0
+
 
 class TestParseHolding:
     def test_gain_loss_calculation(self):
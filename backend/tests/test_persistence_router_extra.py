@@ -4,10 +4,11 @@ from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, patch
 from uuid import uuid4
 
-from sqlalchemy import delete as sql_delete, select
+from sqlalchemy import delete as sql_delete, event, select
 
-from database import SessionLocal
+from database import SessionLocal, engine
 from db_models import AppUser, PasswordResetToken
+from models.stock_models import StockQuote
 from routers import persistence
 
 PASSWORD = "very-secure-pass"
@@ -435,6 +436,45 @@ def _create_watchlist(client, token: str, name: str = "Tech", **extra) -> str:
     return resp.json()["data"]["id"]
 
 
+def _board_query_count(client, token: str) -> tuple[dict, int]:
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        resp = client.get("/api/watchlists/board", headers=_auth(token))
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert resp.status_code == 200
+    return resp.json(), len(statements)
+
+
+def test_watchlist_board_dedupes_symbols_into_one_quote_batch(client):
+    token = _signup_and_login(client)
+    core = _create_watchlist(client, token, name="Core", is_default=True)
+    growth = _create_watchlist(client, token, name="Growth")
+    for watchlist_id, symbol in ((core, "aapl"), (core, "MSFT"), (growth, "AAPL"), (growth, "NVDA")):
+        client.post(f"/api/watchlists/{watchlist_id}/items", json={"symbol": symbol}, headers=_auth(token))
+    quotes = [StockQuote(symbol="AAPL", price=200), StockQuote(symbol="MSFT", price=400)]
+    batch = AsyncMock(return_value=(quotes, {"NVDA": "No quote returned"}))
+
+    with patch("routers.persistence.stock_svc.get_quote_batch", new=batch):
+        body, small_queries = _board_query_count(client, token)
+        extra = _create_watchlist(client, token, name="Extra")
+        client.post(f"/api/watchlists/{extra}/items", json={"symbol": "TSLA"}, headers=_auth(token))
+        _, large_queries = _board_query_count(client, token)
+
+    assert sorted(batch.await_args_list[0].args[0]) == ["AAPL", "MSFT", "NVDA"]
+    assert small_queries == large_queries
+    core_row, growth_row = body["data"]
+    assert [item["symbol"] for item in core_row["items"]] == ["AAPL", "MSFT"]
+    assert core_row["items"][0]["quote"]["price"] == 200
+    assert growth_row["items"][1]["quote"] is None
+    assert body["errors"] == ["NVDA: No quote returned"]
+
+
 def test_create_and_list_watchlists_orders_default_first(client):
     token = _signup_and_login(client)
     _create_watchlist(client, token, name="Growth")
@@ -27,7 +27,7 @@ def test_save_daily_snapshot_upserts_user_date():
 
     with SessionLocal() as db:
         first = svc.save_daily_snapshot(db, "user1", portfolio, snapshot_date=date(2026, 5, 10))
-        portfolio.total_balance = 125
+        portfolio = portfolio.model_copy(update={"total_balance": 125})
         second = svc.save_daily_snapshot(db, "user1", portfolio, snapshot_date=date(2026, 5, 10))
         snapshots = svc.get_snapshots(db, "user1")
         account_snapshots = svc.get_account_snapshots(db, "user1", "acc1")
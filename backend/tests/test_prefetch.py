@@ -0,0 +1,92 @@
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from database import SessionLocal
+from db_models import Watchlist, WatchlistItem
+from models.snaptrade_models import Account, Holding, Portfolio
+from services import prefetch_service as svc
+
+AFTER_CLOSE = datetime(2026, 10, 16, 21, 0, tzinfo=timezone.utc)
+IN_SESSION = datetime(2026, 10, 16, 15, 0, tzinfo=timezone.utc)
+NEXT_EVENING = datetime(2026, 10, 19, 21, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def fake_upstream(tmp_path, monkeypatch):
+    monkeypatch.setattr(svc, "STATE_PATH", str(tmp_path / "prefetch.json"))
+    monkeypatch.setattr(svc.stock_svc, "QUOTE_BATCH_SIZE", 2)
+    monkeypatch.setattr(svc, "collect_symbols", AsyncMock(return_value=["A", "B", "C", "D", "E"]))
+    calls = {"quotes": [], "warm": [], "fail_at": None}
+
+    async def quote_batch(symbols):
+        calls["quotes"].append(list(symbols))
+        return [], {}
+
+    async def warm(symbol, bars):
+        if symbol == calls["fail_at"]:
+            calls["fail_at"] = None
+            raise svc.stock_svc.StockDataRateLimitError("out of credits")
+        calls["warm"].append(symbol)
+
+    monkeypatch.setattr(svc.stock_svc, "get_quote_batch", quote_batch)
+    monkeypatch.setattr(svc.stock_svc, "warm_symbol", warm)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_collect_symbols_covers_holdings_watchlists_and_schedules():
+    with SessionLocal() as db:
+        watchlist = Watchlist(user_id="00000000-0000-0000-0000-000000000001", name="Mine")
+        db.add(watchlist)
+        db.flush()
+        db.add(WatchlistItem(watchlist_id=watchlist.id, symbol="msft"))
+        db.commit()
+    await svc.recurring_buy_svc.create_schedule("user-1", "acct-1", "VTI", "weekly", target_amount=100.0)
+    portfolio = Portfolio(accounts=[Account(holdings=[Holding(symbol="AAPL", quantity=2), Holding(symbol="MSFT")])])
+
+    with (
+        patch.object(svc.user_svc, "list_user_secrets", new=AsyncMock(return_value={"user-1": "s1", "user-2": "s2"})),
+        patch.object(
+            svc.snaptrade_svc, "get_portfolio", new=AsyncMock(side_effect=[portfolio, RuntimeError("SnapTrade down")])
+        ),
+    ):
+        symbols = await svc.collect_symbols()
+
+    assert symbols == ["AAPL", "MSFT", "VTI"]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_waits_for_the_close_and_warms_in_batches(fake_upstream):
+    waiting = await svc.run(now=IN_SESSION)
+    done = await svc.run(now=AFTER_CLOSE)
+
+    assert waiting["status"] == "waiting"
+    assert fake_upstream["warm"] == ["A", "B", "C", "D", "E"]
+    assert fake_upstream["quotes"] == [["A", "B"], ["C", "D"], ["E"]]
+    assert done["status"] == "done"
+    assert (done["session"], done["total"], done["done"], done["failed"]) == ("2026-10-16", 5, 5, 0)
+    assert done["finishedAt"] is not None
+
+
+@pytest.mark.asyncio
+async def test_prefetch_resumes_from_its_checkpoint_and_restarts_each_session(fake_upstream):
+    fake_upstream["fail_at"] = "D"
+
+    paused = await svc.run(now=AFTER_CLOSE)
+    checkpoint = json.loads(open(svc.STATE_PATH, encoding="utf-8").read())
+    resumed = await svc.run(now=AFTER_CLOSE)
+    repeat = await svc.run(now=AFTER_CLOSE)
+    warmed_first_session = list(fake_upstream["warm"])
+    next_session = await svc.run(now=NEXT_EVENING)
+
+    assert paused["status"] == "paused"
+    assert (paused["done"], checkpoint["next"]) == (3, 3)
+    assert resumed["status"] == "done"
+    assert repeat["done"] == 5
+    assert warmed_first_session == ["A", "B", "C", "D", "E"]
+    assert fake_upstream["quotes"][:4] == [["A", "B"], ["C", "D"], ["D", "E"], ["A", "B"]]
+    assert next_session["session"] == "2026-10-19"
+    assert fake_upstream["warm"][5:] == ["A", "B", "C", "D", "E"]
@@ -0,0 +1,39 @@
+from datetime import date, datetime, timezone
+
+from database import SessionLocal
+from services import price_bar_service as svc
+from services.price_series import PriceSeries
+
+NOW = datetime(2026, 6, 15, 21, 0, tzinfo=timezone.utc)
+
+
+def _bars(*days: date, close: float = 10.0) -> PriceSeries:
+    count = len(days)
+    return PriceSeries.from_columns(
+        days, [close] * count, [close + 1] * count, [close - 1] * count, [close] * count, [100] * count
+    )
+
+
+def test_store_bars_upserts_and_loads_latest_window():
+    with SessionLocal() as db:
+        svc.store_bars(db, "AAPL", "1day", _bars(date(2026, 6, 10), date(2026, 6, 11)), NOW)
+        svc.store_bars(db, "AAPL", "1day", _bars(date(2026, 6, 11), date(2026, 6, 12), close=12), NOW)
+        svc.store_bars(db, "AAPL", "1week", _bars(date(2026, 6, 8), close=99), NOW)
+
+        bars = svc.load_bars(db, "AAPL", "1day", limit=2)
+
+        assert [stamp.day for stamp in bars.datetimes()] == [11, 12]
+        assert bars.close.tolist() == [12, 12]
+        assert svc.latest_fetched_at(db, "AAPL", "1day") == NOW
+        assert svc.latest_fetched_at(db, "MSFT", "1day") is None
+
+
+def test_missing_trading_days_skips_weekends_and_holidays():
+    bars = _bars(
+        date(2026, 6, 12),  # Friday
+        date(2026, 6, 15),  # Monday
+        date(2026, 6, 18),  # Thursday; 06-19 is Juneteenth
+        date(2026, 6, 22),
+    )
+
+    assert svc.missing_trading_days(bars) == [(date(2026, 6, 16), date(2026, 6, 17))]
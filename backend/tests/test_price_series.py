@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from services.price_series import PriceSeries
+
+
+def _row(stamp: str, close: str, volume: str | None = "10") -> dict:
+    return {"datetime": stamp, "open": close, "high": close, "low": close, "close": close, "volume": volume}
+
+
+def test_from_twelve_data_sorts_and_drops_bad_timestamps():
+    series = PriceSeries.from_twelve_data(
+        [
+            _row("2024-01-03", "3"),
+            {"datetime": "bad", "open": "1"},
+            _row("2024-01-02 09:30:00", "2"),
+            {"open": "9"},
+        ]
+    )
+
+    assert series.datetimes() == [datetime(2024, 1, 2, 9, 30), datetime(2024, 1, 3)]
+    assert series.close.tolist() == [2.0, 3.0]
+
+
+def test_from_twelve_data_treats_missing_and_invalid_numbers_as_zero():
+    series = PriceSeries.from_twelve_data([_row("2024-01-02", "n/a", volume=None), _row("2024-01-03", "4", "7")])
+
+    assert series.close.tolist() == [0.0, 4.0]
+    assert series.volume.tolist() == [0, 7]
+
+
+def test_merge_prefers_newer_bars_and_tail_keeps_latest():
+    stored = PriceSeries.from_twelve_data([_row("2024-01-02", "1"), _row("2024-01-03", "2")])
+    fresh = PriceSeries.from_twelve_data([_row("2024-01-03", "5"), _row("2024-01-04", "6")])
+
+    merged = stored.merge(fresh)
+
+    assert merged.close.tolist() == [1.0, 5.0, 6.0]
+    assert merged.tail(2).close.tolist() == [5.0, 6.0]
+    assert merged.high_max() == 6.0
+    assert PriceSeries.empty().high_max() is None
+
+
+def test_to_models_builds_api_rows():
+    models = PriceSeries.from_twelve_data([_row("2024-01-02", "1.5")]).to_models()
+
+    assert models[0].date == datetime(2024, 1, 2)
+    assert models[0].close == 1.5
+    assert models[0].volume == 10
+
+
+def test_resample_groups_daily_bars_by_week_month_and_quarter():
+    days = ["2024-03-27", "2024-03-28", "2024-04-01", "2024-04-02", "2024-04-05", "2024-07-01"]
+    series = PriceSeries.from_columns(
+        days,
+        [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        [10.0, 30.0, 20.0, 15.0, 12.0, 7.0],
+        [1.0, 0.5, 2.0, 3.0, 4.0, 5.0],
+        [1.5, 2.5, 3.5, 4.5, 5.5, 6.5],
+        [1, 2, 3, 4, 5, 6],
+    )
+
+    weekly = series.resample("1week")
+    monthly = series.resample("1month")
+    quarterly = series.resample("3month")
+
+    assert [stamp.day for stamp in weekly.datetimes()] == [25, 1, 1]
+    assert weekly.open.tolist() == [1.0, 3.0, 6.0]
+    assert weekly.high.tolist() == [30.0, 20.0, 7.0]
+    assert weekly.low.tolist() == [0.5, 2.0, 5.0]
+    assert weekly.close.tolist() == [2.5, 5.5, 6.5]
+    assert weekly.volume.tolist() == [3, 12, 6]
+    assert [stamp.month for stamp in monthly.datetimes()] == [3, 4, 7]
+    assert [stamp.month for stamp in quarterly.datetimes()] == [1, 4, 7]
+    assert quarterly.volume.tolist() == [3, 12, 6]
+    assert len(PriceSeries.empty().resample("1week")) == 0
@@ -0,0 +1,107 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from models.stock_models import StockQuote
+from routers import stock as stock_router
+from services import quote_stream
+
+
+def _quote(symbol: str, price: float) -> StockQuote:
+    return StockQuote(symbol=symbol, price=price, change=0, change_percent=0, volume=1)
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    mock = AsyncMock()
+    monkeypatch.setattr(quote_stream.stock_svc, "get_quote_batch", mock)
+    monkeypatch.setattr(quote_stream, "POLL_SECONDS", 3600)
+    yield mock
+    quote_stream.reset()
+
+
+async def test_one_poll_covers_the_union_and_fans_out_changes(batch):
+    batch.return_value = ([_quote("AAPL", 1), _quote("MSFT", 2)], {})
+    first = quote_stream.subscribe(["aapl", "msft"])
+    second = quote_stream.subscribe(["AAPL"])
+    await asyncio.sleep(0)
+
+    assert batch.await_args.args[0] == ["AAPL", "MSFT"]
+    assert {q.symbol for q in await first.next_batch(1)} == {"AAPL", "MSFT"}
+    assert [q.symbol for q in await second.next_batch(1)] == ["AAPL"]
+
+    batch.return_value = ([_quote("AAPL", 1), _quote("MSFT", 3)], {})
+    await quote_stream.poll_once()
+
+    assert [q.price for q in await first.next_batch(1)] == [3]
+    assert await second.next_batch(0.01) == []
+    assert quote_stream.stream_stats()["symbols"] == 2
+    await quote_stream.stop()
+
+
+async def test_slow_subscriber_keeps_only_the_latest_quote(batch):
+    subscription = quote_stream.subscribe(["AAPL"])
+    for price in (1, 2, 3):
+        batch.return_value = ([_quote("AAPL", price)], {})
+        await quote_stream.poll_once()
+
+    assert [q.price for q in await subscription.next_batch(1)] == [3]
+    assert subscription.conflated == 2
+    await quote_stream.stop()
+
+
+async def test_subscriber_cap_and_symbol_validation(batch, monkeypatch):
+    batch.return_value = ([], {})
+    monkeypatch.setattr(quote_stream, "MAX_SUBSCRIBERS", 1)
+    subscription = quote_stream.subscribe(["AAPL"])
+
+    with pytest.raises(quote_stream.QuoteStreamFullError):
+        quote_stream.subscribe(["MSFT"])
+    with pytest.raises(ValueError):
+        quote_stream.subscribe([" ", ""])
+    quote_stream.unsubscribe(subscription)
+
+    assert quote_stream.stream_stats()["subscribers"] == 0
+    assert quote_stream.stream_stats()["rejected"] == 1
+    await quote_stream.stop()
+
+
+async def test_stream_endpoint_emits_events_and_unsubscribes_on_disconnect(batch):
+    batch.return_value = ([_quote("AAPL", 5)], {})
+    request = AsyncMock()
+    request.is_disconnected.side_effect = [False, True]
+
+    response = await stock_router.stream_quotes(request, symbols="AAPL")
+    chunks = [chunk async for chunk in response.body_iterator]
+
+    assert response.media_type == "text/event-stream"
+    assert chunks[0].startswith("event: quotes\ndata: ")
+    assert '"symbol": "AAPL"' in chunks[0]
+    assert quote_stream.stream_stats()["subscribers"] == 0
+    await quote_stream.stop()
+
+
+async def test_stream_endpoint_unsubscribes_when_client_leaves_before_the_first_event(batch):
+    batch.return_value = ([], {})
+    response = await stock_router.stream_quotes(AsyncMock(), symbols="AAPL")
+    assert quote_stream.stream_stats()["subscribers"] == 1
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await asyncio.sleep(0)
+
+    await response({"type": "http", "asgi": {"spec_version": "2.0"}}, receive, send)
+
+    assert quote_stream.stream_stats()["subscribers"] == 0
+    await quote_stream.stop()
+
+
+async def test_stream_endpoint_rejects_when_full(batch, monkeypatch):
+    monkeypatch.setattr(quote_stream, "MAX_SUBSCRIBERS", 0)
+
+    response = await stock_router.stream_quotes(AsyncMock(), symbols="AAPL")
+
+    assert response.status_code == 503
@@ -1,3 +1,4 @@
+import time
 from datetime import date, datetime, timezone
 from types import SimpleNamespace
 
@@ -7,6 +8,7 @@ import pytest
 AFTER_BUY_TIME = datetime(2026, 6, 15, 17, 0, tzinfo=timezone.utc)
 
 from models.snaptrade_models import TradeExecution
+from models.stock_models import StockQuote
 from services import market_calendar
 from services import recurring_buy_service as rb
 
@@ -141,7 +143,7 @@ async def test_dollar_mode_buys_whole_shares_and_carries_remainder(monkeypatch):
     async def fake_get_secret(user_id):
         return "secret"
 
-    async def fake_quote(symbol, client=None):
+    async def fake_quote(symbol, client=None, allow_stale=True):
         return SimpleNamespace(price=13.0)
 
     async def fake_place_order(user_id, user_secret, account_id, action, symbol, **kwargs):
@@ -169,7 +171,7 @@ async def test_dollar_mode_accumulates_until_affordable(monkeypatch):
     async def fake_get_secret(user_id):
         return "secret"
 
-    async def fake_quote(symbol, client=None):
+    async def fake_quote(symbol, client=None, allow_stale=True):
         return SimpleNamespace(price=130.0)
 
     async def must_not_place(*args, **kwargs):
@@ -188,6 +190,38 @@ async def test_dollar_mode_accumulates_until_affordable(monkeypatch):
     assert schedules[0].next_run_date == "2026-06-16"  # still advances to the next trading day
 
 
+@pytest.mark.asyncio
+async def test_dollar_mode_never_sizes_orders_from_a_stale_quote(monkeypatch):
+    await rb.create_schedule("u1", "acc", "AAPL", "daily", target_amount=40, start_date=date(2026, 6, 15))
+    # Past its TTL but inside the stale window, which quote pages would still be served.
+    rb.stock_svc._quote_cache["AAPL"] = (
+        time.monotonic() - 1,
+        StockQuote(symbol="AAPL", price=10.0, change=0, change_percent=0, volume=0),
+    )
+
+    async def fake_get_secret(user_id):
+        return "secret"
+
+    async def upstream_down(symbol, client=None):
+        raise rb.stock_svc.StockDataUnavailableError("circuit open")
+
+    async def must_not_place(*args, **kwargs):
+        raise AssertionError("no order should be placed without a live price")
+
+    monkeypatch.setattr(rb.stock_svc, "TWELVE_DATA_API_KEY", "test-key")
+    monkeypatch.setattr(rb.stock_svc, "_fetch_stock_quote", upstream_down)
+    monkeypatch.setattr(rb.user_svc, "get_user_secret", fake_get_secret)
+    monkeypatch.setattr(rb.snaptrade_svc, "place_order", must_not_place)
+
+    summary = await rb.run_due_schedules(now=AFTER_BUY_TIME)
+
+    assert summary == {"due": 1, "placed": 0, "accumulated": 0, "failed": 1}
+    schedules = await rb.list_schedules("u1")
+    assert schedules[0].last_status == "failed: no live price for symbol"
+    assert schedules[0].accumulated_budget == 40.0
+    assert (await rb.stock_svc.get_stock_quote("AAPL")).price == 10.0
+
+
 @pytest.mark.asyncio
 async def test_run_due_schedules_records_failure_without_advancing_status(monkeypatch):
     await rb.create_schedule("u1", "acc", "AAPL", "weekly", units=1, start_date=date(2026, 6, 15))
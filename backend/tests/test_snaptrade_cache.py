@@ -0,0 +1,105 @@
+import time
+
+import pytest
+from pydantic import TypeAdapter
+
+from models.snaptrade_models import Portfolio, RecurringInvestment
+from services import snaptrade_cache as cache
+
+
+def _portfolio(user_id: str, balance: float = 100.0) -> Portfolio:
+    return Portfolio(
+        user_id=user_id,
+        accounts=[],
+        total_balance=balance,
+        total_gain_loss=0,
+        total_gain_loss_percent=0,
+        currency="USD",
+    )
+
+
+def _namespaces(backend):
+    return (
+        cache.CacheNamespace("portfolio", Portfolio, lambda: backend),
+        cache.CacheNamespace("recurring", list[RecurringInvestment], lambda: backend),
+    )
+
+
+def _fresh(seconds: float = 60) -> tuple[float, float]:
+    now = time.time()
+    return now + seconds, now + 2 * seconds
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def make(max_bytes: int = cache.MAX_BYTES):
+        if request.param == "memory":
+            return cache.MemoryBackend(max_bytes=max_bytes)
+        return cache.SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=max_bytes)
+
+    return make
+
+
+def test_least_recently_used_entries_are_evicted_past_the_byte_budget(make_backend):
+    size = len(TypeAdapter(Portfolio).dump_json(_portfolio("u0")))
+    backend = make_backend(max_bytes=3 * size)
+    portfolios, _ = _namespaces(backend)
+    for user_id in ("u1", "u2", "u3"):
+        portfolios.set(user_id, user_id, *_fresh(), _portfolio(user_id))
+        time.sleep(0.001)
+    assert portfolios.get("u1") is not None  # u2 is now the least recently used
+
+    portfolios.set("u4", "u4", *_fresh(), _portfolio("u4"))
+
+    assert portfolios.get("u2") is None
+    assert [portfolios.get(user_id).value.user_id for user_id in ("u1", "u3", "u4")] == ["u1", "u3", "u4"]
+    stats = backend.stats()
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["maxBytes"]
+
+
+def test_invalidate_user_and_sweep(make_backend):
+    backend = make_backend()
+    portfolios, recurring = _namespaces(backend)
+    portfolios.set("u1", "u1", *_fresh(), _portfolio("u1"))
+    recurring.set(["u1", ["a1:VTI"], 365], "u1", *_fresh(), [RecurringInvestment(symbol="VTI", frequency="weekly")])
+    portfolios.set("u2", "u2", time.time() - 2, time.time() - 1, _portfolio("u2"))
+
+    assert recurring.get(["u1", ["a1:VTI"], 365]).value[0].symbol == "VTI"
+    assert backend.invalidate_user("u1") == 2
+    assert portfolios.get("u1") is None
+    assert recurring.get(["u1", ["a1:VTI"], 365]) is None
+
+    assert backend.sweep() == 1
+    assert backend.stats()["entries"] == 0
+
+
+def test_sqlite_backend_shares_entries_between_workers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first, _ = _namespaces(cache.SQLiteBackend(path))
+    second, _ = _namespaces(cache.SQLiteBackend(path))
+
+    first.set("u1", "u1", *_fresh(), _portfolio("u1", balance=250))
+
+    shared = second.get("u1")
+    assert shared.value == _portfolio("u1", balance=250)
+    assert shared.value is not first.get("u1").value
+    second.invalidate_user("u1")
+    assert first.get("u1") is None
+
+
+def test_set_skips_entries_fetched_before_the_user_was_invalidated(make_backend):
+    backend = make_backend()
+    portfolios, recurring = _namespaces(backend)
+    before = portfolios.generation("u1")
+    recurring.invalidate_user("u1")
+
+    assert not portfolios.set("u1", "u1", *_fresh(), _portfolio("u1"), before)
+    assert portfolios.get("u1") is None
+    assert portfolios.set("u1", "u1", *_fresh(), _portfolio("u1"), portfolios.generation("u1"))
+    assert portfolios.set("u2", "u2", *_fresh(), _portfolio("u2"), before)
+
+    everyone = portfolios.generation("u2")
+    recurring.clear()
+    assert not portfolios.set("u2", "u2", *_fresh(), _portfolio("u2"), everyone)
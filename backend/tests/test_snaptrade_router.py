@@ -92,6 +92,22 @@ class TestGetPortfolio:
         assert len(data["accounts"]) == 1
         assert data["accounts"][0]["nickname"] == "Trading"
 
+    def test_account_preferences_leave_the_cached_portfolio_untouched(self):
+        with patch("routers.snaptrade.user_svc.get_user_secret", new=AsyncMock(return_value="secret")):
+            with patch(
+                "routers.snaptrade.snaptrade_svc.get_portfolio",
+                new=AsyncMock(return_value=MOCK_PORTFOLIO_WITH_ACCOUNTS),
+            ):
+                with patch(
+                    "routers.snaptrade.account_pref_svc.get_preferences",
+                    new=AsyncMock(return_value={"acc1": {"nickname": "Trading", "margin_balance": 5}, "acc2": {"hidden": True}}),
+                ):
+                    resp = client.get("/api/snaptrade/portfolio", headers=HEADERS)
+
+        assert resp.json()["data"]["accounts"][0]["nickname"] == "Trading"
+        assert [(account.nickname, account.margin_balance) for account in MOCK_PORTFOLIO_WITH_ACCOUNTS.accounts] == [(None, None)] * 2
+        assert MOCK_PORTFOLIO_WITH_ACCOUNTS.total_balance == 300
+
     def test_snaptrade_service_error_returns_message_and_status(self):
         with patch("routers.snaptrade.user_svc.get_user_secret", new=AsyncMock(return_value="secret")):
             with patch(
@@ -527,3 +543,12 @@ class TestGetBrokerages:
             resp = client.get("/api/snaptrade/brokerages")
         assert resp.status_code == 400
         assert resp.json()["success"] is False
+
+
+class TestGetStats:
+    def test_reports_executor_metrics(self):
+        resp = client.get("/api/snaptrade/stats")
+        assert resp.status_code == 200
+        executor = resp.json()["data"]["executor"]
+        assert executor["maxWorkers"] >= 1
+        assert {"queued", "maxQueued", "waitingOnUser", "waitMs"} <= executor.keys()
@@ -1,6 +1,12 @@
-import pytest
+import asyncio
+import threading
+import time
 from datetime import date, timedelta
 
+import pytest
+from pydantic import ValidationError
+
+from services import snaptrade_cache
 from services import snaptrade_service as svc
 
 
@@ -201,6 +207,7 @@ async def test_get_account_activities_uses_raw_buy_activity_response(monkeypatch
             user_secret=None,
             start_date=None,
             end_date=None,
+            offset=None,
             limit=None,
             type=None,
         ):
@@ -209,7 +216,7 @@ async def test_get_account_activities_uses_raw_buy_activity_response(monkeypatch
             assert user_secret == "s"
             assert start_date == date(2026, 1, 1)
             assert end_date == date(2026, 2, 1)
-            assert limit == 1000
+            assert (offset, limit) == (0, 1000)
             assert type == "BUY"
             return FakeResponse({"data": [{"type": "BUY", "amount": -25}]})
 
@@ -226,6 +233,33 @@ async def test_get_account_activities_uses_raw_buy_activity_response(monkeypatch
     assert activities == [{"type": "BUY", "amount": -25}]
 
 
+@pytest.mark.asyncio
+async def test_get_account_activities_stops_on_repeated_pages_and_at_the_page_cap(monkeypatch):
+    offsets: list[int] = []
+    ignores_offset = True
+
+    class AccountInformation:
+        def get_account_activities(self, offset=None, limit=None, **kwargs):
+            offsets.append(offset)
+            start = 0 if ignores_offset else offset
+            # Always a full page and no pagination block.
+            return {"data": [{"id": str(index)} for index in range(start, start + limit)]}
+
+    monkeypatch.setattr(svc, "ACTIVITY_PAGE_SIZE", 2)
+    monkeypatch.setattr(svc, "MAX_ACTIVITY_PAGES", 3)
+    monkeypatch.setattr(svc, "_sdk_client", lambda: type("Client", (), {"account_information": AccountInformation()})())
+
+    repeated = await svc.get_account_activities("u", "s", "a1")
+    repeated_offsets, offsets[:] = list(offsets), []
+    ignores_offset = False
+    capped = await svc.get_account_activities("u", "s", "a1")
+
+    assert [activity["id"] for activity in repeated] == ["0", "1"]
+    assert repeated_offsets == [0, 2]
+    assert [activity["id"] for activity in capped] == ["0", "1", "2", "3", "4", "5"]
+    assert offsets == [0, 2, 4]
+
+
 def test_infer_recurring_from_weekly_buy_activities():
     account = svc.Account(id="a1", name="Robinhood Individual", account_number="", type="", brokerage_id="")
     buys = [
@@ -472,8 +506,41 @@ async def test_get_portfolio_sums_accounts_and_skips_failed_holdings(monkeypatch
 
     assert portfolio.total_balance == 400
     assert portfolio.total_gain_loss == 50
-    assert accounts[0].holdings[0].symbol == "AAPL"
-    assert accounts[1].holdings == []
+    assert portfolio.accounts[0].holdings[0].symbol == "AAPL"
+    assert portfolio.accounts[1].holdings == ()
+
+
+@pytest.mark.asyncio
+async def test_cached_snapshots_reject_collection_mutation(monkeypatch):
+    accounts = [svc.Account(id="a1", name="One", account_number="", type="", brokerage_id="", balance=150)]
+
+    async def fake_accounts(user_id, user_secret):
+        return accounts
+
+    async def fake_holdings(user_id, user_secret, account_id):
+        return [svc.Holding(symbol="AAPL", quantity=1, total_value=150)]
+
+    async def fake_activities(user_id, user_secret, account_id, start_date=None, end_date=None, activity_type="BUY"):
+        return [{"symbol": "AAPL", "type": "DIVIDEND", "amount": "1", "trade_date": date.today().isoformat()}]
+
+    monkeypatch.setattr(svc, "get_accounts", fake_accounts)
+    monkeypatch.setattr(svc, "get_account_holdings", fake_holdings)
+    monkeypatch.setattr(svc, "get_account_activities", fake_activities)
+
+    portfolio = await svc.get_portfolio("u", "s")
+    with pytest.raises(AttributeError):
+        portfolio.accounts.append(accounts[0])
+    with pytest.raises(AttributeError):
+        portfolio.accounts[0].holdings.sort(key=lambda holding: holding.symbol)
+
+    summary = await svc.get_dividend_income("u", "s", accounts=list(portfolio.accounts))
+    with pytest.raises(AttributeError):
+        summary.symbols.clear()
+
+    again = await svc.get_portfolio("u", "s")
+    assert again is portfolio
+    assert [len(account.holdings) for account in again.accounts] == [1]
+    assert len((await svc.get_dividend_income("u", "s", accounts=list(again.accounts))).symbols) == 1
 
 
 @pytest.mark.asyncio
@@ -519,6 +586,117 @@ async def test_get_portfolio_force_refresh_bypasses_cache(monkeypatch):
     assert calls["accounts"] == 2
 
 
+def _patch_slow_portfolio(monkeypatch, release: asyncio.Event) -> dict[str, int]:
+    calls = {"accounts": 0}
+
+    async def fake_accounts(user_id, user_secret):
+        calls["accounts"] += 1
+        number = calls["accounts"]
+        await release.wait()
+        return [svc.Account(id=f"a{number}", name="One", account_number="", type="", brokerage_id="", balance=100)]
+
+    async def fake_holdings(user_id, user_secret, account_id):
+        return []
+
+    monkeypatch.setattr(svc, "get_accounts", fake_accounts)
+    monkeypatch.setattr(svc, "get_account_holdings", fake_holdings)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_get_portfolio_concurrent_misses_share_one_fetch(monkeypatch):
+    release = asyncio.Event()
+    calls = _patch_slow_portfolio(monkeypatch, release)
+
+    waiters = [asyncio.create_task(svc.get_portfolio("u", "s")) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    portfolios = await asyncio.gather(*waiters)
+
+    assert calls["accounts"] == 1
+    assert [portfolio.accounts[0].id for portfolio in portfolios] == ["a1"] * 5
+    # Callers share one frozen snapshot rather than each getting a copy.
+    assert all(portfolio is portfolios[0] for portfolio in portfolios)
+    with pytest.raises(ValidationError):
+        portfolios[0].accounts[0].name = "Changed"
+    assert svc.cache_stats()["portfolio"]["coalesced"] >= 4
+
+
+@pytest.mark.asyncio
+async def test_get_portfolio_serves_stale_while_refreshing_until_hard_expiry(monkeypatch):
+    release = asyncio.Event()
+    release.set()
+    calls = _patch_slow_portfolio(monkeypatch, release)
+    await svc.get_portfolio("u", "s")
+    svc._portfolio_cache.get("u").fresh_until = time.time() - 1
+    release.clear()
+
+    stale = await svc.get_portfolio("u", "s")
+    again = await svc.get_portfolio("u", "s")
+
+    await asyncio.sleep(0)
+    assert (stale.accounts[0].id, again.accounts[0].id) == ("a1", "a1")
+    assert calls["accounts"] == 2  # one background refresh, not one per request
+    release.set()
+    await asyncio.sleep(0.01)
+    assert (await svc.get_portfolio("u", "s")).accounts[0].id == "a2"
+
+    entry = svc._portfolio_cache.get("u")
+    entry.fresh_until = entry.expires_at = time.time() - 1
+    assert (await svc.get_portfolio("u", "s")).accounts[0].id == "a3"
+
+
+@pytest.mark.asyncio
+async def test_clear_user_cache_discards_a_fetch_already_in_flight(monkeypatch):
+    release = asyncio.Event()
+    calls = _patch_slow_portfolio(monkeypatch, release)
+
+    before = asyncio.create_task(svc.get_portfolio("u", "s"))
+    await asyncio.sleep(0)
+    svc.clear_user_cache("u")
+    after = asyncio.create_task(svc.get_portfolio("u", "s"))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await before).accounts[0].id == "a1"
+    assert (await after).accounts[0].id == "a2"
+    assert calls["accounts"] == 2
+    assert svc._portfolio_cache.get("u").value.accounts[0].id == "a2"
+
+
+@pytest.mark.asyncio
+async def test_clearing_the_cache_in_another_worker_discards_a_fetch_in_flight(monkeypatch, tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(svc, "_cache_backend", snaptrade_cache.SQLiteBackend(path))
+    other_worker = snaptrade_cache.SQLiteBackend(path)
+    release = asyncio.Event()
+    calls = _patch_slow_portfolio(monkeypatch, release)
+
+    fetch = asyncio.create_task(svc.get_portfolio("u", "s"))
+    while not calls["accounts"]:
+        await asyncio.sleep(0.01)
+    other_worker.invalidate_user("u")
+    release.set()
+
+    assert (await fetch).accounts[0].id == "a1"
+    assert svc._portfolio_cache.get("u") is None
+    assert (await svc.get_portfolio("u", "s")).accounts[0].id == "a2"
+    assert svc._portfolio_cache.get("u").value.accounts[0].id == "a2"
+
+
+def test_portfolio_view_recomputes_totals_without_copying_holdings():
+    holding = svc.Holding(symbol="AAPL", quantity=1, total_value=150, gain_loss=50)
+    kept = svc.Account(id="a1", name="One", balance=300, currency="CAD", holdings=[holding])
+    portfolio = svc.Portfolio(user_id="u", accounts=[kept, svc.Account(id="a2", balance=100)], total_balance=400)
+
+    view = svc.portfolio_view(portfolio, [kept.model_copy(update={"nickname": "Main"})])
+
+    assert (view.total_balance, view.total_gain_loss, view.currency) == (300, 50, "CAD")
+    assert view.accounts[0].holdings[0] is holding
+    assert portfolio.total_balance == 400
+    assert len(portfolio.accounts) == 2
+
+
 @pytest.mark.asyncio
 async def test_get_recurring_investments_uses_cache(monkeypatch):
     calls = {"activities": 0}
@@ -533,7 +711,7 @@ async def test_get_recurring_investments_uses_cache(monkeypatch):
         )
     ]
 
-    async def fake_activities(user_id, user_secret, account_id, start_date=None, end_date=None):
+    async def fake_activities(user_id, user_secret, account_id, start_date=None, end_date=None, activity_type="BUY"):
         calls["activities"] += 1
         return [
             {"symbol": {"symbol": "META"}, "type": "BUY", "amount": -25, "trade_date": "2026-01-05T00:00:00Z"},
@@ -564,7 +742,7 @@ async def test_get_recurring_investments_requires_current_holding(monkeypatch):
         )
     ]
 
-    async def fake_activities(user_id, user_secret, account_id, start_date=None, end_date=None):
+    async def fake_activities(user_id, user_secret, account_id, start_date=None, end_date=None, activity_type="BUY"):
         return [
             {"symbol": {"symbol": "META"}, "type": "BUY", "amount": -25, "trade_date": "2026-01-05T00:00:00Z"},
             {"symbol": {"symbol": "META"}, "type": "BUY", "amount": -25, "trade_date": "2026-01-12T00:00:00Z"},
@@ -763,8 +941,8 @@ async def test_get_dividend_income_returns_empty_without_current_holdings(monkey
 
     summary = await svc.get_dividend_income("u", "s", accounts=accounts)
 
-    assert summary.totals == []
-    assert summary.symbols == []
+    assert summary.totals == ()
+    assert summary.symbols == ()
     assert calls["activities"] == 0
 
 
@@ -907,3 +1085,71 @@ async def test_cancel_order_clears_cache(monkeypatch):
 
     assert execution.status == "CANCELLED"
     assert cleared == ["u"]
+
+
+def test_sdk_client_is_built_once_with_a_pool_per_worker(monkeypatch):
+    monkeypatch.setattr(svc, "SNAPTRADE_CLIENT_ID", "client-id")
+    monkeypatch.setattr(svc, "SNAPTRADE_CONSUMER_KEY", "consumer-key")
+    monkeypatch.setattr(svc, "_client", None)
+
+    client = svc._sdk_client()
+
+    assert svc._sdk_client() is client
+    assert client.trading.api_client is client.account_information.api_client
+    assert client.trading.api_client.configuration.connection_pool_maxsize == svc.MAX_WORKERS
+
+
+@pytest.mark.asyncio
+async def test_sync_calls_are_capped_per_user_and_reported(monkeypatch):
+    monkeypatch.setattr(svc, "PER_USER_CONCURRENCY", 2)
+    lock = threading.Lock()
+    running = {"user-a": 0, "user-b": 0}
+    peak = {"user-a": 0, "user-b": 0}
+    finished: list[str] = []
+
+    def operation(user_id):
+        def run():
+            with lock:
+                running[user_id] += 1
+                peak[user_id] = max(peak[user_id], running[user_id])
+            time.sleep(0.05)
+            with lock:
+                running[user_id] -= 1
+                finished.append(user_id)
+            return user_id
+
+        return run
+
+    before = svc.executor_stats()
+    heavy = [asyncio.create_task(svc._call_snaptrade_sync(operation("user-a"), user_id="user-a")) for _ in range(6)]
+    await asyncio.sleep(0)
+    assert svc.executor_stats()["waitingOnUser"] == 4
+
+    assert await svc._call_snaptrade_sync(operation("user-b"), user_id="user-b") == "user-b"
+    # The other user's call did not queue behind the large account's backlog.
+    assert finished.index("user-b") < 5
+    assert await asyncio.gather(*heavy) == ["user-a"] * 6
+
+    after = svc.executor_stats()
+    assert peak == {"user-a": 2, "user-b": 1}
+    assert after["calls"] - before["calls"] == 7
+    assert (after["queued"], after["active"], after["waitingOnUser"], after["activeUsers"]) == (0, 0, 0, 0)
+    assert after["waitMs"]["max"] >= 50
+    assert svc._user_slots == {}
+
+
+@pytest.mark.asyncio
+async def test_sync_calls_map_api_errors_from_the_worker_pool():
+    class Failed(svc.snaptrade_exceptions.ApiException):
+        def __init__(self):
+            super().__init__(status=409)
+
+    def operation():
+        raise Failed()
+
+    with pytest.raises(svc.SnapTradeServiceError) as exc_info:
+        await svc._call_snaptrade_sync(operation, user_id="user-1")
+
+    assert "409" in str(exc_info.value)
+    assert isinstance(exc_info.value.__cause__, Failed)
+    assert svc.executor_stats()["active"] == 0
@@ -1,3 +1,6 @@
+import asyncio
+import json
+
 import pytest
 
 from models.stock_models import StockQuote
@@ -7,12 +10,17 @@ from services import stock_data_service as svc
 @pytest.fixture(autouse=True)
 def twelve_data_key(monkeypatch):
     monkeypatch.setattr(svc, "TWELVE_DATA_API_KEY", "test-key")
+    monkeypatch.setattr(svc, "_http_client", None)
+    # Pin cache expiry to the plain TTLs so results don't depend on when the suite runs.
+    monkeypatch.setattr(svc.market_calendar, "cache_ttl", lambda seconds, now=None: seconds)
 
 
 class FakeResponse:
     def __init__(self, payload, is_success=True):
         self._payload = payload
         self.is_success = is_success
+        self.status_code = 200 if is_success else 500
+        self.content = json.dumps(payload).encode()
 
     def json(self):
         return self._payload
@@ -24,9 +32,12 @@ class FakeResponse:
 class FakeAsyncClient:
     calls = []
     responses = []
+    instances = 0
+    closed = 0
 
     def __init__(self, *args, **kwargs):
-        pass
+        self.__class__.instances += 1
+        self.kwargs = kwargs
 
     async def __aenter__(self):
         return self
@@ -34,8 +45,14 @@ class FakeAsyncClient:
     async def __aexit__(self, exc_type, exc, tb):
         return False
 
-    async def get(self, url):
+    async def aclose(self):
+        self.__class__.closed += 1
+
+    async def get(self, url, **kwargs):
         self.__class__.calls.append(url)
+        trace = kwargs.get("extensions", {}).get("trace")
+        if trace and self.__class__.instances and len(self.__class__.calls) == 1:
+            await trace("connection.connect_tcp.complete", {})
         return self.__class__.responses.pop(0)
 
 
@@ -130,16 +147,62 @@ async def test_get_historical_data_filters_and_sorts(monkeypatch):
 
 @pytest.mark.asyncio
 async def test_get_multiple_stock_quotes_skips_failures(monkeypatch):
-    async def fake_quote(symbol, client):
-        if symbol == "BAD":
-            raise RuntimeError("boom")
-        return StockQuote(symbol=symbol, price=1, change=0, change_percent=0)
-
-    monkeypatch.setattr(svc, "get_stock_quote", fake_quote)
+    FakeAsyncClient.calls = []
+    FakeAsyncClient.responses = [
+        FakeResponse(
+            {
+                "AAPL": {"symbol": "AAPL", "close": "1"},
+                "BAD": {"code": 404, "status": "error", "message": "symbol not found"},
+            }
+        )
+    ]
+    monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
 
     quotes = await svc.get_multiple_stock_quotes(["aapl", "AAPL", "bad"])
 
     assert [quote.symbol for quote in quotes] == ["AAPL"]
+    assert len(FakeAsyncClient.calls) == 1
+    assert "symbol=AAPL%2CBAD" in FakeAsyncClient.calls[0]
+
+
+@pytest.mark.asyncio
+async def test_get_quote_batch_splits_batches_and_isolates_failures(monkeypatch):
+    class BatchClient:
+        calls = []
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        async def get(self, url, **kwargs):
+            symbols = url.split("symbol=", 1)[1].split("&", 1)[0].split("%2C")
+            self.__class__.calls.append(symbols)
+            if "C" in symbols:
+                raise RuntimeError("upstream 502")
+            if len(symbols) == 1:
+                return FakeResponse({"symbol": symbols[0], "close": "5"})
+            return FakeResponse({symbol: {"symbol": symbol, "close": "5"} for symbol in symbols})
+
+    monkeypatch.setattr(svc.httpx, "AsyncClient", BatchClient)
+    monkeypatch.setattr(svc, "QUOTE_BATCH_SIZE", 2)
+    await svc.get_stock_quote("E", CountingClient())
+
+    quotes, errors = await svc.get_quote_batch(["a", "b", "c", "d", "e", "f"])
+
+    assert sorted(BatchClient.calls) == [["A", "B"], ["C", "D"], ["F"]]
+    assert [quote.symbol for quote in quotes] == ["A", "B", "E", "F"]
+    assert errors == {"C": "upstream 502", "D": "upstream 502"}
+
+
+@pytest.mark.asyncio
+async def test_get_quote_batch_applies_top_level_error_to_every_symbol(monkeypatch):
+    FakeAsyncClient.calls = []
+    FakeAsyncClient.responses = [FakeResponse({"code": 429, "status": "error", "message": "out of credits"})]
+    monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
+
+    quotes, errors = await svc.get_quote_batch(["AAPL", "MSFT"])
+
+    assert quotes == []
+    assert errors == {"AAPL": "out of credits", "MSFT": "out of credits"}
 
 
 @pytest.mark.asyncio
@@ -148,9 +211,7 @@ async def test_get_stock_details_uses_profile_and_historical(monkeypatch):
         return StockQuote(symbol=symbol, price=10, change=1, change_percent=10, volume=100)
 
     async def fake_history(symbol, interval, output_size):
-        return [
-            svc.StockHistoricalData(date=svc.datetime(2024, 1, 1), open=1, high=12, low=8, close=10, volume=1)
-        ]
+        return svc.PriceSeries.from_columns(["2024-01-01"], [1], [12], [8], [10], [1])
 
     FakeAsyncClient.responses = [
         FakeResponse(
@@ -163,7 +224,7 @@ async def test_get_stock_details_uses_profile_and_historical(monkeypatch):
         )
     ]
     monkeypatch.setattr(svc, "get_stock_quote", fake_quote)
-    monkeypatch.setattr(svc, "get_historical_data", fake_history)
+    monkeypatch.setattr(svc, "get_price_series", fake_history)
     monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
 
     details = await svc.get_stock_details("AAPL")
@@ -179,9 +240,7 @@ async def test_get_stock_details_falls_back_to_search_name_for_duplicate_symbol(
         return StockQuote(symbol=symbol, price=10, change=1, change_percent=10, volume=100)
 
     async def fake_history(symbol, interval, output_size):
-        return [
-            svc.StockHistoricalData(date=svc.datetime(2024, 1, 1), open=1, high=12, low=8, close=10, volume=1)
-        ]
+        return svc.PriceSeries.from_columns(["2024-01-01"], [1], [12], [8], [10], [1])
 
     FakeAsyncClient.responses = [
         FakeResponse({"name": "IBIT", "exchange": ""}),
@@ -199,10 +258,522 @@ async def test_get_stock_details_falls_back_to_search_name_for_duplicate_symbol(
         ),
     ]
     monkeypatch.setattr(svc, "get_stock_quote", fake_quote)
-    monkeypatch.setattr(svc, "get_historical_data", fake_history)
+    monkeypatch.setattr(svc, "get_price_series", fake_history)
     monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
 
     details = await svc.get_stock_details("IBIT")
 
     assert details.name == "iShares Bitcoin Trust ETF"
     assert details.exchange == "NASDAQ"
+
+
+@pytest.mark.asyncio
+async def test_shared_client_is_pooled_across_calls_and_closed(monkeypatch):
+    FakeAsyncClient.calls = []
+    FakeAsyncClient.instances = 0
+    FakeAsyncClient.closed = 0
+    FakeAsyncClient.responses = [
+        FakeResponse({"symbol": "AAPL", "close": "10"}),
+        FakeResponse({"symbol": "MSFT", "close": "20"}),
+    ]
+    monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr(svc, "_client_stats", {"requests": 0, "connections_opened": 0})
+    monkeypatch.setattr(svc, "_latency_samples", {})
+
+    await svc.start_client()
+    await svc.get_stock_quote("AAPL")
+    await svc.get_stock_quote("MSFT")
+
+    assert FakeAsyncClient.instances == 1
+    assert svc._http_client.kwargs["http2"] is svc.TWELVE_DATA_HTTP2
+    stats = svc.client_stats()
+    assert stats["requests"] == 2
+    assert stats["connectionsOpened"] == 1
+    assert stats["connectionsReused"] == 1
+    assert "quote" in stats["p50LatencyMs"]
+
+    await svc.close_client()
+
+    assert FakeAsyncClient.closed == 1
+    assert svc._http_client is None
+
+
+class CountingClient:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    async def get(self, url):
+        self.calls.append(url)
+        await asyncio.sleep(self.delay)
+        symbol = url.split("symbol=", 1)[1].split("&", 1)[0]
+        return FakeResponse({"symbol": symbol, "close": "10"})
+
+
+@pytest.mark.asyncio
+async def test_get_stock_quote_serves_repeat_reads_from_cache():
+    client = CountingClient()
+
+    first = await svc.get_stock_quote("aapl", client)
+    second = await svc.get_stock_quote("AAPL", client)
+
+    assert len(client.calls) == 1
+    assert first == second
+    assert second is not first
+    assert svc.quote_cache_stats() == {"hits": 1, "misses": 1, "coalesced": 0, "stale": 0, "size": 1}
+
+
+@pytest.mark.asyncio
+async def test_get_stock_quote_coalesces_concurrent_misses():
+    client = CountingClient(delay=0.01)
+
+    quotes = await asyncio.gather(*(svc.get_stock_quote("MSFT", client) for _ in range(5)))
+
+    assert len(client.calls) == 1
+    assert {quote.symbol for quote in quotes} == {"MSFT"}
+    assert svc.quote_cache_stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_quote_cache_expires_and_evicts_least_recent(monkeypatch):
+    client = CountingClient()
+    monkeypatch.setattr(svc, "QUOTE_CACHE_MAX_SIZE", 2)
+
+    await svc.get_stock_quote("A", client)
+    await svc.get_stock_quote("B", client)
+    await svc.get_stock_quote("A", client)
+    await svc.get_stock_quote("C", client)
+
+    assert list(svc._quote_cache) == ["A", "C"]
+
+    monkeypatch.setattr(svc, "QUOTE_CACHE_TTL_SECONDS", 0)
+    await svc.get_stock_quote("D", client)
+    await svc.get_stock_quote("D", client)
+
+    assert client.calls[-2:] == [client.calls[-1]] * 2
+
+
+class SeriesClient:
+    def __init__(self, payloads):
+        self.calls = []
+        self.payloads = payloads
+
+    async def get(self, url, **kwargs):
+        self.calls.append(url)
+        return FakeResponse(self.payloads.pop(0))
+
+
+def _values(*days):
+    return {
+        "values": [
+            {"datetime": day, "open": "1", "high": "2", "low": "1", "close": "1.5", "volume": "10"}
+            for day in reversed(days)
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_historical_data_reads_store_and_only_fetches_newer_bars(monkeypatch):
+    client = SeriesClient(
+        [
+            _values("2026-06-10", "2026-06-11", "2026-06-12"),
+            _values("2026-06-12", "2026-06-15"),
+        ]
+    )
+    monkeypatch.setattr(svc, "_http_client", client)
+
+    first = await svc.get_historical_data("aapl", "1day", 3)
+    cached = await svc.get_historical_data("AAPL", "1day", 3)
+
+    assert [bar.date.day for bar in first] == [10, 11, 12]
+    assert cached == first
+    assert len(client.calls) == 1
+
+    monkeypatch.setattr(svc, "HISTORY_REFRESH_SECONDS", -1)
+    refreshed = await svc.get_historical_data("AAPL", "1day", 3)
+
+    assert "start_date=2026-06-12+00%3A00%3A00" in client.calls[1]
+    assert [bar.date.day for bar in refreshed] == [11, 12, 15]
+
+
+@pytest.mark.asyncio
+async def test_get_historical_data_backfills_older_bars_once(monkeypatch):
+    client = SeriesClient(
+        [
+            _values("2026-06-11", "2026-06-12"),
+            _values("2026-06-10", "2026-06-11", "2026-06-12"),
+            _values("2026-06-10"),
+        ]
+    )
+    monkeypatch.setattr(svc, "_http_client", client)
+
+    await svc.get_historical_data("AAPL", "1day", 2)
+    longer = await svc.get_historical_data("AAPL", "1day", 5)
+    again = await svc.get_historical_data("AAPL", "1day", 5)
+
+    assert "end_date=2026-06-11" in client.calls[1]
+    assert "outputsize=4" in client.calls[1]
+    assert [bar.date.day for bar in longer] == [10, 11, 12]
+    # Upstream had nothing older than 06-10, so the next load stays local.
+    assert again == longer
+    assert len(client.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_historical_data_fills_gaps_between_daily_bars(monkeypatch):
+    client = SeriesClient(
+        [
+            _values("2026-06-12", "2026-06-17"),
+            _values("2026-06-12"),
+            _values("2026-06-15", "2026-06-16"),
+        ]
+    )
+    monkeypatch.setattr(svc, "_http_client", client)
+
+    await svc.get_historical_data("AAPL", "1day", 2)
+    filled = await svc.get_historical_data("AAPL", "1day", 4)
+
+    assert "start_date=2026-06-15" in client.calls[2]
+    assert "end_date=2026-06-16+23%3A59%3A59" in client.calls[2]
+    assert [bar.date.day for bar in filled] == [12, 15, 16, 17]
+
+
+@pytest.mark.asyncio
+async def test_weekly_bars_are_resampled_from_daily_bars_and_cached(monkeypatch):
+    client = SeriesClient(
+        [
+            _values("2026-06-04", "2026-06-05", "2026-06-08", "2026-06-09", "2026-06-10", "2026-06-11", "2026-06-12"),
+            _values("2026-06-12", "2026-06-15"),
+        ]
+    )
+    monkeypatch.setattr(svc, "_http_client", client)
+
+    weekly = await svc.get_historical_data("AAPL", "1week", 2)
+    again = await svc.get_historical_data("AAPL", "1week", 2)
+
+    assert len(client.calls) == 1
+    assert "interval=1day" in client.calls[0]
+    assert "outputsize=15" in client.calls[0]
+    assert [(bar.date.day, bar.volume) for bar in weekly] == [(1, 20), (8, 50)]
+    assert again == weekly
+    assert len(svc._resample_cache) == 1
+
+    monkeypatch.setattr(svc, "HISTORY_REFRESH_SECONDS", -1)
+    refreshed = await svc.get_historical_data("AAPL", "1week", 2)
+
+    assert "interval=1day" in client.calls[1]
+    assert [(bar.date.day, bar.volume) for bar in refreshed] == [(8, 50), (15, 10)]
+    assert len(svc._resample_cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_resampled_bars_follow_intraday_updates_to_the_last_daily_bar(monkeypatch):
+    updated = _values("2026-06-12")
+    updated["values"][0].update(high="3", close="2.5", volume="40")
+    client = SeriesClient([_values("2026-06-10", "2026-06-11", "2026-06-12"), updated])
+    monkeypatch.setattr(svc, "_http_client", client)
+
+    weekly = await svc.get_historical_data("AAPL", "1week", 1)
+    monkeypatch.setattr(svc, "HISTORY_REFRESH_SECONDS", -1)
+    refreshed = await svc.get_historical_data("AAPL", "1week", 1)
+    monkeypatch.setattr(svc, "HISTORY_REFRESH_SECONDS", 3600)
+    daily = await svc.get_historical_data("AAPL", "1day", 3)
+
+    assert [(bar.high, bar.close, bar.volume) for bar in weekly] == [(2, 1.5, 30)]
+    assert [(bar.high, bar.close, bar.volume) for bar in refreshed] == [(3, 2.5, 60)]
+    assert refreshed[0].close == daily[-1].close
+
+
+@pytest.mark.asyncio
+async def test_full_daily_window_drops_the_partial_oldest_period(monkeypatch):
+    # Six daily bars requested and six returned, so the week of 06-01 is only partly covered.
+    client = SeriesClient([_values("2026-06-05", "2026-06-08", "2026-06-09", "2026-06-10", "2026-06-11", "2026-06-12")])
+    monkeypatch.setattr(svc, "_http_client", client)
+    monkeypatch.setitem(svc._DAILY_BARS_PER_PERIOD, "1week", 2)
+
+    weekly = await svc.get_historical_data("AAPL", "1week", 2)
+
+    assert "outputsize=6" in client.calls[0]
+    assert [(bar.date.day, bar.volume) for bar in weekly] == [(8, 50)]
+
+
+@pytest.mark.asyncio
+async def test_get_historical_data_serves_stored_bars_while_breaker_is_open(monkeypatch):
+    client = SeriesClient([_values("2026-06-11", "2026-06-12")])
+    monkeypatch.setattr(svc, "_http_client", client)
+    stored = await svc.get_historical_data("AAPL", "1day", 2)
+
+    svc.reset_circuit_breaker(min_calls=1, open_seconds=60)
+    svc._circuit_breaker.record(False, 0.0)
+    monkeypatch.setattr(svc, "HISTORY_REFRESH_SECONDS", -1)
+
+    assert await svc.get_historical_data("AAPL", "1day", 2) == stored
+    assert len(client.calls) == 1
+    with pytest.raises(svc.StockDataUnavailableError):
+        await svc.get_historical_data("MSFT", "1day", 2)
+
+
+def test_output_size_for_period():
+    assert svc.output_size_for_period("1day", "5y") == 1260
+    assert svc.output_size_for_period("1week", "1Y") == 52
+    with pytest.raises(ValueError):
+        svc.output_size_for_period("1day", "10y")
+
+
+@pytest.mark.asyncio
+async def test_credit_limiter_serves_interactive_lane_before_background():
+    limiter = svc.CreditLimiter(credits_per_minute=600, max_wait=5)
+    await limiter.acquire(600)
+    order: list[str] = []
+
+    async def call(name: str, priority: int) -> None:
+        await limiter.acquire(1, priority)
+        order.append(name)
+
+    background = asyncio.create_task(call("background", svc.PRIORITY_BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(call("interactive", svc.PRIORITY_INTERACTIVE))
+    await asyncio.sleep(0)
+    assert limiter.stats()["queued"] == {"interactive": 1, "background": 1}
+
+    await asyncio.gather(background, interactive)
+
+    assert order == ["interactive", "background"]
+    lanes = limiter.stats()["lanes"]
+    assert lanes["interactive"]["waited"] == 1
+    assert lanes["background"]["credits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_credit_limiter_raises_after_max_wait():
+    limiter = svc.CreditLimiter(credits_per_minute=1, max_wait=0.01)
+    await limiter.acquire(1)
+
+    with pytest.raises(svc.StockDataRateLimitError):
+        await limiter.acquire(1, svc.PRIORITY_BACKGROUND)
+
+    assert limiter.stats()["lanes"]["background"]["rejected"] == 1
+    assert limiter.stats()["queued"] == {"interactive": 0, "background": 0}
+
+
+@pytest.mark.asyncio
+async def test_credit_limiter_rejects_calls_costing_more_than_a_minute_of_credits():
+    limiter = svc.CreditLimiter(credits_per_minute=8, max_wait=5)
+
+    with pytest.raises(svc.StockDataRateLimitError, match="costs 10 credits"):
+        await limiter.acquire(10)
+    assert not limiter.try_acquire(10)
+
+    # The bucket is untouched, so a cheap call right after isn't starved.
+    await asyncio.wait_for(limiter.acquire(8), 0.1)
+    assert limiter.stats()["lanes"]["interactive"]["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_credit_limiter_without_a_plan_grants_every_call_at_once():
+    limiter = svc.CreditLimiter(credits_per_minute=0, max_wait=0.01)
+
+    for _ in range(50):
+        await asyncio.wait_for(limiter.acquire(10), 0.1)
+    assert limiter.try_acquire(10)
+
+    stats = limiter.stats()
+    assert (stats["creditsPerMinute"], stats["availableCredits"]) == (None, None)
+    assert stats["lanes"]["interactive"]["granted"] == 51
+    svc.reset_rate_limiter(credits_per_minute=0)
+    assert svc.quote_batch_size() == svc.QUOTE_BATCH_SIZE
+
+
+@pytest.mark.asyncio
+async def test_small_plan_fails_profiles_and_shrinks_quote_batches(monkeypatch):
+    svc.reset_rate_limiter(credits_per_minute=8)
+    FakeAsyncClient.calls = []
+    monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
+    batches: list[list[str]] = []
+
+    async def fake_batch(batch, semaphore):
+        batches.append(batch)
+        return {}, {}
+
+    async def fake_quote(symbol):
+        return StockQuote(symbol=symbol, price=10, change=1, change_percent=10, volume=100)
+
+    async def fake_range(symbol):
+        return 15.0, 5.0
+
+    monkeypatch.setattr(svc, "_fetch_quote_batch", fake_batch)
+    monkeypatch.setattr(svc, "get_stock_quote", fake_quote)
+    monkeypatch.setattr(svc, "_get_52_week_range", fake_range)
+
+    with pytest.raises(svc.StockDataConfigurationError, match="below the 10 credits one /profile call costs"):
+        await svc._get_profile("AAPL")
+    with pytest.raises(svc.StockDataConfigurationError):
+        await svc.get_stock_details("AAPL")
+    await svc.get_quote_batch([f"S{index}" for index in range(10)])
+
+    assert FakeAsyncClient.calls == []
+    assert [len(batch) for batch in batches] == [8, 2]
+
+
+@pytest.mark.asyncio
+async def test_get_charges_endpoint_credits_in_the_callers_lane(monkeypatch):
+    charged: list[tuple[float, int]] = []
+
+    async def fake_acquire(cost, priority=svc.PRIORITY_INTERACTIVE):
+        charged.append((cost, priority))
+
+    monkeypatch.setattr(svc._rate_limiter, "acquire", fake_acquire)
+    FakeAsyncClient.responses = [FakeResponse({}), FakeResponse({}), FakeResponse({})]
+    monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
+
+    await svc._get("https://example.test/profile", "profile")
+    with svc.background_priority():
+        await svc._get("https://example.test/quote", "quote", symbols=3)
+    await svc._get("https://example.test/time_series", "time_series")
+
+    assert charged == [
+        (10, svc.PRIORITY_INTERACTIVE),
+        (3, svc.PRIORITY_BACKGROUND),
+        (1, svc.PRIORITY_INTERACTIVE),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_stocks_answers_from_local_index_and_falls_back_upstream(monkeypatch):
+    monkeypatch.setattr(
+        svc,
+        "_symbol_index",
+        svc.SymbolIndex([svc.SymbolEntry("AAPL", "Apple Inc.", "NASDAQ", "Common Stock")]),
+    )
+    FakeAsyncClient.calls = []
+    FakeAsyncClient.responses = [
+        FakeResponse({"data": [{"symbol": "ZZZ", "instrument_name": "Sleep Co", "exchange": "NYSE"}]})
+    ]
+    monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
+
+    local = await svc.search_stocks("app")
+    upstream = await svc.search_stocks("zzz")
+
+    assert [result.symbol for result in local] == ["AAPL"]
+    assert [result.symbol for result in upstream] == ["ZZZ"]
+    assert len(FakeAsyncClient.calls) == 1
+    assert "symbol_search" in FakeAsyncClient.calls[0]
+
+
+@pytest.mark.asyncio
+async def test_refresh_symbol_index_builds_persists_and_skips_when_fresh(monkeypatch, tmp_path):
+    path = tmp_path / "symbols.json.gz"
+    monkeypatch.setattr(svc, "SYMBOL_INDEX_PATH", str(path))
+    FakeAsyncClient.calls = []
+    FakeAsyncClient.responses = [
+        FakeResponse({"data": [{"symbol": "AAPL", "name": "Apple Inc", "exchange": "NASDAQ", "type": "Common Stock"}]}),
+        FakeResponse({"data": [{"symbol": "SPY", "name": "SPDR S&P 500 ETF Trust", "exchange": "NYSE ARCA"}]}),
+    ]
+    monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
+
+    assert await svc.refresh_symbol_index() is True
+    assert await svc.refresh_symbol_index() is False
+    assert ["/stocks?" in FakeAsyncClient.calls[0], "/etf?" in FakeAsyncClient.calls[1]] == [True, True]
+
+    monkeypatch.setattr(svc, "_symbol_index", None)
+    assert svc.load_symbol_index() is True
+    results = await svc.search_stocks("spdr")
+    assert (results[0].symbol, results[0].type) == ("SPY", "ETF")
+    assert svc.symbol_index_stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_get_stock_details_runs_quote_profile_and_history_concurrently(monkeypatch):
+    started: list[str] = []
+    release = asyncio.Event()
+
+    async def step(name, result):
+        started.append(name)
+        await release.wait()
+        return result
+
+    async def fake_quote(symbol):
+        return await step("quote", StockQuote(symbol=symbol, price=10, change=1, change_percent=10, volume=100))
+
+    async def fake_profile(symbol):
+        return await step("profile", {"name": "Apple Inc.", "exchange": "NASDAQ"})
+
+    async def fake_range(symbol):
+        return await step("range", (15.0, 5.0))
+
+    monkeypatch.setattr(svc, "get_stock_quote", fake_quote)
+    monkeypatch.setattr(svc, "_get_profile", fake_profile)
+    monkeypatch.setattr(svc, "_get_52_week_range", fake_range)
+
+    pending = asyncio.create_task(svc.get_stock_details("AAPL"))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert sorted(started) == ["profile", "quote", "range"]
+    release.set()
+    details = await pending
+
+    assert (details.name, details.high_52_week, details.low_52_week) == ("Apple Inc.", 15.0, 5.0)
+
+
+@pytest.mark.asyncio
+async def test_get_stock_details_caches_profile_and_survives_history_failure(monkeypatch):
+    async def fake_quote(symbol):
+        return StockQuote(symbol=symbol, price=10, change=1, change_percent=10, volume=100)
+
+    async def failing_history(symbol, interval, output_size):
+        raise RuntimeError("upstream down")
+
+    FakeAsyncClient.calls = []
+    FakeAsyncClient.responses = [FakeResponse({"name": "Apple Inc.", "exchange": "NASDAQ", "52_week_high": "20"})]
+    monkeypatch.setattr(svc, "get_stock_quote", fake_quote)
+    monkeypatch.setattr(svc, "get_price_series", failing_history)
+    monkeypatch.setattr(svc.httpx, "AsyncClient", FakeAsyncClient)
+
+    first = await svc.get_stock_details("AAPL")
+    second = await svc.get_stock_details("aapl")
+
+    assert first.name == second.name == "Apple Inc."
+    assert second.high_52_week == 20
+    assert len(FakeAsyncClient.calls) == 1
+    assert svc.profile_cache_stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_52_week_range_uses_only_the_last_year_of_daily_bars(monkeypatch):
+    async def fake_history(symbol, interval, output_size):
+        assert (interval, output_size) == ("1day", svc._FIFTY_TWO_WEEK_BARS)
+        return svc.PriceSeries.from_columns(
+            ["2022-12-30", "2023-06-01", "2024-01-02"], [1, 1, 1], [99, 40, 30], [1, 20, 25], [1, 1, 1], [1, 1, 1]
+        )
+
+    monkeypatch.setattr(svc, "get_price_series", fake_history)
+
+    assert await svc._get_52_week_range("AAPL") == (40.0, 20.0)
+
+
+@pytest.mark.asyncio
+async def test_get_indicators_fetches_warmup_bars_and_trims_to_window(monkeypatch):
+    requested: list[int] = []
+
+    async def fake_series(symbol, interval, output_size):
+        requested.append(output_size)
+        closes = [float(value) for value in range(1, 61)]
+        stamps = [f"2024-03-{day:02d}" for day in range(1, 31)] + [f"2024-04-{day:02d}" for day in range(1, 31)]
+        return svc.PriceSeries.from_columns(stamps, closes, closes, closes, closes, [1] * 60)
+
+    monkeypatch.setattr(svc, "get_price_series", fake_series)
+
+    result = await svc.get_indicators("aapl", "sma:20,ema:5", "1day", 10)
+
+    assert requested == [10 + 20]
+    assert result.symbol == "AAPL"
+    assert len(result.dates) == 10
+    assert result.indicators["sma:20"]["value"][-1] == pytest.approx(50.5)
+    assert len(result.indicators["ema:5"]["value"]) == 10
+
+
+def test_off_hours_quotes_are_kept_until_the_next_session(monkeypatch):
+    monkeypatch.setattr(svc.market_calendar, "cache_ttl", lambda seconds, now=None: 3600.0)
+
+    assert svc._quote_ttl("AAPL") == 3600.0
+    assert svc._quote_ttl("BTC/USD") == svc.QUOTE_CACHE_TTL_SECONDS
@@ -63,10 +63,21 @@ class TestGetStockQuote:
 class TestGetMultipleQuotes:
     def test_success(self):
         mock_quotes = [MOCK_QUOTE, StockQuote(symbol="MSFT", price=300.0)]
-        with patch("routers.stock.stock_svc.get_multiple_stock_quotes", new=AsyncMock(return_value=mock_quotes)):
+        with patch("routers.stock.stock_svc.get_quote_batch", new=AsyncMock(return_value=(mock_quotes, {}))):
             resp = client.post("/api/stock/quotes", json=["AAPL", "MSFT"])
         assert resp.status_code == 200
         assert len(resp.json()["data"]) == 2
+        assert resp.json()["errors"] is None
+
+    def test_reports_per_symbol_errors(self):
+        with patch(
+            "routers.stock.stock_svc.get_quote_batch",
+            new=AsyncMock(return_value=([MOCK_QUOTE], {"NOPE": "symbol not found"})),
+        ):
+            resp = client.post("/api/stock/quotes", json=["AAPL", "NOPE"])
+        assert resp.status_code == 200
+        assert [quote["symbol"] for quote in resp.json()["data"]] == ["AAPL"]
+        assert resp.json()["errors"] == ["NOPE: symbol not found"]
 
     def test_empty_list_returns_400(self):
         resp = client.post("/api/stock/quotes", json=[])
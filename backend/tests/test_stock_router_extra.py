@@ -4,8 +4,8 @@ from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 
 from main import app
-from models.stock_models import StockDetails
-from services.stock_data_service import StockDataConfigurationError
+from models.stock_models import StockDetails, StockIndicators
+from services.stock_data_service import StockDataConfigurationError, StockDataRateLimitError
 
 client = TestClient(app)
 
@@ -74,7 +74,7 @@ class TestGetStockDetails:
 class TestGetMultipleQuotesExtra:
     def test_missing_provider_config_returns_503(self):
         with patch(
-            "routers.stock.stock_svc.get_multiple_stock_quotes",
+            "routers.stock.stock_svc.get_quote_batch",
             new=AsyncMock(side_effect=CONFIG_ERROR),
         ):
             resp = client.post("/api/stock/quotes", json=["AAPL", "MSFT"])
@@ -83,7 +83,7 @@ class TestGetMultipleQuotesExtra:
 
     def test_service_exception_returns_400(self):
         with patch(
-            "routers.stock.stock_svc.get_multiple_stock_quotes",
+            "routers.stock.stock_svc.get_quote_batch",
             new=AsyncMock(side_effect=Exception("provider timeout")),
         ):
             resp = client.post("/api/stock/quotes", json=["AAPL"])
@@ -119,3 +119,54 @@ class TestGetHistoricalExtra:
         # Empty data still yields 404, but the params must reach the service.
         assert resp.status_code == 404
         mock.assert_awaited_once_with("AAPL", "1week", 30)
+
+
+class TestStockDataStats:
+    def test_reports_client_counters(self):
+        resp = client.get("/api/stock/stats")
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["success"] is True
+        assert {"requests", "connectionsOpened", "connectionsReused", "p50LatencyMs"} <= set(body["data"]["client"])
+        assert set(body["data"]["rateLimiter"]["lanes"]) == {"interactive", "background"}
+
+    def test_rate_limited_quote_returns_503(self):
+        with patch(
+            "routers.stock.stock_svc.get_stock_quote",
+            new=AsyncMock(side_effect=StockDataRateLimitError("budget exhausted")),
+        ):
+            resp = client.get("/api/stock/quote/AAPL")
+        assert resp.status_code == 503
+
+
+class TestIndicators:
+    def test_returns_indicator_payload(self):
+        data = StockIndicators(
+            symbol="AAPL",
+            interval="1day",
+            dates=["2024-01-02T00:00:00"],
+            indicators={"sma:20": {"value": [None]}},
+        )
+        mock = AsyncMock(return_value=data)
+        with patch("routers.stock.stock_svc.get_indicators", new=mock):
+            resp = client.get("/api/stock/indicators/AAPL?indicators=sma:20&period=1y")
+        assert resp.status_code == 200
+        assert resp.json()["data"]["indicators"]["sma:20"]["value"] == [None]
+        mock.assert_awaited_once_with("AAPL", "sma:20", "1day", 252)
+
+    def test_unknown_indicator_is_400(self):
+        resp = client.get("/api/stock/indicators/AAPL?indicators=nope")
+        assert resp.status_code == 400
+
+
+class TestHistoricalPeriod:
+    def test_period_maps_to_output_size(self):
+        mock = AsyncMock(return_value=[])
+        with patch("routers.stock.stock_svc.get_historical_data", new=mock):
+            client.get("/api/stock/historical/AAPL?interval=1day&period=5y")
+        mock.assert_awaited_once_with("AAPL", "1day", 1260)
+
+    def test_unsupported_period_returns_400(self):
+        resp = client.get("/api/stock/historical/AAPL?interval=1day&period=99y")
+        assert resp.status_code == 400
+        assert "Unsupported period" in resp.json()["message"]
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+from services.symbol_index import SymbolEntry, SymbolIndex
+
+ENTRIES = [
+    SymbolEntry("AAPL", "Apple Inc.", "NASDAQ", "Common Stock"),
+    SymbolEntry("AAPL", "Apple Inc.", "OTC", "Common Stock"),
+    SymbolEntry("APLE", "Apple Hospitality REIT, Inc.", "NYSE", "REIT"),
+    SymbolEntry("A", "Agilent Technologies, Inc.", "NYSE", "Common Stock"),
+    SymbolEntry("BRK.B", "Berkshire Hathaway Inc.", "NYSE", "Common Stock"),
+    SymbolEntry("SNAP", "Snap Inc.", "NYSE", "Common Stock"),
+    SymbolEntry("PNAP", "Pineapple Financial Inc.", "NYSE", "Common Stock"),
+    SymbolEntry("MSFT", "Microsoft Corporation", "NASDAQ", "Common Stock"),
+]
+
+
+def _symbols(results):
+    return [result.symbol for result in results]
+
+
+def test_ranks_exact_symbol_then_symbol_prefix_then_names():
+    index = SymbolIndex(ENTRIES)
+
+    assert _symbols(index.search("a")) == ["A", "AAPL", "APLE"]
+    assert _symbols(index.search("apple")) == ["AAPL", "APLE"]
+    assert index.search("aapl")[0].exchange == "NASDAQ"
+    assert len(index) == 7
+
+
+def test_matches_inner_name_words_and_punctuated_symbols():
+    index = SymbolIndex(ENTRIES)
+
+    assert _symbols(index.search("hathaway")) == ["BRK.B"]
+    assert _symbols(index.search("brk b")) == ["BRK.B"]
+    assert _symbols(index.search("Apple Hosp")) == ["APLE"]
+
+
+def test_falls_back_to_one_edit_typos_only_without_prefix_hits():
+    index = SymbolIndex(ENTRIES)
+
+    assert _symbols(index.search("microsfot")) == []
+    assert _symbols(index.search("micrsoft")) == ["MSFT"]
+    assert _symbols(index.search("zzz")) == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    built_at = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    path = tmp_path / "index" / "symbols.json.gz"
+    SymbolIndex(ENTRIES, built_at=built_at).save(path)
+
+    loaded = SymbolIndex.load(path)
+
+    assert loaded.built_at == built_at
+    assert _symbols(loaded.search("snap")) == ["SNAP"]
+    assert SymbolIndex.load(tmp_path / "missing.json.gz") is None